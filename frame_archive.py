@@ -0,0 +1,155 @@
+"""
+Append-only archive of JPEG frames stored exactly as received.
+
+Frames are appended to time-rotated segment files (hourly by default) next to a compact index of fixed-size
+(timestamp, offset, size) records, so frames are never decoded or re-encoded on ingest and a time range can be served
+by binary-searching the index and reading the bytes straight from the segment.
+
+Layout:
+    {root}/{YYYYmmdd_HHMMSS}.seg  concatenated JPEG bytes
+    {root}/{YYYYmmdd_HHMMSS}.idx  INDEX_DTYPE records, one per frame, in timestamp order
+
+Example:
+    ```python
+    archive = FrameArchive("received_frames")
+    archive.append(jpeg_bytes)
+    for t, jpeg in archive.query(start=time.time() - 60, end=time.time()):
+        ...
+    ```
+"""
+
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+INDEX_DTYPE = np.dtype([("t", "<f8"), ("offset", "<u8"), ("size", "<u4")])  # 20 bytes per frame
+NAME_FORMAT = "%Y%m%d_%H%M%S"
+
+
+def load_index(path):
+    """Read an index file, ignoring a partially written trailing record."""
+    data = Path(path).read_bytes()
+    return np.frombuffer(data[: len(data) // INDEX_DTYPE.itemsize * INDEX_DTYPE.itemsize], dtype=INDEX_DTYPE)
+
+
+class FrameArchive:
+    """
+    Time-segmented, append-only JPEG frame store with a timestamp -> offset index.
+
+    Attributes:
+        root (Path): Directory holding the segment and index files.
+        segment_seconds (int): Segment length in seconds, segments start at multiples of it (local time).
+        frames (int): Number of frames appended by this instance.
+    """
+
+    def __init__(self, root="received_frames", segment_seconds=3600):
+        """Open the archive directory, creating it if needed."""
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.segment_seconds = int(segment_seconds)
+        self.lock = threading.Lock()
+        self.segment_start = None  # start time of the open segment
+        self.seg_file = None
+        self.idx_file = None
+        self.offset = 0
+        self.last_t = 0.0
+        self.frames = 0
+
+    def _segment_start(self, t):
+        """Return the start time of the segment containing timestamp `t`."""
+        utc_offset = datetime.fromtimestamp(t).astimezone().utcoffset().total_seconds()
+        return (t + utc_offset) // self.segment_seconds * self.segment_seconds - utc_offset
+
+    def _open(self, start):
+        """Close the current segment and open (or continue) the one starting at `start`."""
+        self.close()
+        stem = self.root / datetime.fromtimestamp(start).strftime(NAME_FORMAT)
+        self.seg_file = open(stem.with_suffix(".seg"), "ab")
+        self.idx_file = open(stem.with_suffix(".idx"), "ab")
+        self.offset = self.seg_file.tell()
+        self.segment_start = start
+
+    def append(self, jpeg, t=None):
+        """
+        Append one encoded frame.
+
+        Args:
+            jpeg (bytes): Encoded frame, stored unchanged.
+            t (float, optional): Unix timestamp of the frame, defaults to now.
+
+        Returns:
+            (tuple): (segment file path, byte offset of the frame in it).
+        """
+        t = time.time() if t is None else t
+        with self.lock:
+            t = max(t, self.last_t)  # keep the index sorted even if the clock steps back
+            start = self._segment_start(t)
+            if start != self.segment_start:
+                self._open(start)
+            offset = self.offset
+            self.seg_file.write(jpeg)
+            self.seg_file.flush()
+            self.idx_file.write(np.array([(t, offset, len(jpeg))], dtype=INDEX_DTYPE).tobytes())
+            self.idx_file.flush()
+            self.offset += len(jpeg)
+            self.last_t = t
+            self.frames += 1
+            return self.seg_file.name, offset
+
+    def segments(self, start=None, end=None):
+        """Return the (start time, index path) of segments that may hold frames between `start` and `end`."""
+        segments = []
+        for idx in sorted(self.root.glob("*.idx")):
+            try:
+                t0 = datetime.strptime(idx.stem, NAME_FORMAT).timestamp()
+            except ValueError:
+                continue
+            if (end is None or t0 <= end) and (start is None or t0 + self.segment_seconds > start):
+                segments.append((t0, idx))
+        return segments
+
+    def query(self, start=None, end=None, limit=None):
+        """
+        Yield (timestamp, JPEG bytes) of the archived frames with start <= timestamp <= end, in time order.
+
+        Args:
+            start (float, optional): First Unix timestamp, unbounded if None.
+            end (float, optional): Last Unix timestamp, unbounded if None.
+            limit (int, optional): Maximum number of frames to return.
+        """
+        n = 0
+        for _, idx in self.segments(start, end):
+            index = load_index(idx)
+            i = 0 if start is None else np.searchsorted(index["t"], start, side="left")
+            j = len(index) if end is None else np.searchsorted(index["t"], end, side="right")
+            if i >= j:
+                continue
+            with open(idx.with_suffix(".seg"), "rb") as f:
+                for t, offset, size in index[i:j]:
+                    if limit is not None and n >= limit:
+                        return
+                    f.seek(int(offset))
+                    yield float(t), f.read(int(size))
+                    n += 1
+
+    def frame_at(self, t):
+        """Return (timestamp, JPEG bytes) of the last frame at or before `t`, or (None, None) if there is none."""
+        for _, idx in reversed(self.segments(end=t)):
+            index = load_index(idx)
+            i = np.searchsorted(index["t"], t, side="right") - 1
+            if i >= 0:
+                with open(idx.with_suffix(".seg"), "rb") as f:
+                    f.seek(int(index["offset"][i]))
+                    return float(index["t"][i]), f.read(int(index["size"][i]))
+        return None, None
+
+    def close(self):
+        """Close the open segment files."""
+        for f in (self.seg_file, self.idx_file):
+            if f is not None:
+                f.close()
+        self.seg_file = self.idx_file = None
+        self.segment_start = None
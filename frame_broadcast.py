@@ -0,0 +1,118 @@
+"""
+Encode-once MJPEG broadcaster for the /video_feed endpoints of server.py.
+
+Each published frame is JPEG-encoded at most once, lazily by the first viewer that needs it, and all viewers are woken
+by a condition variable instead of polling. A viewer that falls behind simply skips to the newest frame, so ten viewers
+cost about the same as one.
+
+Example:
+    ```python
+    broadcaster = FrameBroadcaster()
+    broadcaster.publish(frame)  # producer
+    for jpeg in broadcaster.frames(max_fps=10):  # one generator per viewer
+        send(jpeg)
+    ```
+"""
+
+import threading
+import time
+
+import cv2
+
+BOUNDARY = b"frame"
+
+
+class FrameBroadcaster:
+    """
+    Holds the latest frame and hands its JPEG encoding to any number of viewers.
+
+    Attributes:
+        seq (int): Sequence number of the latest published frame, 0 if none.
+        subscribers (int): Number of active viewers.
+        encoded (int): Number of JPEG encodings performed.
+        quality (int): JPEG quality used for encoding raw frames.
+    """
+
+    def __init__(self, quality=80):
+        """Initialize an empty broadcaster encoding frames at JPEG `quality`."""
+        self.cond = threading.Condition()
+        self.encode_lock = threading.Lock()  # viewers waking together wait for one encoding instead of each encoding
+        self.quality = quality
+        self.seq = 0
+        self.frame = None  # latest raw frame, encoded on demand
+        self.jpeg = None  # JPEG bytes of the latest frame once encoded
+        self.subscribers = 0
+        self.encoded = 0
+        self.closed = False
+
+    def publish(self, frame=None, jpeg=None):
+        """
+        Publish a new frame and wake all viewers.
+
+        Args:
+            frame (np.ndarray, optional): Raw BGR frame, encoded only if a viewer asks for it.
+            jpeg (bytes, optional): Already encoded JPEG, passed through to viewers unchanged.
+        """
+        with self.cond:
+            self.frame = frame
+            self.jpeg = jpeg
+            self.seq += 1
+            self.cond.notify_all()
+
+    def latest(self):
+        """Return (seq, JPEG bytes) of the latest frame, encoding it if no viewer has done so yet."""
+        with self.encode_lock:
+            with self.cond:
+                seq, frame, jpeg = self.seq, self.frame, self.jpeg
+            if jpeg is None and frame is not None:
+                ret, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+                if not ret:
+                    return seq, None
+                jpeg = buffer.tobytes()
+                with self.cond:
+                    self.encoded += 1
+                    if self.seq == seq:  # cache it unless a newer frame arrived meanwhile
+                        self.jpeg = jpeg
+        return seq, jpeg
+
+    def wait(self, last_seq, timeout=None):
+        """Block until a frame newer than `last_seq` is published. Returns False on timeout or close."""
+        with self.cond:
+            return self.cond.wait_for(lambda: self.seq != last_seq or self.closed, timeout) and not self.closed
+
+    def frames(self, max_fps=None, timeout=None):
+        """
+        Generator yielding the JPEG bytes of every new frame, skipping frames the viewer was too slow for.
+
+        Args:
+            max_fps (float, optional): Upper bound on the frame rate delivered to this viewer.
+            timeout (float, optional): Stop if no new frame arrives within `timeout` seconds.
+        """
+        min_interval = 1 / max_fps if max_fps else 0.0
+        last_seq, last_sent = 0, 0.0
+        with self.cond:
+            self.subscribers += 1
+        try:
+            while self.wait(last_seq, timeout):
+                delay = last_sent + min_interval - time.time()
+                if delay > 0:
+                    time.sleep(delay)  # frames published meanwhile are skipped, the newest one is sent below
+                seq, jpeg = self.latest()
+                last_seq = seq
+                if jpeg is not None:
+                    last_sent = time.time()
+                    yield jpeg
+        finally:
+            with self.cond:
+                self.subscribers -= 1
+
+    def mjpeg(self, max_fps=None, timeout=None):
+        """Generator yielding multipart/x-mixed-replace chunks for an MJPEG HTTP response."""
+        for jpeg in self.frames(max_fps, timeout):
+            yield b"--" + BOUNDARY + b"\r\nContent-Type: image/jpeg\r\n\r\n" + jpeg + b"\r\n\r\n"
+
+    def close(self):
+        """Wake all viewers and end their streams."""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
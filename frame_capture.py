@@ -0,0 +1,191 @@
+import threading
+import time
+
+import cv2
+
+
+class LatestFrame:
+    """
+    Single-slot frame buffer shared between a producer and a consumer thread.
+
+    Every put() overwrites the slot, so the consumer always receives the most recent frame and stale frames are dropped
+    instead of queueing up behind a slow consumer.
+    """
+
+    def __init__(self):
+        """Initialize an empty slot."""
+        self._cond = threading.Condition()
+        self._frame = None
+        self._seq = 0  # sequence number of the frame in the slot
+        self._read_seq = 0  # sequence number of the last frame handed to the consumer
+        self._closed = False
+        self.dropped = 0  # frames overwritten before they were read
+
+    def put(self, frame, block=False):
+        """Store a new frame, dropping the previous one if it was never read, or waiting until it is read if `block`."""
+        with self._cond:
+            if block:
+                self._cond.wait_for(lambda: self._seq == self._read_seq or self._closed)
+            if self._frame is not None and self._seq != self._read_seq:
+                self.dropped += 1
+            self._frame = frame
+            self._seq += 1
+            self._cond.notify_all()
+
+    def get(self, timeout=None):
+        """
+        Wait for a frame newer than the last one returned.
+
+        Args:
+            timeout (float, optional): Maximum time in seconds to wait. Waits forever if None.
+
+        Returns:
+            (tuple): (seq, frame), or (None, None) if the slot was closed or the timeout expired.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq != self._read_seq or self._closed, timeout):
+                return None, None
+            if self._seq == self._read_seq:  # closed with nothing left to read
+                return None, None
+            self._read_seq = self._seq
+            self._cond.notify_all()  # wake a blocked put()
+            return self._seq, self._frame
+
+    def close(self):
+        """Wake up any waiting consumer and refuse further reads once the slot is drained."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class FrameCapture:
+    """
+    Threaded video capture that decodes only the frames that will actually be processed.
+
+    A daemon thread keeps draining the stream with cap.grab() so the RTSP socket never backs up while inference is
+    busy, and calls cap.retrieve() (the expensive decode and BGR conversion) only on every `frame_skip`-th frame. The
+    decoded frame is handed over through a LatestFrame slot.
+
+    Attributes:
+        source (str | int): Video source passed to cv2.VideoCapture.
+        frame_skip (int): Only every frame_skip-th grabbed frame is decoded, may be changed while running.
+        cap (cv2.VideoCapture): Underlying capture object.
+        slot (LatestFrame): Single-slot buffer holding the most recent decoded frame.
+        grabbed (int): Number of frames grabbed from the stream.
+        retrieved (int): Number of frames decoded.
+        position (int): Stream index of the frame last returned by read(), from 0 for the first grabbed frame.
+        realtime (bool): Grab at the stream frame rate, makes a video file behave like a live camera.
+        lossless (bool): Wait for every decoded frame to be read instead of dropping it, for offline replay.
+        on_decode (callable): Called with the seconds each decode took, e.g. a metrics histogram's observe.
+
+    Example:
+        ```python
+        capture = FrameCapture("rtsp://example.com/media.mp4", frame_skip=15).start()
+        while True:
+            success, frame = capture.read()
+            if not success:
+                break
+        capture.release()
+        ```
+    """
+
+    def __init__(self, source, frame_skip=1, read_timeout=10.0, realtime=False, lossless=False, on_decode=None):
+        """
+        Open the video source.
+
+        Args:
+            source (str | int): Video file, stream URL or webcam index.
+            frame_skip (int): Decode one frame out of every frame_skip grabbed frames.
+            read_timeout (float): Seconds read() waits for a new frame before reporting failure.
+            realtime (bool): Pace grabbing at the stream frame rate, for video files replayed as a camera.
+            lossless (bool): Block the capture thread until each decoded frame has been read.
+            on_decode (callable, optional): Called with the duration in seconds of every decode.
+        """
+        self.source = source
+        self.frame_skip = max(int(frame_skip), 1)
+        self.read_timeout = read_timeout
+        self.realtime = realtime
+        self.lossless = lossless
+        self.on_decode = on_decode
+        self.cap = cv2.VideoCapture(source)
+        self.slot = LatestFrame()
+        self.running = False
+        self.thread = None
+        self.grabbed = 0
+        self.retrieved = 0
+        self.position = None
+
+    def isOpened(self):
+        """Return True if the underlying capture is open."""
+        return self.cap.isOpened()
+
+    def get(self, prop_id):
+        """Return a cv2.VideoCapture property, e.g. cv2.CAP_PROP_FPS."""
+        return self.cap.get(prop_id)
+
+    @property
+    def dropped(self):
+        """Number of decoded frames that were overwritten before being read."""
+        return self.slot.dropped
+
+    def start(self):
+        """Start the capture thread and return self."""
+        self.running = True
+        self.thread = threading.Thread(target=self.update, daemon=True)
+        self.thread.start()
+        return self
+
+    def update(self):
+        """Grab frames in the capture thread and decode every frame_skip-th one into the slot."""
+        since_decode = 0
+        fps = self.cap.get(cv2.CAP_PROP_FPS) or 25.0
+        t0 = time.monotonic()
+        while self.running and self.cap.isOpened():
+            if self.realtime:  # a file is read as fast as it decodes otherwise
+                time.sleep(max(t0 + self.grabbed / fps - time.monotonic(), 0))
+            if not self.cap.grab():  # end of file or stream lost
+                break
+            self.grabbed += 1
+            since_decode += 1
+            if since_decode < self.frame_skip:  # read every time, frame_skip may be changed while running
+                continue
+            since_decode = 0
+            t = time.perf_counter()
+            success, frame = self.cap.retrieve()
+            if not success:
+                break
+            if self.on_decode is not None:
+                self.on_decode(time.perf_counter() - t)
+            self.retrieved += 1
+            self.slot.put((self.grabbed - 1, frame), block=self.lossless)
+        self.running = False
+        self.slot.close()
+
+    def read(self):
+        """
+        Return the most recent decoded frame, waiting for one newer than the last frame returned.
+
+        Returns:
+            (tuple): (success, frame) with the same semantics as cv2.VideoCapture.read().
+        """
+        _, item = self.slot.get(timeout=self.read_timeout)
+        if item is None:
+            return False, None
+        self.position, frame = item
+        return True, frame
+
+    def release(self):
+        """Stop the capture thread and release the stream."""
+        self.running = False
+        self.slot.close()  # also unblocks a lossless capture thread waiting for its frame to be read
+        if self.thread is not None and self.thread.is_alive():
+            self.thread.join(timeout=5)
+        self.cap.release()
+
+    def __repr__(self):
+        """Return a short summary of the capture statistics."""
+        return (
+            f"FrameCapture(source={self.source!r}, frame_skip={self.frame_skip}, grabbed={self.grabbed}, "
+            f"retrieved={self.retrieved}, dropped={self.dropped})"
+        )
+
@@ -0,0 +1,130 @@
+"""
+Adaptive frame-skip controller for the camera loop.
+
+Instead of a fixed frame_skip, the processing rate is derived from the per-frame cost the predictor measures
+(Results.speed) and from the capture-to-inference latency of the pipeline:
+
+- capacity: the rate one inference worker can sustain at the measured cost, with some headroom
+- target rate: `min_rate` while the scene is quiet, `max_rate` while people are near the counting line
+- latency: while frames take longer than `target_latency` from capture to the end of inference, the rate is backed off
+  multiplicatively (but not below `min_rate`) and recovers additively once the latency is back under the target
+
+The chosen rate is turned into a frame_skip for the capture thread, and the effective rate is what the tracker should
+be told so its Kalman motion model and lost-track buffer match the real time between processed frames.
+
+Example:
+    ```python
+    scheduler = FrameSkipScheduler(fps=25, min_rate=2, max_rate=8)
+    capture.frame_skip = scheduler.update(result.speed, latency=0.3, near_line=True)
+    tracker.set_frame_rate(scheduler.rate)
+    ```
+"""
+
+import time
+
+
+class FrameSkipScheduler:
+    """
+    Picks the frame_skip that keeps the pipeline within its latency target at the highest useful sample rate.
+
+    Attributes:
+        fps (float): Frame rate of the camera stream.
+        min_rate (float): Processing rate (Hz) wanted when nobody is near the line.
+        max_rate (float): Processing rate (Hz) wanted while someone is near the line.
+        target_latency (float): Capture-to-inference latency (s) to stay under.
+        headroom (float): Fraction of the inference worker's capacity to use at most.
+        cost (float): Smoothed per-frame processing cost in seconds, None until the first update.
+        frame_skip (int): Current frame skip.
+        hold (float): Seconds the high rate is kept after the last time someone was near the line.
+    """
+
+    def __init__(
+        self,
+        fps,
+        min_rate=2.0,
+        max_rate=8.0,
+        target_latency=0.5,
+        headroom=0.8,
+        hold=2.0,
+        smoothing=0.2,
+        frame_skip=None,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            fps (float): Frame rate of the camera stream, used to convert rates into frame skips.
+            min_rate (float): Idle processing rate in Hz.
+            max_rate (float): Processing rate in Hz while people are near the counting line.
+            target_latency (float): Capture-to-inference latency target in seconds.
+            headroom (float): Fraction of the measured capacity to use at most, leaves room for jitter.
+            hold (float): Seconds to keep the high rate after the last time someone was near the line.
+            smoothing (float): Weight of the newest sample in the cost moving average.
+            frame_skip (int, optional): Initial frame skip, defaults to the one matching `min_rate`.
+        """
+        self.fps = float(fps) if fps and fps > 0 else 25.0  # some streams report 0 fps
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.target_latency = target_latency
+        self.headroom = headroom
+        self.hold = hold
+        self.smoothing = smoothing
+        self.cost = None
+        self.backoff = 1.0  # multiplier < 1 while the latency target is missed
+        self.last_near = None
+        self.frame_skip = frame_skip or self.skip_for(min_rate)
+
+    @property
+    def rate(self):
+        """Effective processing rate in Hz for the current frame skip."""
+        return self.fps / self.frame_skip
+
+    def skip_for(self, rate):
+        """Return the frame skip whose processing rate is closest to `rate` Hz."""
+        return max(round(self.fps / max(rate, 1e-6)), 1)
+
+    def capacity(self):
+        """Highest sustainable processing rate in Hz at the measured cost, None before the first measurement."""
+        return self.headroom / self.cost if self.cost else None
+
+    def update(self, speed=None, latency=None, near_line=False, extra=0.0, t=None):
+        """
+        Feed the measurements of one processed frame and return the frame skip to use from now on.
+
+        Args:
+            speed (dict, optional): Results.speed of the frame, milliseconds per stage.
+            latency (float, optional): Seconds from capture to the end of inference (and tracking) of the frame.
+            near_line (bool): Whether tracked people were near the counting line in the frame.
+            extra (float): Seconds of per-frame work outside the predictor on the same worker (e.g. skipped frames).
+            t (float, optional): Current time, defaults to the monotonic clock.
+
+        Returns:
+            (int): The new frame skip.
+        """
+        t = time.monotonic() if t is None else t
+        if speed:
+            cost = sum(speed.get(k) or 0.0 for k in ("preprocess", "inference", "postprocess", "track")) / 1e3 + extra
+            self.cost = cost if self.cost is None else self.cost + self.smoothing * (cost - self.cost)
+        if latency is not None:
+            if latency > self.target_latency:
+                self.backoff = max(self.backoff * 0.7, 0.05)
+            else:
+                self.backoff = min(self.backoff + 0.1, 1.0)
+        if near_line:
+            self.last_near = t
+        busy = self.last_near is not None and t - self.last_near <= self.hold
+        rate = self.max_rate if busy else self.min_rate
+        floor = self.min_rate  # latency back-off never goes below the minimum sample rate...
+        capacity = self.capacity()
+        if capacity is not None:
+            rate, floor = min(rate, capacity), min(floor, capacity)  # ...unless the worker cannot sustain it
+        self.frame_skip = self.skip_for(max(rate * self.backoff, floor))
+        return self.frame_skip
+
+    def __repr__(self):
+        """Return a short summary of the scheduler state."""
+        cost = f"{self.cost * 1e3:.1f}ms" if self.cost else "n/a"
+        return (
+            f"FrameSkipScheduler(frame_skip={self.frame_skip}, rate={self.rate:.2f}Hz, cost={cost}, "
+            f"backoff={self.backoff:.2f})"
+        )
@@ -0,0 +1,240 @@
+"""
+Zero-copy local frame transport between the camera process and server.py.
+
+Frames are published as raw BGR pixels into a shared-memory ring buffer of fixed-size slots. Every slot carries a
+sequence number that is cleared while the slot is being written, so a reader can detect and discard torn reads without
+any lock shared between the processes.
+
+Memory layout:
+    header: uint64[4] = magic, number of slots, slot size in bytes, sequence number of the last written frame
+    slot i: uint64[6] = sequence number, height, width, channels, frame size in bytes, timestamp in microseconds,
+            followed by `slot size` bytes of pixel data
+
+Example:
+    ```python
+    ring = FrameRing.create("floline_frames", shape=(216, 384, 3))  # camera process
+    ring.write(frame)
+
+    ring = FrameRing.attach("floline_frames")  # server process
+    seq, frame = ring.read_latest()
+
+    reader = RingReader("floline_frames")  # or follow the newest frames across camera process restarts
+    t, frame = reader.read()
+    ```
+"""
+
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+MAGIC = 0x464C4F4C494E4531  # "FLOLINE1"
+HEADER_WORDS = 4
+META_WORDS = 6
+
+
+class FrameRing:
+    """
+    Shared-memory ring buffer of raw frames with per-slot sequence numbers.
+
+    Attributes:
+        name (str): Name of the shared-memory segment.
+        slots (int): Number of frame slots.
+        slot_bytes (int): Capacity of each slot in bytes.
+        owner (bool): True for the process that created (and will unlink) the segment.
+    """
+
+    def __init__(self, shm, owner=False):
+        """Wrap an existing SharedMemory segment, use create() or attach() instead."""
+        self.shm = shm
+        self.name = shm.name
+        self.owner = owner
+        self.header = np.ndarray((HEADER_WORDS,), dtype=np.uint64, buffer=shm.buf)
+        if not owner and int(self.header[0]) != MAGIC:
+            self.header = None
+            shm.close()
+            raise ValueError(f"Shared memory '{self.name}' is not a frame ring")
+        self.slots = int(self.header[1])
+        self.slot_bytes = int(self.header[2])
+        stride = META_WORDS * 8 + self.slot_bytes
+        offset = HEADER_WORDS * 8
+        self.meta = [
+            np.ndarray((META_WORDS,), dtype=np.uint64, buffer=shm.buf, offset=offset + i * stride)
+            for i in range(self.slots)
+        ]
+        self.data = [
+            np.ndarray((self.slot_bytes,), dtype=np.uint8, buffer=shm.buf, offset=offset + i * stride + META_WORDS * 8)
+            for i in range(self.slots)
+        ]
+
+    @classmethod
+    def create(cls, name, shape=None, slot_bytes=None, slots=4):
+        """
+        Create a new ring, replacing a stale segment of the same name left behind by a crashed process.
+
+        Args:
+            name (str): Name of the shared-memory segment.
+            shape (tuple, optional): Largest frame shape (h, w, c) that will be written.
+            slot_bytes (int, optional): Slot capacity in bytes, used if shape is not given.
+            slots (int): Number of slots, readers can lag up to slots - 1 frames without tearing.
+
+        Returns:
+            (FrameRing): The writable ring.
+        """
+        slot_bytes = int(np.prod(shape)) if shape is not None else int(slot_bytes)
+        size = HEADER_WORDS * 8 + slots * (META_WORDS * 8 + slot_bytes)
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray((HEADER_WORDS,), dtype=np.uint64, buffer=shm.buf)
+        header[:] = (MAGIC, slots, slot_bytes, 0)
+        del header  # release the buffer export
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """
+        Attach to a ring created by another process.
+
+        Raises:
+            FileNotFoundError: If no segment with this name exists yet.
+        """
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)  # Python >= 3.13
+        except TypeError:
+            shm = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(shm._name, "shared_memory")  # do not unlink the writer's segment on exit
+        return cls(shm, owner=False)
+
+    @property
+    def seq(self):
+        """Sequence number of the last written frame, 0 if nothing was written yet."""
+        return int(self.header[3])
+
+    def write(self, frame):
+        """
+        Publish a frame into the next slot.
+
+        Args:
+            frame (np.ndarray): uint8 image, at most slot_bytes large.
+
+        Returns:
+            (int): Sequence number of the published frame.
+        """
+        if frame.nbytes > self.slot_bytes:
+            raise ValueError(f"Frame of {frame.nbytes} bytes does not fit in {self.slot_bytes}-byte ring slots")
+        seq = self.seq + 1
+        i = seq % self.slots
+        meta = self.meta[i]
+        meta[0] = 0  # mark the slot as being written
+        self.data[i][: frame.nbytes] = frame.reshape(-1)
+        h, w = frame.shape[:2]
+        meta[1:] = (h, w, frame.shape[2] if frame.ndim == 3 else 1, frame.nbytes, int(time.time() * 1e6))
+        meta[0] = seq
+        self.header[3] = seq
+        return seq
+
+    def read(self, seq):
+        """
+        Copy frame `seq` out of the ring.
+
+        Returns:
+            (tuple): (timestamp, frame), or (None, None) if the frame was overwritten or is being written.
+        """
+        meta = self.meta[seq % self.slots]
+        if int(meta[0]) != seq:
+            return None, None
+        h, w, c, nbytes, ts = (int(x) for x in meta[1:])
+        frame = self.data[seq % self.slots][:nbytes].copy()
+        if int(meta[0]) != seq:  # overwritten while copying
+            return None, None
+        return ts / 1e6, frame.reshape((h, w, c) if c > 1 else (h, w))
+
+    def read_latest(self, last_seq=0):
+        """
+        Return the newest frame if it is newer than `last_seq`.
+
+        Returns:
+            (tuple): (seq, frame), or (None, None) if there is no newer frame.
+        """
+        seq = self.seq
+        if seq <= last_seq:
+            return None, None
+        _, frame = self.read(seq)
+        return (seq, frame) if frame is not None else (None, None)
+
+    def close(self):
+        """Detach from the segment and unlink it if this process created it."""
+        self.meta, self.data, self.header = [], [], None  # release buffer exports before closing
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class RingReader:
+    """
+    Follows the newest frames of a named ring, re-attaching when the writer goes quiet or is restarted.
+
+    A writer that stops publishing may have been restarted with a new segment under the same name, so after
+    `stale_after` seconds without a new frame the reader re-attaches. Every frame is returned at most once: the
+    sequence number is kept across a re-attach to the same segment (recognized by the last frame still being in it), and
+    frames whose ring timestamp is not newer than the last returned one are skipped, so an idle or stopped writer never
+    yields its last frame again.
+
+    Attributes:
+        name (str): Name of the shared-memory segment.
+        ring (FrameRing): The attached ring, None while detached.
+        last_seq (int): Sequence number of the last frame read from the current segment.
+        last_t (float): Ring timestamp of the last returned frame.
+    """
+
+    def __init__(self, name, stale_after=2.0):
+        """Initialize a detached reader of the ring `name`."""
+        self.name = name
+        self.stale_after = stale_after
+        self.ring = None
+        self.last_seq = 0
+        self.last_t = 0.0
+        self.last_seen = time.time()  # time of the last new frame or attach
+
+    def read(self):
+        """
+        Return the newest frame if it was not returned before, attaching to the ring first if needed.
+
+        Returns:
+            (tuple): (timestamp, frame) with the time the frame was written, or (None, None) if there is no new frame.
+
+        Raises:
+            FileNotFoundError: If the ring does not exist.
+            ValueError: If the segment is not a frame ring.
+        """
+        if self.ring is None:
+            self.ring = FrameRing.attach(self.name)
+            self.last_seen = time.time()
+            if self.ring.read(self.last_seq)[0] != self.last_t:  # not the segment we read from, numbering restarted
+                self.last_seq = 0
+        seq = self.ring.seq
+        if seq > self.last_seq:
+            t, frame = self.ring.read(seq)
+            if frame is not None:
+                self.last_seq, self.last_seen = seq, time.time()
+                if t > self.last_t:
+                    self.last_t = t
+                    return t, frame
+                return None, None
+        if time.time() - self.last_seen > self.stale_after:  # writer restarted, the segment we hold may be unlinked
+            self.close()
+        return None, None
+
+    def close(self):
+        """Detach from the ring, the next read() attaches again."""
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
@@ -0,0 +1,120 @@
+"""
+Load test for the frame server: many simulated cameras uploading JPEG frames while dashboards watch the feeds.
+
+Reports upload latency percentiles, achieved upload rate, errors and frames received by the viewers. Works against both
+server.py and server_async.py (use --per-camera only with server_async.py).
+
+Usage:
+    $ python server_async.py --port 4444 --save-dir "" &
+    $ python load_test.py --url http://127.0.0.1:4444 --uploaders 20 --fps 5 --viewers 5 --duration 30 --per-camera
+"""
+
+import argparse
+import asyncio
+import time
+
+import cv2
+import numpy as np
+from aiohttp import ClientSession, ClientTimeout
+
+
+def make_jpeg(width, height, seed=0):
+    """Return a JPEG-encoded noisy test frame of the given size."""
+    rng = np.random.default_rng(seed)
+    im = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    im = cv2.GaussianBlur(im, (9, 9), 0)  # more realistic compression ratio than pure noise
+    return cv2.imencode(".jpg", im)[1].tobytes()
+
+
+def percentile(data, q):
+    """Return the q-th percentile (0-100) of `data`, 0 if empty."""
+    return float(np.percentile(data, q)) if len(data) else 0.0
+
+
+async def uploader(session, url, jpeg, fps, deadline, latencies, errors):
+    """Post `jpeg` to `url` at `fps` frames per second until `deadline`, recording each request latency."""
+    interval = 1 / fps
+    next_t = time.perf_counter()
+    while time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        try:
+            async with session.post(url, data=jpeg, headers={"Content-Type": "application/octet-stream"}) as r:
+                await r.read()
+                if r.status != 200:
+                    errors.append(r.status)
+        except Exception as e:
+            errors.append(type(e).__name__)
+        latencies.append(time.perf_counter() - t0)
+        next_t += interval
+        await asyncio.sleep(max(next_t - time.perf_counter(), 0))
+
+
+async def read_feed(session, url, counts, i):
+    """Read an MJPEG feed forever, counting the frames received."""
+    async with session.get(url) as r:
+        buffer = b""
+        async for chunk in r.content.iter_any():
+            buffer += chunk
+            n = buffer.count(b"--frame")
+            if n:
+                counts[i] += n
+                buffer = buffer[buffer.rfind(b"--frame") + 7 :]
+
+
+async def viewer(session, url, deadline, counts, i):
+    """Read an MJPEG feed until `deadline`, counting the frames received."""
+    counts[i] = 0
+    try:
+        await asyncio.wait_for(read_feed(session, url, counts, i), max(deadline - time.perf_counter(), 0))
+    except Exception:  # timeout at the deadline, or the server closed the stream
+        pass
+
+
+async def run(opt):
+    """Run the uploaders and viewers and print the results."""
+    jpeg = make_jpeg(opt.width, opt.height)
+    latencies, errors, view_counts = [], [], {}
+    url = opt.url.rstrip("/")
+    timeout = ClientTimeout(total=None, sock_read=opt.duration + 10)
+    async with ClientSession(timeout=timeout) as session:
+        if opt.per_camera:  # viewers of a camera that never uploaded get 404, so every camera uploads once first
+            for i in range(opt.uploaders):
+                async with session.post(f"{url}/upload_frame/cam{i}", data=jpeg) as r:
+                    await r.read()
+        deadline = time.perf_counter() + opt.duration
+        tasks = []
+        for i in range(opt.uploaders):
+            path = f"/upload_frame/cam{i}" if opt.per_camera else "/upload_frame"
+            tasks.append(uploader(session, url + path, jpeg, opt.fps, deadline, latencies, errors))
+        for i in range(opt.viewers):
+            path = f"/video_feed/cam{i % opt.uploaders}" if opt.per_camera else "/video_feed"
+            tasks.append(viewer(session, url + path, deadline, view_counts, i))
+        t0 = time.perf_counter()
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - t0
+
+    ms = np.asarray(latencies) * 1e3
+    print(
+        f"{opt.uploaders} uploaders x {opt.fps:g} FPS, {len(jpeg) / 1024:.1f} KB frames, {opt.viewers} viewers, "
+        f"{elapsed:.1f}s\n"
+        f"uploads: {len(ms)} ({len(ms) / elapsed:.1f}/s, target {opt.uploaders * opt.fps:g}/s), {len(errors)} errors\n"
+        f"upload latency ms: p50 {percentile(ms, 50):.1f}, p90 {percentile(ms, 90):.1f}, "
+        f"p99 {percentile(ms, 99):.1f}, max {ms.max() if len(ms) else 0:.1f}\n"
+        f"viewer frames: {sum(view_counts.values())} total, {sorted(view_counts.values())}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:4444", help="server base URL")
+    parser.add_argument("--uploaders", type=int, default=20, help="number of simulated cameras")
+    parser.add_argument("--fps", type=float, default=5, help="upload rate per camera")
+    parser.add_argument("--viewers", type=int, default=5, help="number of /video_feed clients")
+    parser.add_argument("--duration", type=float, default=30, help="test duration in seconds")
+    parser.add_argument("--width", type=int, default=384, help="test frame width")
+    parser.add_argument("--height", type=int, default=216, help="test frame height")
+    parser.add_argument("--per-camera", action="store_true", help="use /upload_frame/<id> and /video_feed/<id>")
+    opt = parser.parse_args()
+    if opt.uploaders < 1 and opt.per_camera:
+        parser.error("--per-camera needs --uploaders >= 1, every viewer watches one of the uploading cameras")
+    asyncio.run(run(opt))
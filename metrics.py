@@ -0,0 +1,247 @@
+"""
+Minimal Prometheus-style metrics: counters, gauges and histograms rendered in the text exposition format.
+
+Updating a metric is a dict lookup and an addition under a lock, so it is cheap enough for the per-frame hot path.
+Values that already exist elsewhere (queue depths, drop counters, reconnects) are not copied on every change but read
+by a callback when the endpoint is scraped.
+
+Example:
+    ```python
+    registry = Registry()
+    latency = registry.histogram("stage_seconds", "Stage latency", labels=("stage",))
+    latency.observe(0.012, stage="infer")
+    registry.gauge("queue_depth", "Queued items", labels=("stage",)).set_function(queue.qsize, stage="infer")
+    registry.serve(port=9100)  # GET http://host:9100/metrics
+    ```
+"""
+
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Latency buckets in seconds, from sub-millisecond counting steps up to multi-second stalls
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    """Escape a label value for the text exposition format."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    """Return the `{name="value",...}` label string, empty without labels."""
+    pairs = [*zip(names, values), *extra]
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    """Return a sample value the way Prometheus writes it."""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """
+    Base class of a metric family with optional labels.
+
+    Attributes:
+        name (str): Metric name.
+        help (str): Help text.
+        labels (tuple): Label names, every update passes one value per name as keyword arguments.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name, help="", labels=()):
+        """Initialize an empty metric family."""
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.lock = threading.Lock()
+        self.values = {}  # label values -> value
+        self.functions = {}  # label values -> callable returning the value at scrape time
+
+    def _key(self, labels):
+        """Return the tuple of label values, in label name order."""
+        if labels.keys() != set(self.labels):
+            raise ValueError(f"Metric '{self.name}' expects labels {self.labels}, got {tuple(labels)}")
+        return tuple(labels[k] for k in self.labels)
+
+    def set_function(self, fn, **labels):
+        """Read the value of these labels from `fn()` whenever the metric is collected."""
+        self.functions[self._key(labels)] = fn
+
+    def samples(self):
+        """Return (suffix, label values, extra labels, value) tuples of the current values."""
+        with self.lock:
+            values = dict(self.values)
+        for key, fn in list(self.functions.items()):
+            try:
+                values[key] = fn()
+            except Exception:  # a source that went away must not break the scrape
+                continue
+        return [("", key, (), value) for key, value in values.items()]
+
+    def render(self):
+        """Return the metric family in the text exposition format."""
+        help = self.help.replace("\\", "\\\\").replace("\n", "\\n")
+        lines = [f"# HELP {self.name} {help}", f"# TYPE {self.name} {self.type}"]
+        for suffix, key, extra, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(self.labels, key, extra)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing count."""
+
+    type = "counter"
+
+    def inc(self, value=1, **labels):
+        """Add `value` to the count of these labels."""
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + value
+
+
+class Gauge(Metric):
+    """Value that can go up and down."""
+
+    type = "gauge"
+
+    def set(self, value, **labels):
+        """Set the value of these labels."""
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def inc(self, value=1, **labels):
+        """Add `value` (may be negative) to the value of these labels."""
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + value
+
+
+class Histogram(Metric):
+    """
+    Distribution of observed values in fixed cumulative buckets, plus their sum and count.
+
+    Attributes:
+        buckets (tuple): Upper bounds of the buckets, +Inf is implied.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name, help="", labels=(), buckets=LATENCY_BUCKETS):
+        """Initialize an empty histogram with the given bucket upper bounds."""
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        """Record one observation for these labels."""
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            counts = self.values.get(key)
+            if counts is None:
+                counts = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0]  # bucket counts, +Inf, sum
+            counts[i] += 1
+            counts[-1] += value
+
+    def set_function(self, fn, **labels):
+        """Not supported, histograms are only updated by observe()."""
+        raise TypeError("Histogram values can not be read from a function")
+
+    def samples(self):
+        """Return the cumulative bucket, sum and count samples."""
+        with self.lock:
+            values = {key: list(counts) for key, counts in self.values.items()}
+        samples = []
+        for key, counts in values.items():
+            cumulative = 0
+            for bound, n in zip((*self.buckets, float("inf")), counts):
+                cumulative += n
+                samples.append(("_bucket", key, (("le", _format_value(float(bound))),), cumulative))
+            samples.append(("_sum", key, (), counts[-1]))
+            samples.append(("_count", key, (), cumulative))
+        return samples
+
+
+class Registry:
+    """
+    Collection of metrics served together.
+
+    Attributes:
+        metrics (dict): Metric name -> Metric, in registration order.
+    """
+
+    def __init__(self, prefix=""):
+        """Initialize an empty registry, `prefix` is prepended to every metric name."""
+        self.prefix = prefix
+        self.metrics = {}
+        self.lock = threading.Lock()
+        self.server = None
+
+    def _register(self, cls, name, help, labels, **kwargs):
+        """Return the metric called `name`, creating it on first use."""
+        name = self.prefix + name
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, help, labels, **kwargs)
+            elif not isinstance(metric, cls) or metric.labels != tuple(labels):
+                raise ValueError(f"Metric '{name}' is already registered as {metric.type} with labels {metric.labels}")
+            return metric
+
+    def counter(self, name, help="", labels=()):
+        """Return the Counter called `name`, creating it on first use."""
+        return self._register(Counter, name, help, labels)
+
+    def gauge(self, name, help="", labels=()):
+        """Return the Gauge called `name`, creating it on first use."""
+        return self._register(Gauge, name, help, labels)
+
+    def histogram(self, name, help="", labels=(), buckets=LATENCY_BUCKETS):
+        """Return the Histogram called `name`, creating it on first use."""
+        return self._register(Histogram, name, help, labels, buckets=buckets)
+
+    def render(self):
+        """Return all metrics in the text exposition format."""
+        with self.lock:
+            metrics = list(self.metrics.values())
+        return "\n".join(m.render() for m in metrics) + "\n"
+
+    def serve(self, port=9100, host="0.0.0.0"):
+        """
+        Serve GET /metrics from a daemon thread.
+
+        Args:
+            port (int): Port to listen on, 0 picks a free one.
+            host (str): Interface to bind.
+
+        Returns:
+            (ThreadingHTTPServer): The running server, call shutdown() to stop it.
+        """
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in {"/metrics", "/"}:
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # scrapes every few seconds would flood the console
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name="metrics", daemon=True).start()
+        return self.server
@@ -0,0 +1,241 @@
+"""
+Long-lived Modbus TCP writer with one persistent connection per PLC.
+
+Register updates are coalesced: all updates queued for a PLC within `flush_interval` seconds are merged, and every
+run of contiguous registers is sent with a single write_registers call. Blocks can be reset to zero `reset_delay`
+seconds after a write by the PLC worker itself, so no thread is spawned per flush.
+
+Example:
+    ```python
+    writer = ModbusWriter(reset_delay=3)
+    writer.add("192.168.254.66", 502, 2000, [num_entered, num_left])  # accumulate counts for registers 2000-2001
+    writer.close()
+    ```
+"""
+
+import heapq
+import threading
+import time
+
+from pymodbus.client import ModbusTcpClient
+
+
+class PLCWriter:
+    """
+    Writer for one PLC: owns its connection, pending register values and reset schedule, served by one thread.
+
+    Attributes:
+        host (str): PLC address.
+        port (int): PLC Modbus TCP port.
+        client (ModbusTcpClient): Persistent client, reconnected with exponential backoff after failures.
+        pending (dict): Register address -> value waiting to be written.
+        writes (int): Number of write_registers calls sent.
+        failures (int): Number of failed connection attempts or writes.
+    """
+
+    def __init__(
+        self,
+        host,
+        port=502,
+        flush_interval=0.2,
+        reset_delay=3.0,
+        backoff=0.5,
+        backoff_max=30.0,
+        timeout=3,
+        on_write=None,
+    ):
+        """
+        Initialize the PLC writer and start its worker thread.
+
+        Args:
+            host (str): PLC address.
+            port (int): PLC Modbus TCP port.
+            flush_interval (float): Seconds to collect updates before writing them in one call.
+            reset_delay (float): Seconds after a write before the written block is reset to zero, 0 to disable.
+            backoff (float): Initial reconnect delay in seconds, doubled after each consecutive failure.
+            backoff_max (float): Maximum reconnect delay in seconds.
+            timeout (float): Socket timeout in seconds.
+            on_write (callable, optional): Called with the duration in seconds and the success of every write call.
+        """
+        self.host = host
+        self.port = port
+        self.flush_interval = flush_interval
+        self.reset_delay = reset_delay
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.on_write = on_write
+        self.client = ModbusTcpClient(host, port=port, timeout=timeout)
+
+        self.cond = threading.Condition()
+        self.pending = {}  # address -> value
+        self.resets = []  # heap of (due time, address, count, generation) of written blocks
+        self.unscheduled = []  # (address, count, generation) of blocks whose reset starts once they are written
+        self.generation = {}  # block start address -> generation, a newer write supersedes older scheduled resets
+        self.retry_at = 0.0  # earliest time of the next connection attempt
+        self.consecutive_failures = 0
+        self.writes = 0
+        self.failures = 0
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name=f"modbus-{host}:{port}", daemon=True)
+        self.thread.start()
+
+    def write(self, address, values, accumulate=False):
+        """
+        Queue register values starting at `address`.
+
+        Args:
+            address (int): First holding register.
+            values (list[int]): Register values.
+            accumulate (bool): Add the values to any not-yet-written values instead of replacing them.
+        """
+        with self.cond:
+            for i, v in enumerate(values):
+                a = address + i
+                self.pending[a] = int(v) + (self.pending.get(a, 0) if accumulate else 0)
+            if self.reset_delay and any(values):
+                g = self.generation.get(address, 0) + 1
+                self.generation[address] = g
+                self.unscheduled.append((address, len(values), g))
+            self.cond.notify()
+
+    def run(self):
+        """Worker loop: wait for updates or due resets, then write them in coalesced calls."""
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: not self.running or self._due() <= time.time(), timeout=self._timeout())
+                self._pop_resets(time.time())  # before the exit check, close() makes all resets due
+                if not self.running and (not self.pending or time.time() < self.retry_at):
+                    break  # nothing left to write or reset, or the PLC is unreachable
+                collecting = bool(self.pending) and self.running
+            if collecting:
+                time.sleep(self.flush_interval)  # let further updates for this window arrive
+            self._flush()
+        self.client.close()
+
+    def _due(self):
+        """Return the time the worker has work to do: pending writes (after backoff) or the earliest reset."""
+        due = self.resets[0][0] if self.resets else float("inf")
+        return min(due, self.retry_at) if self.pending else due
+
+    def _timeout(self):
+        """Return how long the worker may sleep before its next due time, None if nothing is scheduled."""
+        due = self._due()
+        return None if due == float("inf") else max(due - time.time(), 0.0)
+
+    def _pop_resets(self, now):
+        """Turn resets due at `now` into pending zeros unless a newer write to the same block superseded them."""
+        while self.resets and self.resets[0][0] <= now:
+            _, address, count, g = heapq.heappop(self.resets)
+            if self.generation.get(address) == g:
+                for a in range(address, address + count):
+                    self.pending.setdefault(a, 0)
+
+    def _flush(self):
+        """Write pending values and due resets, keeping them queued if the PLC is unreachable."""
+        now = time.time()
+        with self.cond:
+            self._pop_resets(now)
+            if not self.pending or now < self.retry_at:
+                return
+            pending, self.pending = self.pending, {}
+            unscheduled, self.unscheduled = self.unscheduled, []
+
+        failed = {}
+        for address, values in self._runs(pending):
+            if not self._write_registers(address, values):
+                failed.update({address + i: v for i, v in enumerate(values)})
+
+        with self.cond:
+            for a, v in failed.items():
+                self.pending.setdefault(a, v)  # newer values queued meanwhile take precedence
+            # Written blocks start their reset clocks (or reset right away when closing), failed ones wait for a retry
+            due = time.time() + self.reset_delay if self.running else 0.0
+            waiting = []
+            for r in unscheduled:
+                address, count, _ = r
+                if any(a in failed for a in range(address, address + count)):
+                    waiting.append(r)
+                else:
+                    heapq.heappush(self.resets, (due, *r))
+            self.unscheduled = waiting + self.unscheduled
+
+    @staticmethod
+    def _runs(registers):
+        """Split a {address: value} dict into (start address, values) runs of contiguous registers."""
+        runs = []
+        for a in sorted(registers):
+            if runs and a == runs[-1][0] + len(runs[-1][1]):
+                runs[-1][1].append(registers[a])
+            else:
+                runs.append((a, [registers[a]]))
+        return runs
+
+    def _write_registers(self, address, values):
+        """Write one run of registers over the persistent connection, returns True on success."""
+        t = time.perf_counter()
+        try:
+            if not self.client.connected and not self.client.connect():
+                raise ConnectionError("unable to connect")
+            response = self.client.write_registers(address, values)
+            if response.isError():
+                raise ConnectionError(f"error response {response}")
+        except Exception as e:
+            self.failures += 1
+            self.consecutive_failures += 1
+            delay = min(self.backoff * 2 ** (self.consecutive_failures - 1), self.backoff_max)
+            self.retry_at = time.time() + delay
+            print(f"Modbus write to {self.host}:{self.port}@{address} failed ({e}), retrying in {delay:.1f}s")
+            self.client.close()
+            if self.on_write is not None:
+                self.on_write(time.perf_counter() - t, False)
+            return False
+        if self.on_write is not None:
+            self.on_write(time.perf_counter() - t, True)
+        self.writes += 1
+        self.consecutive_failures = 0
+        return True
+
+    def close(self, timeout=5):
+        """Flush pending values and close the connection."""
+        with self.cond:
+            self.running = False
+            self.resets = [(0.0, *r[1:]) for r in self.resets]  # reset written blocks now
+            self.cond.notify()
+        self.thread.join(timeout)
+
+
+class ModbusWriter:
+    """
+    Pool of PLCWriter instances, one persistent connection and worker per PLC.
+
+    Attributes:
+        plcs (dict): (host, port) -> PLCWriter.
+    """
+
+    def __init__(self, **kwargs):
+        """Initialize an empty pool, `kwargs` are passed to every PLCWriter (flush_interval, reset_delay, ...)."""
+        self.kwargs = kwargs
+        self.plcs = {}
+        self.lock = threading.Lock()
+
+    def plc(self, host, port=502):
+        """Return the writer for a PLC, connecting lazily on first use."""
+        with self.lock:
+            if (host, port) not in self.plcs:
+                self.plcs[(host, port)] = PLCWriter(host, port, **self.kwargs)
+            return self.plcs[(host, port)]
+
+    def write(self, host, port, address, values):
+        """Queue register values, replacing values not yet written to the same registers."""
+        self.plc(host, port).write(address, values)
+
+    def add(self, host, port, address, values):
+        """Queue register values, adding them to values not yet written to the same registers."""
+        self.plc(host, port).write(address, values, accumulate=True)
+
+    def close(self):
+        """Flush and close all PLC connections."""
+        with self.lock:
+            plcs, self.plcs = list(self.plcs.values()), {}
+        for plc in plcs:
+            plc.close()
@@ -0,0 +1,323 @@
+"""
+Bounded multi-stage pipeline: every stage runs in its own worker thread(s) and stages are connected by bounded queues.
+
+Example:
+    ```python
+    pipeline = Pipeline()
+    pipeline.add_stage("infer", infer, maxsize=1, policy=DROP_OLDEST)
+    pipeline.add_stage("encode", encode, maxsize=4, policy=DROP_OLDEST)
+    pipeline.add_stage("publish", publish, maxsize=8, policy=DROP_OLDEST, workers=4)
+    pipeline.start()
+    for frame in frames:
+        pipeline.put(frame)
+    pipeline.close()
+    print(pipeline.summary())
+    ```
+"""
+
+import threading
+import time
+from collections import deque
+
+BLOCK = "block"  # producer waits for a free slot
+DROP_OLDEST = "drop_oldest"  # oldest queued item is discarded to make room
+DROP_NEWEST = "drop_newest"  # incoming item is discarded when the queue is full
+POLICIES = {BLOCK, DROP_OLDEST, DROP_NEWEST}
+
+_STOP = object()  # end-of-stream sentinel, always delivered regardless of the overflow policy
+
+
+class BoundedQueue:
+    """
+    Thread-safe FIFO queue with a fixed capacity and a configurable overflow policy.
+
+    Attributes:
+        maxsize (int): Maximum number of queued items.
+        policy (str): Overflow policy, one of 'block', 'drop_oldest' or 'drop_newest'.
+        dropped (int): Number of items discarded by the overflow policy.
+        high_water (int): Highest queue depth observed.
+    """
+
+    def __init__(self, maxsize=1, policy=BLOCK):
+        """Initialize an empty queue holding at most `maxsize` items."""
+        if policy not in POLICIES:
+            raise ValueError(f"Invalid overflow policy '{policy}', valid policies are {sorted(POLICIES)}")
+        self.maxsize = max(int(maxsize), 1)
+        self.policy = policy
+        self.items = deque()
+        self.cond = threading.Condition()
+        self.dropped = 0
+        self.high_water = 0
+
+    def put(self, item, timeout=None):
+        """
+        Add an item to the queue, applying the overflow policy if it is full.
+
+        Args:
+            item (any): Item to enqueue.
+            timeout (float, optional): Maximum seconds to wait under the 'block' policy. Waits forever if None.
+
+        Returns:
+            (bool): True if the item was enqueued, False if it was dropped or the wait timed out.
+        """
+        with self.cond:
+            if item is not _STOP and len(self.items) >= self.maxsize:
+                if self.policy == DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+                elif self.policy == DROP_OLDEST:
+                    self.items.popleft()
+                    self.dropped += 1
+                elif not self.cond.wait_for(lambda: len(self.items) < self.maxsize, timeout):
+                    return False
+            self.items.append(item)
+            self.high_water = max(self.high_water, len(self.items))
+            self.cond.notify_all()
+            return True
+
+    def get(self, timeout=None):
+        """Remove and return the oldest item, waiting up to `timeout` seconds. Returns None on timeout."""
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.items, timeout):
+                return None
+            item = self.items.popleft()
+            self.cond.notify_all()
+            return item
+
+    def qsize(self):
+        """Return the current number of queued items."""
+        return len(self.items)
+
+
+class StageStats:
+    """
+    Latency counters for one pipeline stage.
+
+    Attributes:
+        count (int): Number of items processed.
+        errors (int): Number of items whose processing raised an exception.
+        total (float): Accumulated processing time in seconds.
+        max (float): Longest processing time in seconds.
+        last (float): Processing time of the most recent item in seconds.
+        wait (float): Accumulated time items spent queued before processing, in seconds.
+        recent (deque): Processing times of the most recent items, for percentiles.
+        observers (list): Callables receiving (dt, wait) of every processed item, e.g. metrics exporters.
+    """
+
+    def __init__(self, window=1000):
+        """Initialize zeroed counters keeping the last `window` latencies."""
+        self.lock = threading.Lock()
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+        self.wait = 0.0
+        self.recent = deque(maxlen=window)
+        self.observers = []
+
+    def add(self, dt, wait=0.0):
+        """Record one processed item that took `dt` seconds after waiting `wait` seconds in the queue."""
+        with self.lock:
+            self.count += 1
+            self.total += dt
+            self.wait += wait
+            self.last = dt
+            self.max = max(self.max, dt)
+            self.recent.append(dt)
+        for observer in self.observers:
+            observer(dt, wait)
+
+    def percentile(self, q):
+        """Return the q-th percentile (0-100) of the recent latencies in seconds."""
+        with self.lock:
+            data = sorted(self.recent)
+        if not data:
+            return 0.0
+        return data[min(int(round(q / 100 * (len(data) - 1))), len(data) - 1)]
+
+    def mean(self):
+        """Return the mean processing time in seconds."""
+        return self.total / self.count if self.count else 0.0
+
+
+class Stage:
+    """
+    One pipeline stage: a function run by `workers` threads that read from a bounded input queue.
+
+    The function receives one item and returns the item for the next stage, or None to pass nothing on.
+
+    Attributes:
+        name (str): Stage name used in statistics.
+        fn (callable): Processing function.
+        queue (BoundedQueue): Input queue of the stage.
+        workers (int): Number of worker threads.
+        stats (StageStats): Latency counters.
+        next (Stage): Downstream stage, None for the last stage.
+    """
+
+    def __init__(self, name, fn, maxsize=1, policy=BLOCK, workers=1):
+        """Initialize the stage and its input queue."""
+        self.name = name
+        self.fn = fn
+        self.queue = BoundedQueue(maxsize, policy)
+        self.workers = max(int(workers), 1)
+        self.stats = StageStats()
+        self.next = None
+        self.threads = []
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the worker threads."""
+        self._active = self.workers
+        self.threads = [
+            threading.Thread(target=self.run, name=f"{self.name}-{i}", daemon=True) for i in range(self.workers)
+        ]
+        for t in self.threads:
+            t.start()
+
+    def put(self, item, timeout=None):
+        """Enqueue an item for this stage, returns False if it was dropped."""
+        return self.queue.put((time.perf_counter(), item), timeout)
+
+    def run(self):
+        """Worker loop: process items until the end-of-stream sentinel arrives, then forward it downstream."""
+        while True:
+            entry = self.queue.get()
+            if entry is _STOP:
+                break
+            t_queued, item = entry
+            t0 = time.perf_counter()
+            try:
+                out = self.fn(item)
+            except Exception as e:
+                self.stats.errors += 1
+                print(f"Error in pipeline stage '{self.name}': {e}")
+                out = None
+            self.stats.add(time.perf_counter() - t0, t0 - t_queued)
+            if out is not None and self.next is not None:
+                self.next.put(out)
+
+        with self._lock:
+            self._active -= 1
+            last = self._active == 0
+        if last and self.next is not None:
+            for _ in range(self.next.workers):
+                self.next.queue.put(_STOP)
+
+    def stop(self):
+        """Send one end-of-stream sentinel per worker."""
+        for _ in range(self.workers):
+            self.queue.put(_STOP)
+
+    def join(self, timeout=None):
+        """Wait for all worker threads to finish."""
+        for t in self.threads:
+            t.join(timeout)
+
+
+class Pipeline:
+    """
+    Linear chain of stages connected by bounded queues.
+
+    Attributes:
+        stages (list[Stage]): Stages in processing order.
+    """
+
+    def __init__(self):
+        """Initialize an empty pipeline."""
+        self.stages = []
+        self.running = False
+
+    def add_stage(self, name, fn, maxsize=1, policy=BLOCK, workers=1):
+        """
+        Append a stage to the pipeline.
+
+        Args:
+            name (str): Stage name.
+            fn (callable): Function taking one item and returning the item for the next stage or None.
+            maxsize (int): Capacity of the stage input queue.
+            policy (str): Overflow policy of the input queue, one of 'block', 'drop_oldest' or 'drop_newest'.
+            workers (int): Number of worker threads. Use 1 for stages that must process items in order.
+
+        Returns:
+            (Pipeline): The pipeline, to allow chaining.
+        """
+        stage = Stage(name, fn, maxsize, policy, workers)
+        if self.stages:
+            self.stages[-1].next = stage
+        self.stages.append(stage)
+        return self
+
+    def start(self):
+        """Start all stage workers."""
+        for stage in self.stages:
+            stage.start()
+        self.running = True
+        return self
+
+    def put(self, item, timeout=None):
+        """Feed an item into the first stage, returns False if it was dropped."""
+        return self.stages[0].put(item, timeout)
+
+    def close(self, timeout=None):
+        """Drain all queued items through the pipeline and stop the workers."""
+        if not self.running:
+            return
+        self.running = False
+        self.stages[0].stop()
+        for stage in self.stages:
+            stage.join(timeout)
+
+    def stats(self):
+        """Return a dictionary of per-stage latency (ms), queue depth and drop counters."""
+        return {
+            s.name: {
+                "count": s.stats.count,
+                "errors": s.stats.errors,
+                "dropped": s.queue.dropped,
+                "queue": s.queue.qsize(),
+                "queue_max": s.queue.high_water,
+                "mean_ms": s.stats.mean() * 1e3,
+                "p50_ms": s.stats.percentile(50) * 1e3,
+                "p95_ms": s.stats.percentile(95) * 1e3,
+                "p99_ms": s.stats.percentile(99) * 1e3,
+                "max_ms": s.stats.max * 1e3,
+                "wait_ms": s.stats.wait / s.stats.count * 1e3 if s.stats.count else 0.0,
+            }
+            for s in self.stages
+        }
+
+    def export(self, registry, prefix="pipeline_"):
+        """
+        Expose the stage statistics as metrics of `registry` (see metrics.Registry), labelled by stage.
+
+        Latencies are observed into histograms as items are processed, queue depths and counters are read on scrape.
+        """
+        seconds = registry.histogram(f"{prefix}stage_seconds", "Processing time per item", labels=("stage",))
+        wait = registry.histogram(f"{prefix}queue_wait_seconds", "Time items spent queued", labels=("stage",))
+        depth = registry.gauge(f"{prefix}queue_depth", "Items queued", labels=("stage",))
+        items = registry.counter(f"{prefix}items_total", "Items processed", labels=("stage",))
+        dropped = registry.counter(f"{prefix}dropped_total", "Items dropped by the queue policy", labels=("stage",))
+        errors = registry.counter(f"{prefix}errors_total", "Items whose processing raised", labels=("stage",))
+        for s in self.stages:
+
+            def observe(dt, queued, name=s.name):
+                seconds.observe(dt, stage=name)
+                wait.observe(queued, stage=name)
+
+            s.stats.observers.append(observe)
+            depth.set_function(s.queue.qsize, stage=s.name)
+            items.set_function(lambda s=s: s.stats.count, stage=s.name)
+            dropped.set_function(lambda s=s: s.queue.dropped, stage=s.name)
+            errors.set_function(lambda s=s: s.stats.errors, stage=s.name)
+        return self
+
+    def summary(self):
+        """Return a human-readable summary of the stage statistics."""
+        return "\n".join(
+            f"{name}: {x['count']} items, {x['mean_ms']:.1f}ms mean, {x['p95_ms']:.1f}ms p95, {x['max_ms']:.1f}ms max, "
+            f"{x['wait_ms']:.1f}ms queued, {x['dropped']} dropped, {x['errors']} errors"
+            for name, x in self.stats().items()
+        )
@@ -0,0 +1,320 @@
+"""
+Offline replay benchmark: recorded clips through the camera pipeline of usefloline_cam.py, without a camera.
+
+Every clip runs through the same capture -> track -> ObjectCounter -> Modbus/HTTP pipeline as the live camera, with a
+local stand-in PLC that accepts the Modbus register writes and a local stand-in server that accepts the frame uploads.
+The IN/OUT counts are the ones that reached the stand-in PLC.
+
+Clips are processed as fast as possible without dropping any decoded frame (--pace fast, reproducible), or paced at
+their recorded frame rate so that frames are dropped exactly as they would be on a live stream (--pace realtime).
+
+Reports throughput, per-stage latency percentiles, dropped frames and the final IN/OUT counts, compared against an
+optional ground-truth sidecar next to each clip: recordings/2024-06-14_09-20-06.json containing {"in": 3, "out": 1}.
+
+Usage:
+    $ python replay_benchmark.py recordings/*.mp4 --frame-skip 5 --budget 245760 --save results.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import socketserver
+import struct
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+import usefloline_cam
+
+
+class FakePLCHandler(socketserver.BaseRequestHandler):
+    """Modbus TCP request handler answering write single/multiple register requests, one connection per handler."""
+
+    def recv_exact(self, n):
+        """Return exactly `n` bytes from the connection, None once it is closed."""
+        data = b""
+        while len(data) < n:
+            chunk = self.request.recv(n - len(data))
+            if not chunk:
+                return None
+            data += chunk
+        return data
+
+    def handle(self):
+        """Serve requests until the client disconnects."""
+        while True:
+            header = self.recv_exact(7)  # MBAP header: transaction id, protocol id, length, unit id
+            if header is None:
+                return
+            tid, pid, length, unit = struct.unpack(">HHHB", header)
+            pdu = self.recv_exact(length - 1)
+            if pdu is None:
+                return
+            fc = pdu[0]
+            if fc == 0x10:  # write multiple registers
+                address, count = struct.unpack(">HH", pdu[1:5])
+                self.server.record(address, struct.unpack(f">{count}H", pdu[6 : 6 + 2 * count]))
+                reply = struct.pack(">BHH", fc, address, count)
+            elif fc == 0x06:  # write single register
+                address, value = struct.unpack(">HH", pdu[1:5])
+                self.server.record(address, (value,))
+                reply = pdu[:5]
+            else:
+                reply = struct.pack(">BB", fc | 0x80, 1)  # illegal function
+            self.request.sendall(struct.pack(">HHHB", tid, pid, len(reply) + 1, unit) + reply)
+
+
+class FakePLC(socketserver.ThreadingTCPServer):
+    """
+    Local Modbus TCP server standing in for the PLC.
+
+    Attributes:
+        registers (dict): Register address -> last written value.
+        totals (Counter): Register address -> sum of all non-zero values written, i.e. the counts sent by the camera.
+        writes (int): Number of write requests received.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=0):
+        """Bind to `host`:`port` (0 picks a free port) and start serving in a daemon thread."""
+        super().__init__((host, port), FakePLCHandler)
+        self.lock = threading.Lock()
+        self.registers = {}
+        self.totals = Counter()
+        self.writes = 0
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def port(self):
+        """Port the server listens on."""
+        return self.server_address[1]
+
+    def record(self, address, values):
+        """Store written register values, the camera writes count deltas and later resets the block to zero."""
+        with self.lock:
+            self.writes += 1
+            for i, v in enumerate(values):
+                self.registers[address + i] = v
+                self.totals[address + i] += v
+
+    def reset(self):
+        """Forget all writes."""
+        with self.lock:
+            self.registers.clear()
+            self.totals.clear()
+            self.writes = 0
+
+
+class FakeUploadHandler(BaseHTTPRequestHandler):
+    """Accepts POST /upload_frame like server.py without storing anything."""
+
+    def do_POST(self):
+        """Read the uploaded frame and answer like server.py."""
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.record(body)
+        reply = b'{"status": "success"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def log_message(self, format, *args):
+        """Keep the benchmark output free of access logs."""
+
+
+class FakeFrameServer(ThreadingHTTPServer):
+    """
+    Local HTTP server standing in for server.py.
+
+    Attributes:
+        frames (int): Frames uploaded.
+        bytes (int): Bytes uploaded.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0):
+        """Bind to `host`:`port` (0 picks a free port) and start serving in a daemon thread."""
+        super().__init__((host, port), FakeUploadHandler)
+        self.lock = threading.Lock()
+        self.frames = 0
+        self.bytes = 0
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        """Upload endpoint."""
+        return f"http://{self.server_address[0]}:{self.server_address[1]}/upload_frame"
+
+    def record(self, body):
+        """Count one uploaded frame."""
+        with self.lock:
+            self.frames += 1
+            self.bytes += len(body)
+
+    def reset(self):
+        """Forget all uploads."""
+        with self.lock:
+            self.frames = self.bytes = 0
+
+
+def percentile(data, q):
+    """Return the q-th percentile (0-100) of `data`, 0 if empty."""
+    return float(np.percentile(data, q)) if len(data) else 0.0
+
+
+def load_ground_truth(clip):
+    """Return the {"in": N, "out": M} sidecar of `clip`, None if there is none."""
+    path = os.path.splitext(clip)[0] + ".json"
+    if not os.path.isfile(path):
+        return None
+    with open(path) as f:
+        truth = json.load(f)
+    return {"in": int(truth["in"]), "out": int(truth["out"])}
+
+
+def replay_clip(clip, opt, plc, server):
+    """Run one clip through usefloline_cam.run_program against the stand-ins, return its results and stage latencies."""
+    cap = cv2.VideoCapture(clip)
+    video_frames, fps = cap.get(cv2.CAP_PROP_FRAME_COUNT), cap.get(cv2.CAP_PROP_FPS) or 25.0
+    cap.release()
+    plc.reset()
+    server.reset()
+
+    stats = usefloline_cam.run_program(
+        source=clip,
+        model_path=opt.model,
+        frame_skip=opt.frame_skip,
+        adaptive_skip=opt.adaptive,
+        modbus_server_address="127.0.0.1",
+        modbus_server_port=plc.port,
+        server_url=server.url,
+        frame_ring_name=None,
+        record_video=False,
+        publish_frames=not opt.no_publish,
+        replay=opt.pace,
+        imgsz=opt.imgsz,
+        budget=opt.budget,
+        tracker=opt.tracker,
+        metrics_port=None,
+    )
+    if stats is None:
+        return None
+    usefloline_cam.modbus_writer.close()  # flush the last counts to the stand-in PLC
+    latencies = {s.name: list(s.stats.recent) for s in usefloline_cam.pipeline.stages}
+
+    counted = stats["stages"]["count"]["count"]
+    result = {
+        "clip": clip,
+        "video_s": video_frames / fps,
+        "elapsed_s": stats["elapsed"],
+        "frames": stats["stream"]["frames"],
+        "counted": counted,
+        "inferred": stats["inferred"],
+        "throughput_fps": counted / stats["elapsed"] if stats["elapsed"] else 0.0,
+        "dropped": {
+            "capture": stats["stream"]["frames_dropped"],
+            **{name: x["dropped"] for name, x in stats["stages"].items()},
+        },
+        "errors": sum(x["errors"] for x in stats["stages"].values()),
+        "in": plc.totals[2000],
+        "out": plc.totals[2001],
+        "plc_writes": plc.writes,
+        "uploads": server.frames,
+        "truth": load_ground_truth(clip),
+        "frame_skip": stats["frame_skip"],
+    }
+    return result, latencies
+
+
+def report(results, latencies, elapsed):
+    """Print per-clip results, stage latency percentiles and the count accuracy against the ground truth."""
+    header = f"{'clip':<32} {'video s':>8} {'wall s':>7} {'x rt':>6} {'frames':>7} {'fps':>6} {'drops':>6}"
+    print(f"\n{header} IN/OUT (truth)")
+    for r in results:
+        truth = f" ({r['truth']['in']}/{r['truth']['out']})" if r["truth"] else ""
+        print(
+            f"{os.path.basename(r['clip']):<32} {r['video_s']:>8.1f} {r['elapsed_s']:>7.1f} "
+            f"{r['video_s'] / r['elapsed_s'] if r['elapsed_s'] else 0:>6.1f} {r['counted']:>7} "
+            f"{r['throughput_fps']:>6.1f} {sum(r['dropped'].values()):>6} {r['in']}/{r['out']}{truth}"
+        )
+
+    print("\nstage latency ms:")
+    for name, data in latencies.items():
+        ms = np.asarray(data) * 1e3
+        print(
+            f"  {name:<8} p50 {percentile(ms, 50):7.1f}  p90 {percentile(ms, 90):7.1f}  p99 {percentile(ms, 99):7.1f}  "
+            f"max {ms.max() if len(ms) else 0:7.1f}  ({len(ms)} samples)"
+        )
+
+    video_s = sum(r["video_s"] for r in results)
+    counted = sum(r["counted"] for r in results)
+    print(
+        f"\n{len(results)} clips, {video_s:.1f}s of video in {elapsed:.1f}s ({video_s / elapsed:.1f}x real time), "
+        f"{counted} frames counted ({counted / elapsed:.1f}/s), "
+        f"{sum(sum(r['dropped'].values()) for r in results)} dropped, {sum(r['errors'] for r in results)} errors"
+    )
+    judged = [r for r in results if r["truth"]]
+    if judged:
+        err_in = sum(abs(r["in"] - r["truth"]["in"]) for r in judged)
+        err_out = sum(abs(r["out"] - r["truth"]["out"]) for r in judged)
+        exact = sum(r["in"] == r["truth"]["in"] and r["out"] == r["truth"]["out"] for r in judged)
+        print(
+            f"ground truth: {len(judged)} clips, {exact} exact, IN error {err_in} of "
+            f"{sum(r['truth']['in'] for r in judged)}, OUT error {err_out} of {sum(r['truth']['out'] for r in judged)}"
+        )
+
+
+def main(opt):
+    """Replay every clip and print the benchmark report."""
+    clips = sorted({c for pattern in opt.clips for c in glob.glob(pattern)})
+    if not clips:
+        raise SystemExit(f"No clips match {opt.clips}")
+    usefloline_cam.headless = True  # no windows or key polling during the benchmark
+    plc, server = FakePLC(), FakeFrameServer()
+
+    results, latencies = [], {}
+    t0 = time.monotonic()
+    for clip in clips:
+        print(f"Replaying {clip}")
+        replayed = replay_clip(clip, opt, plc, server)
+        if replayed is None:
+            print(f"Skipping {clip}: could not open it")
+            continue
+        result, clip_latencies = replayed
+        results.append(result)
+        for name, data in clip_latencies.items():
+            latencies.setdefault(name, []).extend(data)
+    elapsed = time.monotonic() - t0
+    plc.shutdown()
+    server.shutdown()
+
+    if results:
+        report(results, latencies, elapsed)
+    if opt.save:
+        with open(opt.save, "w") as f:
+            json.dump({"args": vars(opt), "clips": results}, f, indent=2)
+        print(f"Results saved to {opt.save}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("clips", nargs="*", default=["recordings/*.mp4"], help="clips or glob patterns")
+    parser.add_argument("--model", default="yolov8s.pt", help="model weights")
+    parser.add_argument("--pace", choices=("fast", "realtime"), default="fast", help="replay speed")
+    parser.add_argument("--frame-skip", type=int, default=15, help="(initial) frame skip")
+    parser.add_argument("--adaptive", action="store_true", help="adapt the frame skip like the live camera")
+    parser.add_argument("--imgsz", type=int, default=None, help="inference size, default: model default")
+    parser.add_argument("--budget", type=int, default=640 * 384, help="inference pixels per frame, 0 to disable")
+    parser.add_argument("--tracker", default=None, help="tracker config yaml, default: bytetrack.yaml")
+    parser.add_argument("--no-publish", action="store_true", help="skip the annotation and HTTP upload stages")
+    parser.add_argument("--save", default="", help="write the per-clip results to this JSON file")
+    main(parser.parse_args())
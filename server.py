@@ -3,7 +3,11 @@ import os
 import datetime
 import cv2
 import threading
-import numpy as np
+import time
+from frame_archive import FrameArchive
+from frame_broadcast import BOUNDARY, FrameBroadcaster
+from frame_transport import RingReader
+from metrics import CONTENT_TYPE, Registry
 app = Flask(__name__)
 
 # Directory to save the frames
@@ -11,53 +15,143 @@ SAVE_DIR = 'received_frames'
 if not os.path.exists(SAVE_DIR):
     os.makedirs(SAVE_DIR)
 
-# Initialize a variable to hold the latest frame
-latest_frame = None
-lock = threading.Lock()
+# 'archive' appends received JPEG bytes unchanged to hourly segment files with a timestamp index,
+# 'files' keeps the old layout of one JPEG file per frame
+INGEST_MODE = os.environ.get('INGEST_MODE', 'archive')
+archive = FrameArchive(SAVE_DIR, segment_seconds=int(os.environ.get('SEGMENT_SECONDS', 3600)))
+
+# Shared-memory ring written by usefloline_cam.py on the same box
+FRAME_RING_NAME = os.environ.get('FRAME_RING_NAME', 'floline_frames')
+
+# Upper bound on the frame rate sent to each /video_feed viewer, override per viewer with /video_feed?fps=N
+MAX_FEED_FPS = float(os.environ.get('MAX_FEED_FPS', 15))
+
+# Holds the latest frame, encodes it once and wakes all /video_feed viewers
+broadcaster = FrameBroadcaster()
+
+# Prometheus-style metrics served at /metrics
+metrics = Registry(prefix='floline_server_')
+frames_received = metrics.counter('frames_total', 'Frames received', labels=('source',))
+bytes_received = metrics.counter('frame_bytes_total', 'JPEG bytes received or encoded', labels=('source',))
+step_seconds = metrics.histogram('step_seconds', 'Duration of the per-frame steps', labels=('step',))
+metrics.gauge('viewers', 'Connected /video_feed viewers').set_function(lambda: broadcaster.subscribers)
+metrics.counter('feed_encodes_total', 'Frames JPEG-encoded for viewers').set_function(lambda: broadcaster.encoded)
+metrics.counter('archived_frames_total', 'Frames appended to the archive').set_function(lambda: archive.frames)
+
+def store_frame(frame=None, jpeg=None, t=None):
+    # t is the time the frame was captured, defaults to now
+    # Raw frames from shared memory are encoded once, uploaded JPEG bytes are used as received and never decoded
+    t = time.time() if t is None else t
+    source = 'upload' if jpeg is not None else 'ring'
+    if jpeg is None:
+        t0 = time.perf_counter()
+        _, buffer = cv2.imencode('.jpg', frame)
+        jpeg = buffer.tobytes()
+        step_seconds.observe(time.perf_counter() - t0, step='encode')
+    frames_received.inc(source=source)
+    bytes_received.inc(len(jpeg), source=source)
+    t0 = time.perf_counter()
+
+    # Save the frame
+    if INGEST_MODE == 'archive':
+        filename, offset = archive.append(jpeg, t)
+        filename = f"{filename}@{offset}"
+    else:
+        timestamp = datetime.datetime.fromtimestamp(t).strftime("%Y%m%d_%H%M%S%f")
+        filename = f"{SAVE_DIR}/frame_{timestamp}.jpg"
+        with open(filename, 'wb') as f:
+            f.write(jpeg)
+    step_seconds.observe(time.perf_counter() - t0, step='save')
+
+    # Update the latest frame
+    broadcaster.publish(jpeg=jpeg)
+    return filename
+
+def parse_time(value):
+    """Parse a Unix timestamp or an ISO 8601 date-time such as 2024-06-14T09:20:06."""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.datetime.fromisoformat(value).timestamp()
+
+def read_frame_ring(poll_interval=0.005, stale_after=2.0):
+    """Copy new frames from the shared-memory ring, (re)attaching whenever the camera process (re)creates it."""
+    reader = RingReader(FRAME_RING_NAME, stale_after=stale_after)
+    while True:
+        attached = reader.ring is not None
+        try:
+            t, frame = reader.read()
+        except (FileNotFoundError, ValueError):
+            time.sleep(1)
+            continue
+        if not attached:
+            print(f"Attached to shared-memory frame ring '{FRAME_RING_NAME}'")
+        if frame is not None:
+            store_frame(frame, t=t)  # archived at the time the camera process wrote it
+        else:
+            time.sleep(poll_interval)
 
 @app.route('/upload_frame', methods=['POST'])
 def upload_frame():
-    global latest_frame
     try:
         frame_data = request.data  # Get the raw bytes from the request
+        if not frame_data.startswith(b'\xff\xd8'):  # JPEG start-of-image marker
+            return jsonify({"status": "error", "message": "body is not a JPEG image"}), 400
 
-        # Decode the frame
-        np_arr = np.frombuffer(frame_data, np.uint8)
-        frame = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-
-        # Save the frame to the specified directory
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S%f")
-        filename = f"{SAVE_DIR}/frame_{timestamp}.jpg"
-        cv2.imwrite(filename, frame)
-
-        # Update the latest frame
-        with lock:
-            latest_frame = frame
+        t0 = time.perf_counter()
+        filename = store_frame(jpeg=frame_data)
+        step_seconds.observe(time.perf_counter() - t0, step='upload')
 
         return jsonify({"status": "success", "filename": filename}), 200
     except Exception as e:
         print(f"Error: {e}")
         return jsonify({"status": "error", "message": str(e)}), 500
 
-def generate_video_feed():
-    global latest_frame
-    while True:
-        if latest_frame is not None:
-            with lock:
-                frame = latest_frame.copy()
-            ret, jpeg = cv2.imencode('.jpg', frame)
-            if ret:
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + jpeg.tobytes() + b'\r\n\r\n')
-
 @app.route('/video_feed')
 def video_feed():
-    return Response(generate_video_feed(),
+    max_fps = min(request.args.get('fps', MAX_FEED_FPS, type=float), MAX_FEED_FPS)
+    return Response(broadcaster.mjpeg(max_fps=max_fps),
                     mimetype='multipart/x-mixed-replace; boundary=frame')
 
+@app.route('/frame')
+def frame_at():
+    # Last archived frame at or before ?t=<unix time or ISO date-time>, served straight from the segment file
+    try:
+        t, jpeg = archive.frame_at(parse_time(request.args['t']))
+    except (KeyError, ValueError):
+        return jsonify({"status": "error", "message": "expected ?t=<unix time or ISO date-time>"}), 400
+    if jpeg is None:
+        return jsonify({"status": "error", "message": "no frame archived at or before this time"}), 404
+    return Response(jpeg, mimetype='image/jpeg', headers={'X-Frame-Timestamp': f"{t:.6f}"})
+
+@app.route('/frames')
+def frames_in_range():
+    # Archived frames between ?start= and ?end= as an MJPEG stream, optionally paced with ?fps=N
+    try:
+        start = parse_time(request.args['start'])
+        end = parse_time(request.args['end']) if 'end' in request.args else time.time()
+        limit = request.args.get('limit', 10000, type=int)
+        fps = request.args.get('fps', 0, type=float)
+    except (KeyError, ValueError):
+        return jsonify({"status": "error", "message": "expected ?start=...&end=... as unix time or ISO date-time"}), 400
+
+    def generate():
+        for t, jpeg in archive.query(start, end, limit=limit):
+            yield (b'--' + BOUNDARY + b'\r\nContent-Type: image/jpeg\r\n' +
+                   f"X-Frame-Timestamp: {t:.6f}\r\n\r\n".encode() + jpeg + b'\r\n\r\n')
+            if fps:
+                time.sleep(1 / fps)
+
+    return Response(generate(), mimetype='multipart/x-mixed-replace; boundary=frame')
+
+@app.route('/metrics')
+def metrics_endpoint():
+    return Response(metrics.render(), content_type=CONTENT_TYPE)
+
 @app.route('/')
 def index():
     return "Server is running. Send frames to /upload_frame and view the feed at /video_feed."
 
 if __name__ == '__main__':
+    threading.Thread(target=read_frame_ring, daemon=True).start()  # local frames, /upload_frame serves remote ones
     app.run(host='0.0.0.0', port=4444)
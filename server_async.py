@@ -0,0 +1,231 @@
+"""
+Asyncio implementation of server.py for many concurrent uploaders and viewers.
+
+Serves the same routes as server.py plus one channel per camera:
+    POST /upload_frame, /upload_frame/<camera_id>   JPEG bytes, stored and broadcast unchanged
+    GET  /video_feed, /video_feed/<camera_id>       MJPEG stream of the latest frames, ?fps=N to lower the rate
+    GET  /                                          status text
+
+Camera ids must be one of the configured cameras (--cameras), or any name made of letters, digits, '_' and '-' if
+none are configured; other ids get 404 so no channel or archive directory is created for them. Without configured
+cameras, channels are only created by uploads: viewers of a camera that never uploaded get 404 as well.
+
+Uploads never wait for viewers or disk: each camera channel keeps only its latest frame for viewers, who skip to the
+newest frame when they fall behind, and archiving goes through a small bounded queue that drops the oldest frame when
+the disk cannot keep up.
+
+Usage:
+    $ python server_async.py --port 4444
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import time
+
+import cv2
+from aiohttp import web
+
+from frame_archive import FrameArchive
+from frame_broadcast import BOUNDARY
+from frame_transport import RingReader
+
+DEFAULT_CAMERA = "default"
+CAMERA_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+
+class CameraChannel:
+    """
+    Latest frame, viewers and archive of one camera.
+
+    Attributes:
+        camera_id (str): Camera name used in the URL.
+        seq (int): Sequence number of the latest frame.
+        jpeg (bytes): Latest frame.
+        uploads (int): Frames received.
+        archive_dropped (int): Frames not archived because the archive queue was full.
+    """
+
+    def __init__(self, camera_id, archive=None, archive_queue=32):
+        """Initialize an empty channel, archiving into `archive` if given."""
+        self.camera_id = camera_id
+        self.seq = 0
+        self.jpeg = None
+        self.t = 0.0
+        self.event = asyncio.Event()  # set and replaced on every new frame to wake the current viewers
+        self.viewers = 0
+        self.uploads = 0
+        self.archive = archive
+        self.archive_queue = asyncio.Queue(maxsize=archive_queue)
+        self.archive_dropped = 0
+        self.archive_task = asyncio.create_task(self.archive_worker()) if archive is not None else None
+
+    def publish(self, jpeg, t=None):
+        """Make `jpeg` the latest frame, wake the viewers and queue it for archiving without waiting."""
+        self.t = time.time() if t is None else t
+        self.jpeg = jpeg
+        self.seq += 1
+        self.uploads += 1
+        event, self.event = self.event, asyncio.Event()
+        event.set()
+        if self.archive is not None:
+            if self.archive_queue.full():
+                self.archive_queue.get_nowait()
+                self.archive_dropped += 1
+            self.archive_queue.put_nowait((self.t, jpeg))
+
+    async def archive_worker(self):
+        """Write queued frames to the archive in a worker thread so disk I/O never blocks the event loop."""
+        while True:
+            t, jpeg = await self.archive_queue.get()
+            await asyncio.to_thread(self.archive.append, jpeg, t)
+
+    async def frames(self, max_fps=None):
+        """Async generator of the newest JPEG frames for one viewer, at most `max_fps` per second."""
+        min_interval = 1 / max_fps if max_fps else 0.0
+        last_seq, last_sent = 0, 0.0
+        self.viewers += 1
+        try:
+            while True:
+                if self.seq == last_seq:
+                    await self.event.wait()
+                delay = last_sent + min_interval - time.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                last_seq, last_sent = self.seq, time.time()
+                yield self.jpeg
+        finally:
+            self.viewers -= 1
+
+
+class FrameServer:
+    """
+    aiohttp application holding one CameraChannel per camera id.
+
+    Attributes:
+        channels (dict): camera_id -> CameraChannel, created on first upload (or view of a configured camera).
+        save_dir (str): Archive root, each camera archives into its own subdirectory. None disables archiving.
+        max_fps (float): Upper bound on the frame rate sent to each viewer.
+        cameras (set): Accepted camera ids, None to accept any id matching CAMERA_ID_PATTERN.
+    """
+
+    def __init__(self, save_dir="received_frames", max_fps=15, segment_seconds=3600, ring_name=None, cameras=None):
+        """Initialize the server, `ring_name` also ingests local frames from a shared-memory ring."""
+        self.cameras = {DEFAULT_CAMERA, *cameras} if cameras else None
+        self.save_dir = save_dir
+        self.max_fps = max_fps
+        self.segment_seconds = segment_seconds
+        self.ring_name = ring_name
+        self.channels = {}
+        self.app = web.Application(client_max_size=16 * 1024**2)
+        self.app.add_routes(
+            [
+                web.get("/", self.index),
+                web.post("/upload_frame", self.upload_frame),
+                web.post("/upload_frame/{camera_id}", self.upload_frame),
+                web.get("/video_feed", self.video_feed),
+                web.get("/video_feed/{camera_id}", self.video_feed),
+            ]
+        )
+        self.app.on_startup.append(self.on_startup)
+
+    def valid_camera(self, camera_id):
+        """Return True if `camera_id` is a configured camera, or a safe name if no cameras are configured."""
+        if self.cameras is not None:
+            return camera_id in self.cameras
+        return CAMERA_ID_PATTERN.fullmatch(camera_id) is not None
+
+    def viewable_camera(self, camera_id):
+        """Return True if `camera_id` can be viewed: it has a channel, is configured or is the default camera."""
+        if camera_id in self.channels or camera_id == DEFAULT_CAMERA:
+            return True
+        return self.cameras is not None and camera_id in self.cameras
+
+    def camera_not_found(self, camera_id):
+        """Return the 404 response of an unknown or invalid camera id."""
+        return web.json_response({"status": "error", "message": f"unknown camera '{camera_id}'"}, status=404)
+
+    def channel(self, camera_id):
+        """Return the channel of `camera_id`, creating it on first use."""
+        if camera_id not in self.channels:
+            archive = None
+            if self.save_dir:
+                archive = FrameArchive(os.path.join(self.save_dir, camera_id), segment_seconds=self.segment_seconds)
+            self.channels[camera_id] = CameraChannel(camera_id, archive)
+        return self.channels[camera_id]
+
+    async def on_startup(self, app):
+        """Start the shared-memory ring reader if configured."""
+        if self.ring_name:
+            app["ring_task"] = asyncio.create_task(self.read_frame_ring())
+
+    async def read_frame_ring(self, poll_interval=0.005, stale_after=2.0):
+        """Publish frames from the shared-memory ring to the default camera, encoding each one once."""
+        reader = RingReader(self.ring_name, stale_after=stale_after)
+        while True:
+            try:
+                t, frame = reader.read()
+            except (FileNotFoundError, ValueError):
+                await asyncio.sleep(1)
+                continue
+            if frame is not None:
+                _, buffer = await asyncio.to_thread(cv2.imencode, ".jpg", frame)
+                self.channel(DEFAULT_CAMERA).publish(buffer.tobytes(), t)  # archived at the time it was written
+            else:
+                await asyncio.sleep(poll_interval)
+
+    async def index(self, request):
+        """Return a short status text."""
+        cameras = ", ".join(f"{c.camera_id} ({c.uploads} frames, {c.viewers} viewers)" for c in self.channels.values())
+        return web.Response(
+            text="Server is running. Send frames to /upload_frame[/<camera_id>] and view the feed at "
+            f"/video_feed[/<camera_id>]. Cameras: {cameras or 'none'}"
+        )
+
+    async def upload_frame(self, request):
+        """Store and broadcast one uploaded JPEG frame."""
+        camera_id = request.match_info.get("camera_id", DEFAULT_CAMERA)
+        if not self.valid_camera(camera_id):
+            return self.camera_not_found(camera_id)
+        frame_data = await request.read()
+        if not frame_data.startswith(b"\xff\xd8"):  # JPEG start-of-image marker
+            return web.json_response({"status": "error", "message": "body is not a JPEG image"}, status=400)
+        channel = self.channel(camera_id)
+        channel.publish(frame_data)
+        return web.json_response({"status": "success", "camera": camera_id, "seq": channel.seq})
+
+    async def video_feed(self, request):
+        """Stream the camera as MJPEG until the viewer disconnects."""
+        camera_id = request.match_info.get("camera_id", DEFAULT_CAMERA)
+        if not self.viewable_camera(camera_id):  # viewers never create channels of unknown cameras
+            return self.camera_not_found(camera_id)
+        try:
+            max_fps = min(float(request.query.get("fps", self.max_fps)), self.max_fps)
+        except ValueError:
+            max_fps = self.max_fps
+        response = web.StreamResponse(
+            headers={"Content-Type": f"multipart/x-mixed-replace; boundary={BOUNDARY.decode()}"}
+        )
+        await response.prepare(request)
+        try:
+            async for jpeg in self.channel(camera_id).frames(max_fps):
+                await response.write(b"--" + BOUNDARY + b"\r\nContent-Type: image/jpeg\r\n\r\n" + jpeg + b"\r\n\r\n")
+        except ConnectionResetError:  # viewer went away
+            pass
+        return response
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=4444)
+    parser.add_argument("--save-dir", default="received_frames", help="archive root, empty to disable archiving")
+    parser.add_argument("--max-fps", type=float, default=15, help="maximum frame rate per viewer")
+    parser.add_argument("--segment-seconds", type=int, default=3600, help="archive segment length")
+    parser.add_argument("--ring", default="floline_frames", help="shared-memory frame ring, empty to disable")
+    parser.add_argument("--cameras", default="", help="comma-separated accepted camera ids, empty for any safe name")
+    opt = parser.parse_args()
+    cameras = [c for c in opt.cameras.split(",") if c]
+    server = FrameServer(opt.save_dir, opt.max_fps, opt.segment_seconds, opt.ring, cameras)
+    web.run_app(server.app, host=opt.host, port=opt.port)
@@ -0,0 +1,234 @@
+"""
+Reconnecting supervisor around FrameCapture.
+
+The expensive parts of the camera process (model, counter, tracker, pipeline) are set up once, only the capture is
+reopened when the stream drops. Reconnect attempts back off exponentially with random jitter, so a rebooting camera
+or a flapping link is not hammered, and the backoff resets after the connection has been stable for a while.
+
+Example:
+    ```python
+    supervisor = StreamSupervisor("rtsp://example.com/media.mp4", frame_skip=15)
+    for t, frame in supervisor.frames():
+        ...
+    print(supervisor.health())
+    ```
+"""
+
+import os
+import random
+import threading
+import time
+
+import cv2
+
+from frame_capture import FrameCapture
+
+
+class StreamSupervisor:
+    """
+    Keeps a FrameCapture connected and yields its frames across reconnects.
+
+    Attributes:
+        source (str | int): Video source passed to FrameCapture.
+        cap (FrameCapture): Current capture, None while disconnected.
+        connections (int): Number of successful connections, changes whenever frames come from a new connection.
+        reconnects (int): Number of connections after the first one.
+        failures (int): Number of failed connection attempts.
+        frames_read (int): Frames yielded.
+        position (int): Stream index of the last frame yielded, counted from 0 on every connection.
+        frames_lost (int): Stream frames missed while disconnected, estimated from the downtime and the stream fps.
+        dropped (int): Decoded frames of closed connections that were overwritten before being read.
+        last_error (str): Reason of the last disconnect or failed attempt.
+        fps (float): Frame rate reported by the stream, used to estimate frames_lost.
+    """
+
+    def __init__(
+        self,
+        source,
+        frame_skip=1,
+        backoff=1.0,
+        backoff_max=60.0,
+        jitter=0.5,
+        stable_after=60.0,
+        read_timeout=10.0,
+        reconnect=None,
+        **kwargs,
+    ):
+        """
+        Initialize the supervisor without connecting.
+
+        Args:
+            source (str | int): Video file, stream URL or webcam index.
+            frame_skip (int): Frame skip of the capture, kept across reconnects and changeable while running.
+            backoff (float): Delay before the first reconnect attempt in seconds, doubled after every failure.
+            backoff_max (float): Upper bound of the reconnect delay in seconds.
+            jitter (float): Random fraction added to or removed from each delay.
+            stable_after (float): Seconds a connection must last for the backoff to reset.
+            read_timeout (float): Seconds without a frame after which the stream counts as lost.
+            reconnect (bool, optional): Reconnect at the end of the stream, defaults to True unless source is a file.
+            **kwargs (Any): Further FrameCapture arguments (realtime, lossless, on_decode).
+        """
+        self.source = source
+        self._frame_skip = max(int(frame_skip), 1)
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.stable_after = stable_after
+        self.read_timeout = read_timeout
+        self.reconnect = not (isinstance(source, str) and os.path.isfile(source)) if reconnect is None else reconnect
+        self.capture_kwargs = kwargs
+        self.cap = None
+        self.fps = 0.0
+        self.attempt = 0  # consecutive failures, sets the next delay
+        self.stop_event = threading.Event()
+        self.started = time.monotonic()
+        self.connected_at = None
+        self.disconnected_at = None
+        self.last_frame_at = None
+        self.connected_time = 0.0
+        self.connections = 0
+        self.reconnects = 0
+        self.failures = 0
+        self.frames_read = 0
+        self.position = None
+        self.frames_lost = 0
+        self.dropped = 0
+        self.last_error = None
+
+    @property
+    def frame_skip(self):
+        """Frame skip applied to the current and all future captures."""
+        return self._frame_skip
+
+    @frame_skip.setter
+    def frame_skip(self, value):
+        self._frame_skip = max(int(value), 1)
+        cap = self.cap
+        if cap is not None:
+            cap.frame_skip = self._frame_skip
+
+    @property
+    def connected(self):
+        """True while a capture is open."""
+        return self.cap is not None
+
+    def delay(self):
+        """Return the jittered backoff delay before the next connection attempt."""
+        delay = min(self.backoff * 2 ** max(self.attempt - 1, 0), self.backoff_max)
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def open(self, start=True):
+        """
+        Connect, retrying with backoff until it succeeds or stop() is called.
+
+        Args:
+            start (bool): Start the capture thread, otherwise frames() starts it so no frames are dropped before.
+
+        Returns:
+            (FrameCapture): The connected capture, None if stopped.
+        """
+        while not self.stop_event.is_set():
+            if self.attempt:
+                delay = self.delay()
+                print(f"Stream: reconnecting in {delay:.1f}s")
+                if self.stop_event.wait(delay):
+                    break
+            cap = FrameCapture(
+                self.source, frame_skip=self._frame_skip, read_timeout=self.read_timeout, **self.capture_kwargs
+            )
+            if cap.isOpened():
+                self._connected(cap)
+                return cap.start() if start else cap
+            cap.release()
+            self.failures += 1
+            self.attempt += 1
+            self.last_error = f"could not open {self.source}"
+            print(f"Stream: connection attempt {self.attempt} failed")
+        return None
+
+    def _connected(self, cap):
+        """Record a new connection."""
+        now = time.monotonic()
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        self.fps = fps if fps and fps > 0 else self.fps
+        gap = None if self.disconnected_at is None else now - self.disconnected_at
+        if gap is not None:
+            self.frames_lost += int(gap * self.fps)
+            self.reconnects += 1
+        self.cap = cap
+        self.connections += 1
+        self.connected_at = self.last_frame_at = now
+        self.disconnected_at = None
+        if gap is not None:
+            print(f"Stream: reconnected after {gap:.1f}s, {self.health()}")
+
+    def _disconnected(self, reason):
+        """Release the capture and record the disconnect, the stream is taken to have stopped at its last frame."""
+        now = self.last_frame_at
+        uptime = now - self.connected_at
+        self.connected_time += uptime
+        if uptime >= self.stable_after:
+            self.attempt = 0
+        self.attempt += 1
+        self.cap.release()
+        self.dropped += self.cap.dropped
+        self.cap = None
+        self.connected_at = None
+        self.disconnected_at = now
+        self.last_error = reason
+        print(f"Stream: {reason} after {uptime:.1f}s")
+
+    def frames(self):
+        """
+        Generator of (capture time, frame) across reconnects until stop() is called or a file source ends.
+
+        The capture time is taken with time.monotonic() when the frame is handed over. The index of the frame in the
+        stream is in `position`, its video time is position / fps.
+        """
+        while not self.stop_event.is_set():
+            cap = self.cap or self.open()
+            if cap is None:
+                break
+            if cap.thread is None:  # opened with start=False
+                cap.start()
+                self.connected_at = self.last_frame_at = time.monotonic()
+            success, frame = cap.read()
+            if success:
+                self.frames_read += 1
+                self.position = cap.position
+                self.last_frame_at = time.monotonic()
+                yield self.last_frame_at, frame
+                continue
+            if self.stop_event.is_set():
+                self._disconnected("stopped")
+                break
+            self._disconnected("stream ended" if not cap.running else f"no frame for {self.read_timeout:.0f}s")
+            if not self.reconnect:
+                break
+
+    def stop(self):
+        """Stop reconnecting and release the capture, frames() returns after its current read."""
+        self.stop_event.set()
+        cap = self.cap
+        if cap is not None:
+            cap.release()
+
+    def health(self):
+        """Return a dict of connection health statistics."""
+        now, cap, connected_at = time.monotonic(), self.cap, self.connected_at
+        connected_time = self.connected_time + (now - connected_at if connected_at is not None else 0.0)
+        return {
+            "connected": cap is not None,
+            "uptime_s": round(now - self.started, 1),
+            "connected_s": round(connected_time, 1),
+            "reconnects": self.reconnects,
+            "failed_attempts": self.failures,
+            "frames": self.frames_read,
+            "frames_lost": self.frames_lost,
+            "frames_dropped": self.dropped + (cap.dropped if cap is not None else 0),
+            "last_error": self.last_error,
+        }
+
+    def __repr__(self):
+        """Return a short summary of the health statistics."""
+        return f"StreamSupervisor({', '.join(f'{k}={v}' for k, v in self.health().items())})"
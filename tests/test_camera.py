@@ -0,0 +1,395 @@
+# Ultralytics YOLO 🚀, AGPL-3.0 license
+"""Tests of the camera process and frame server modules at the repository root."""
+
+import threading
+import time
+from datetime import datetime
+
+
+class FakeModbusClient:
+    """In-memory stand-in for pymodbus' ModbusTcpClient, recording every write_registers call."""
+
+    def __init__(self, host, port=502, timeout=3):
+        """Initializes a disconnected client without any writes."""
+        self.connected = False
+        self.writes = []
+        self.failing = set()  # start addresses whose writes get an error response
+        self.lock = threading.Lock()
+
+    def connect(self):
+        """Connects, always successfully."""
+        self.connected = True
+        return True
+
+    def close(self):
+        """Disconnects."""
+        self.connected = False
+
+    def write_registers(self, address, values):
+        """Records the write and returns a response, an error one for failing addresses."""
+        with self.lock:
+            if address not in self.failing:
+                self.writes.append((address, list(values)))
+        failed = address in self.failing
+        return type("Response", (), {"isError": lambda self: failed})()
+
+
+def test_modbus_writer_resets_on_close(monkeypatch):
+    """Test that closing a writer writes the last counts and then resets the registers to zero."""
+    import modbus_writer
+
+    monkeypatch.setattr(modbus_writer, "ModbusTcpClient", FakeModbusClient)
+    writer = modbus_writer.PLCWriter("plc", flush_interval=1.0, reset_delay=60)
+    writer.write(2000, [1, 1], accumulate=True)
+    writer.write(2000, [1, 0], accumulate=True)  # coalesced with the first write
+    writer.close()
+    assert not writer.thread.is_alive()
+    assert writer.client.writes == [(2000, [2, 1]), (2000, [0, 0])]
+
+
+def test_modbus_writer_resets_written_blocks_when_others_fail(monkeypatch):
+    """Test that a block written in a flush is reset on time although another block of the same flush failed."""
+    import modbus_writer
+
+    monkeypatch.setattr(modbus_writer, "ModbusTcpClient", FakeModbusClient)
+    writer = modbus_writer.PLCWriter("plc", flush_interval=0.01, reset_delay=0.05, backoff=0.05)
+    writer.client.failing.add(3000)
+    writer.write(2000, [1, 1], accumulate=True)
+    writer.write(3000, [1], accumulate=True)
+    deadline = time.time() + 5
+    while (2000, [0, 0]) not in writer.client.writes and time.time() < deadline:
+        time.sleep(0.01)
+    assert writer.client.writes == [(2000, [1, 1]), (2000, [0, 0])]  # 3000 is still being retried
+    writer.client.failing.clear()  # the next retry goes through, its reset is written on close
+    while (3000, [1]) not in writer.client.writes and time.time() < deadline:
+        time.sleep(0.01)
+    writer.close()
+    assert writer.client.writes[2:] == [(3000, [1]), (3000, [0])]
+
+
+def test_ring_reader_returns_each_frame_once():
+    """Test that a ring reader never returns a frame again after re-attaching, and follows a restarted writer."""
+    import os
+
+    import numpy as np
+
+    from frame_transport import FrameRing, RingReader
+
+    name = f"test_ring_{os.getpid()}"
+    ring = FrameRing.create(name, shape=(4, 4, 3))
+    try:
+        reader = RingReader(name, stale_after=0.0)  # re-attach whenever there is no new frame
+        ring.write(np.full((4, 4, 3), 1, dtype=np.uint8))
+        t, frame = reader.read()
+        assert frame is not None and frame[0, 0, 0] == 1 and t == reader.last_t
+        for _ in range(3):  # stale: detaches, re-attaches to the same segment, but the old frame is not returned
+            assert reader.read() == (None, None)
+        ring.close()  # the writer restarts with a new segment, its sequence numbers start over
+        ring = FrameRing.create(name, shape=(4, 4, 3))
+        ring.write(np.full((4, 4, 3), 2, dtype=np.uint8))
+        t2, frame = next(r for r in (reader.read() for _ in range(3)) if r[1] is not None)
+        assert frame[0, 0, 0] == 2 and t2 > t
+    finally:
+        reader.close()
+        ring.close()
+
+
+def test_server_stores_frames_at_their_capture_time(tmp_path, monkeypatch):
+    """Test that a ring frame is archived at the time the camera process wrote it, not at the time it was stored."""
+    import numpy as np
+
+    monkeypatch.chdir(tmp_path)  # the server module creates its frame directory on import
+    import server
+    from frame_archive import FrameArchive
+
+    monkeypatch.setattr(server, "archive", FrameArchive(tmp_path / "archive"))
+    monkeypatch.setattr(server, "INGEST_MODE", "archive")
+    t = 1718356806.25  # 2024-06-14, a capture time from the ring
+    server.store_frame(np.zeros((8, 8, 3), dtype=np.uint8), t=t)
+    now = time.time()
+    server.store_frame(jpeg=b"\xff\xd8" + bytes(16))  # uploads are stored at the time they arrive
+    server.archive.close()
+    assert [ts for ts, _ in server.archive.query(t - 1, t + 1)] == [t]
+    assert server.archive.frame_at(t + 60)[0] == t and server.archive.frame_at(t - 1) == (None, None)
+    assert now <= server.archive.frame_at(time.time())[0] <= time.time()
+
+    monkeypatch.setattr(server, "INGEST_MODE", "files")
+    assert server.store_frame(np.zeros((8, 8, 3), dtype=np.uint8), t=t).startswith(
+        f"{server.SAVE_DIR}/frame_{datetime.fromtimestamp(t):%Y%m%d_%H%M%S}"
+    )
+
+
+def test_server_async_camera_ids(tmp_path):
+    """Test that the asyncio frame server only creates channels and archives for valid camera ids."""
+    import asyncio
+
+    from aiohttp.test_utils import TestClient, TestServer
+
+    from server_async import FrameServer
+
+    jpeg = b"\xff\xd8" + bytes(16)
+
+    async def run(server):
+        async with TestClient(TestServer(server.app)) as client:
+            viewed = (await client.get("/video_feed/cam3")).status  # viewers do not create channels
+            uploaded = [(await client.post(f"/upload_frame/{c}", data=jpeg)).status for c in ("cam1", "cam-2", "a.b")]
+            return [viewed, *uploaded]
+
+    server = FrameServer(save_dir=str(tmp_path), ring_name=None)
+    assert asyncio.run(run(server)) == [404, 200, 200, 404]
+    assert set(server.channels) == {"cam1", "cam-2"} and sorted(p.name for p in tmp_path.iterdir()) == ["cam-2", "cam1"]
+    server = FrameServer(save_dir=None, ring_name=None, cameras=["cam1"])
+    assert asyncio.run(run(server)) == [404, 200, 404, 404] and set(server.channels) == {"cam1"}
+
+
+def test_latest_frame_drops_unread_frames():
+    """Test that a LatestFrame slot hands out only the newest frame and counts the ones overwritten before a read."""
+    from frame_capture import LatestFrame
+
+    slot = LatestFrame()
+    assert slot.get(timeout=0) == (None, None)
+    slot.put("a")
+    slot.put("b")  # "a" was never read
+    assert slot.get(timeout=0) == (2, "b") and slot.dropped == 1
+    assert slot.get(timeout=0) == (None, None)  # "b" is not handed out twice
+    slot.put("c")  # "b" was read, nothing dropped
+    threading.Timer(0.05, slot.get).start()
+    slot.put("d", block=True)  # waits for "c" to be read instead of dropping it
+    assert slot.dropped == 1 and slot.get(timeout=1) == (4, "d")
+    slot.close()
+    assert slot.get() == (None, None)
+
+
+def test_pipeline_overflow_policies():
+    """Test the block, drop_oldest and drop_newest policies of the bounded pipeline queues."""
+    import pytest
+
+    from pipeline import BLOCK, DROP_NEWEST, DROP_OLDEST, BoundedQueue
+
+    with pytest.raises(ValueError):
+        BoundedQueue(2, "drop_random")
+    for policy, kept in (DROP_OLDEST, [2, 3]), (DROP_NEWEST, [1, 2]):
+        queue = BoundedQueue(2, policy)
+        assert [queue.put(i) for i in (1, 2, 3)] == [True, True, policy == DROP_OLDEST]
+        assert [queue.get(timeout=0) for _ in range(3)] == [*kept, None] and queue.dropped == 1
+        assert queue.high_water == 2
+    queue = BoundedQueue(1, BLOCK)
+    assert queue.put(1) and not queue.put(2, timeout=0.01)  # full, times out instead of dropping
+    threading.Timer(0.05, queue.get).start()
+    assert queue.put(3, timeout=5) and queue.get(timeout=0) == 3 and queue.dropped == 0
+
+
+def test_pipeline_stage_errors():
+    """Test that an item whose stage raises is counted as an error and dropped, without stopping the pipeline."""
+    from pipeline import Pipeline
+
+    out = []
+
+    def invert(x):
+        return 1 / x
+
+    pipeline = Pipeline().add_stage("invert", invert, maxsize=4).add_stage("collect", out.append, maxsize=4).start()
+    for x in (1, 0, 2, 4):
+        pipeline.put(x)
+    pipeline.close(timeout=5)
+    assert out == [1.0, 0.5, 0.25]
+    stats = pipeline.stats()
+    assert (stats["invert"]["count"], stats["invert"]["errors"], stats["collect"]["count"]) == (4, 1, 3)
+    assert stats["invert"]["dropped"] == stats["collect"]["errors"] == 0
+
+
+def test_motion_gate_hangover():
+    """Test that the motion gate opens on motion in its band and stays open for the hang-over period."""
+    import numpy as np
+
+    from motion_gate import MotionGate, line_band
+
+    assert line_band([(20, 50), (80, 50)], (100, 100), margin=0.1) == (10, 40, 90, 60)
+    gate = MotionGate(band=(0, 40, 100, 60), hangover=2.0)
+    empty = np.zeros((100, 100, 3), dtype=np.uint8)
+    outside, inside = empty.copy(), empty.copy()
+    outside[:20] = 255  # motion above the band
+    inside[45:55, 40:60] = 255
+    assert gate.update(empty, t=0.0)  # open until there is a background to compare against
+    assert gate.update(outside, t=2.5) is False
+    assert gate.update(inside, t=3.0) and gate.motion > gate.min_area
+    assert gate.update(empty, t=5.0)  # held open 2 s after the last motion
+    assert not gate.update(empty, t=5.1)
+    assert (gate.checked, gate.opened) == (5, 3)
+    gate.reset()
+    assert gate.update(empty, t=6.0)
+
+
+class FakeCapture:
+    """FrameCapture stand-in whose connection attempts fail until `FakeCapture.failures` runs out."""
+
+    failures = 0
+
+    def __init__(self, source, **kwargs):
+        """Opens unless failures are left."""
+        self.opened = FakeCapture.failures <= 0
+        FakeCapture.failures -= 1
+        self.dropped = 0
+
+    def isOpened(self):
+        """Returns whether the connection attempt succeeded."""
+        return self.opened
+
+    def get(self, prop_id):
+        """Reports 25 fps for every property."""
+        return 25.0
+
+    def release(self):
+        """Does nothing."""
+
+
+def test_stream_supervisor_backoff(monkeypatch):
+    """Test the exponential reconnect backoff of the stream supervisor and its reset after a stable connection."""
+    import stream_supervisor
+
+    monkeypatch.setattr(stream_supervisor, "FrameCapture", FakeCapture)
+    supervisor = stream_supervisor.StreamSupervisor("rtsp://camera", backoff=1.0, backoff_max=8.0, jitter=0.0)
+    delays = []
+    monkeypatch.setattr(supervisor.stop_event, "wait", lambda delay: delays.append(delay))
+    FakeCapture.failures = 5
+    assert supervisor.open(start=False) is not None
+    assert delays == [1.0, 2.0, 4.0, 8.0, 8.0] and supervisor.failures == 5  # doubled up to backoff_max
+
+    supervisor.last_frame_at = supervisor.connected_at + 10.0  # dropped before stable_after
+    supervisor._disconnected("no frame")
+    assert supervisor.attempt == 6 and supervisor.delay() == 8.0
+    supervisor.open(start=False)
+    supervisor.last_frame_at = supervisor.connected_at + 60.0  # stable, the next reconnect starts over
+    supervisor._disconnected("no frame")
+    assert supervisor.attempt == 1 and supervisor.delay() == 1.0
+    assert supervisor.connections == 2 and supervisor.reconnects == 1
+
+    supervisor.jitter = 0.5
+    assert all(0.5 <= supervisor.delay() <= 1.5 for _ in range(100))
+
+
+def test_metrics_render():
+    """Test the Prometheus text rendering of counters, function gauges and cumulative histogram buckets."""
+    import urllib.request
+
+    import pytest
+
+    from metrics import Registry
+
+    registry = Registry(prefix="cam_")
+    counts = registry.counter("counts_total", "Line crossings", labels=("direction",))
+    counts.inc(direction="in")
+    counts.inc(2, direction='o"ut')
+    registry.gauge("queue_depth", "Queued items").set_function(lambda: 3)
+    registry.gauge("broken", "Source gone").set_function(lambda: 1 / 0)  # skipped, the scrape still works
+    latency = registry.histogram("stage_seconds", "Stage latency", labels=("stage",), buckets=(0.01, 0.1))
+    for value in 0.005, 0.01, 0.05, 2.0:
+        latency.observe(value, stage="infer")
+    assert registry.render() == "\n".join(
+        (
+            "# HELP cam_counts_total Line crossings",
+            "# TYPE cam_counts_total counter",
+            'cam_counts_total{direction="in"} 1',
+            'cam_counts_total{direction="o\\"ut"} 2',
+            "# HELP cam_queue_depth Queued items",
+            "# TYPE cam_queue_depth gauge",
+            "cam_queue_depth 3",
+            "# HELP cam_broken Source gone",
+            "# TYPE cam_broken gauge",
+            "# HELP cam_stage_seconds Stage latency",
+            "# TYPE cam_stage_seconds histogram",
+            'cam_stage_seconds_bucket{stage="infer",le="0.01"} 2',  # bounds are inclusive
+            'cam_stage_seconds_bucket{stage="infer",le="0.1"} 3',
+            'cam_stage_seconds_bucket{stage="infer",le="+Inf"} 4',
+            'cam_stage_seconds_sum{stage="infer"} 2.065',
+            'cam_stage_seconds_count{stage="infer"} 4',
+            "",
+        )
+    )
+    with pytest.raises(ValueError):
+        counts.inc(stage="infer")
+    with pytest.raises(ValueError):
+        registry.gauge("counts_total")
+
+    server = registry.serve(port=0, host="127.0.0.1")
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_port}/metrics") as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert response.read().decode() == registry.render()
+    finally:
+        server.shutdown()
+
+
+def test_frame_capture_position(tmp_path):
+    """Test that a lossless capture reports the stream index of every decoded frame, the video clock of replays."""
+    import cv2
+    import numpy as np
+
+    from frame_capture import FrameCapture
+
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 25, (32, 32))
+    for i in range(10):
+        writer.write(np.full((32, 32, 3), 20 * i, dtype=np.uint8))
+    writer.release()
+    capture = FrameCapture(path, frame_skip=3, lossless=True).start()
+    positions = []
+    while True:
+        success, frame = capture.read()
+        if not success:
+            break
+        positions.append(capture.position)
+    capture.release()
+    assert positions == [2, 5, 8]
+
+
+def test_multi_cam_counts_per_camera(tmp_path, monkeypatch):
+    """Test that two streams batched through one model are tracked and counted by their own camera's channel."""
+    from functools import partial
+
+    import cv2
+    import numpy as np
+    import torch
+
+    import multi_cam
+    from ultralytics.data.loaders import LoadStreams
+
+    sources = []
+    for name, direction in ("down", 1), ("up", -1):  # one person crossing the line each way
+        path = str(tmp_path / f"{name}.avi")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 25, (320, 240))
+        for i in range(30):
+            y = 120 - direction * (80 - 6 * i)  # centre crosses the line at y = 0.565 * 240
+            im = np.zeros((240, 320, 3), dtype=np.uint8)
+            im[y - 20 : y + 20, 140 - 10 * direction : 180 - 10 * direction] = 255
+            writer.write(im)
+        writer.release()
+        sources.append(path)
+
+    def detect_white(predictor):
+        """Replaces the untrained model's detections with the box of the white person in every frame."""
+        for result in predictor.results:
+            ys, xs = np.nonzero(result.orig_img[..., 0] > 127)
+            box = [[xs.min(), ys.min(), xs.max() + 1, ys.max() + 1, 0.9, 0]] if len(xs) else []
+            result.update(boxes=torch.tensor(box, dtype=torch.float32).reshape(-1, 6))
+
+    monkeypatch.setattr(multi_cam, "LoadStreams", partial(LoadStreams, buffer=True))  # every frame, in order
+    cfg = {
+        "model": "yolov8n.yaml",
+        "imgsz": 160,
+        "frame_skip": 1,
+        "cameras": [
+            {"name": name, "source": s, "recordings": str(tmp_path / name), "modbus": {"host": "127.0.0.1"}}
+            for name, s in zip(("down", "up"), sources)
+        ],
+    }
+    counter = multi_cam.MultiCameraCounter(cfg)
+    counter.model.add_callback("on_predict_postprocess_end", detect_white)  # runs before the tracker update
+    counter.run()
+    down, up = (c.counter for c in counter.channels)
+    assert len(counter.model.predictor.trackers) == 2
+    assert (down.in_counts, down.out_counts) == (up.out_counts, up.in_counts) and down.in_counts + down.out_counts == 1
+    assert [(c.last_num_entered, c.last_num_left) for c in counter.channels] == [
+        (down.in_counts, down.out_counts),
+        (up.in_counts, up.out_counts),
+    ]
@@ -412,6 +412,209 @@ def test_utils_ops():
     torch.allclose(boxes, xyxyxyxy2xywhr(xywhr2xyxyxyxy(boxes)), rtol=1e-3)
 
 
+def test_solutions_line_crossing():
+    """Test the vectorized line crossing, distance and point-in-polygon helpers used by ObjectCounter."""
+    from ultralytics.solutions.line_crossing import distance_to_segment, points_in_polygon, segment_crossings
+
+    line = [(0, 100), (200, 100)]  # horizontal, drawn left to right
+    prev = np.array([[50, 150], [50, 50], [50, 150], [300, 150], [50, 100], [100, 400]])
+    curr = np.array([[50, 50], [50, 150], [60, 120], [300, 50], [50, 50], [100, -200]])
+    # up (IN), down (OUT), no crossing, past the end of the line, from on the line upwards, large jump (frame skip)
+    assert segment_crossings(prev, curr, line).tolist() == [1, -1, 0, 0, 0, 1]
+    # Reversed line: directions flip and points on the line now belong to the lower side
+    assert segment_crossings(prev, curr, line[::-1]).tolist() == [-1, 1, 0, 0, -1, -1]
+    assert segment_crossings([[0, 0]], [[10, 10]], [(0, 10), (10, 0)]).tolist() == [-1]  # diagonal line
+    assert np.allclose(distance_to_segment([[100, 90], [-30, 140], [100, 100]], line), [10, 50, 0])
+
+    square = [(0, 0), (10, 0), (10, 10), (0, 10)]
+    assert points_in_polygon([[5, 5], [15, 5], [-1, -1], [9.9, 0.1]], square).tolist() == [True, False, False, True]
+
+
+def test_solutions_region_counter():
+    """Test counting over several lines and zones in one pass."""
+    from ultralytics.solutions.region_counter import RegionCounter
+
+    regions = {"a": [(0, 100), (200, 100)], "b": [(300, 100), (500, 100)], "zone": [(600, 0), (800, 0), (800, 200)]}
+    counter = RegionCounter({0: "person", 1: "car"}, regions, headless=True)
+    assert counter.update([1, 2, 3], [0, 1, 0], [[50, 150], [400, 50], [550, 10]], t=0) == []
+    counter.update([1, 2, 3], [0, 1, 0], [[50, 50], [400, 150], [790, 10]], t=1)
+    counter.update([1, 2, 3], [0, 1, 0], [[50, 150], [400, 50], [900, 10]], t=2)
+    events = [(e.track_id, e.cls, e.region, e.direction) for e in counter.events.read()[0]]
+    assert events == [(1, 0, "a", "IN"), (2, 1, "b", "OUT"), (3, 0, "zone", "IN")] + [
+        (1, 0, "a", "OUT"),
+        (2, 1, "b", "IN"),
+        (3, 0, "zone", "OUT"),
+    ]
+    assert counter.update([1], [0], [[50, 50]], t=3) == []  # counted once per region and direction
+    assert counter.counts.sum() == 6 and counter.region_counts()["b"] == {"car": {"IN": 1, "OUT": 1}}
+
+
+def test_solutions_zone_occupancy():
+    """Test incremental zone occupancy and dwell time statistics."""
+    from ultralytics.solutions.zone_occupancy import ZoneOccupancy
+
+    zones = {"desk": [(0, 0), (100, 0), (100, 100), (0, 100)], "queue": [(200, 0), (300, 0), (300, 100), (200, 100)]}
+    occupancy = ZoneOccupancy({0: "person"}, zones, headless=True, track_ttl=10)
+    occupancy.update([1, 2], [0, 0], [[50, 50], [500, 500]], t=0)
+    occupancy.update([1, 2], [0, 0], [[60, 50], [250, 50]], t=4)
+    occupancy.update([1, 2], [0, 0], [[250, 50], [250, 60]], t=12)  # 1 moves from the desk to the queue
+    assert occupancy.occupancy.tolist() == [0, 2] and occupancy.visits.tolist() == [1, 0]
+    assert [e.direction for e in occupancy.evict([2])] == ["OUT"]  # removed by the tracker after 8 s in the queue
+    occupancy.update([], [], np.zeros((0, 2)), t=40)  # 1 expires, its visit ends when it was last seen
+    stats = occupancy.stats(t=40)
+    assert stats["desk"]["mean_dwell"] == 12 and stats["queue"]["visits"] == 2 and stats["queue"]["max_dwell"] == 8
+    assert occupancy.histogram[1, :2].tolist() == [1, 1] and not occupancy.state and not occupancy.occupancy.any()
+
+
+def test_solutions_heatmap():
+    """Test heat accumulation, spreading and lazy decay of the heatmap."""
+    from ultralytics.solutions.heatmap import Heatmap
+
+    boxes = [[0, 0, 32, 32], [96, 96, 160, 128]]
+    for mode in "feet", "centroid", "box":
+        heatmap = Heatmap(cell=16, half_life=10, mode=mode, headless=True)
+        heatmap.update(boxes, (480, 640, 3), t=0)
+        assert heatmap.grid.shape == (30, 40) and np.isclose(heatmap.heat(t=10).sum(), 1.0)  # 2 units, one half-life
+    assert np.allclose(heatmap.heat(t=10)[6:8, 6:10], 0.5 / 8)  # the second box spread over its 2 x 4 cells
+    heatmap.update(boxes, (480, 640, 3), t=200)  # renormalizes the grid once the scale gets small
+    assert heatmap.scale == 1.0 and np.isclose(heatmap.heat(t=200).sum(), 2.0, atol=1e-3)
+    im = np.zeros((480, 640, 3), dtype=np.uint8)
+    assert heatmap.render(im).any() and not im.any()  # blended into a copy
+
+
+def test_solutions_overlay_layer():
+    """Test that a cached overlay layer paints the same pixels as drawing directly."""
+    from ultralytics.solutions.count_renderer import OverlayLayer
+
+    def draw(im):
+        cv2.polylines(im, [np.array([(10, 20), (150, 60)], dtype=np.int32)], isClosed=True, color=(255, 0, 255))
+        cv2.rectangle(im, (15, 70), (120, 100), (255, 255, 255), -1)
+        cv2.putText(im, "IN 3 OUT 1", (20, 90), 0, 0.6, (0, 0, 0), 1, lineType=cv2.LINE_AA)  # AA over the box
+
+    im = np.random.randint(0, 255, (120, 160, 3), dtype=np.uint8)
+    expected = im.copy()
+    draw(expected)
+    layer = OverlayLayer(("key",), im.shape, draw)
+    assert layer.box[0] >= 20 and layer.box[2] >= 10  # only the painted crop is kept
+    assert (layer.apply(im) == expected).all()
+
+
+def test_solutions_count_events():
+    """Test cursor reads, callbacks and overflow of the count event log."""
+    from ultralytics.solutions.count_events import EventLog
+
+    log, seen = EventLog(capacity=3), []
+    log.add_callback(seen.append)
+    cursor = log.cursor()
+    for i in range(2):
+        log.append(i, 0, "line", "IN")
+    assert [e.track_id for e in cursor] == [0, 1] and list(cursor) == [] and len(seen) == 2
+    for i in range(2, 7):
+        log.append(i, 0, "line", "OUT")
+    assert [e.track_id for e in cursor.read(limit=2)] == [4, 5] and cursor.missed == 2 and cursor.pending() == 1
+    events, position = log.read(cursor=5)
+    assert [e.seq for e in events] == [5, 6] and position == 7 == log.head
+
+
+def test_trackers_track_table():
+    """Test that BYTETracker keeps ids through the track table, reports removals and reuses freed rows."""
+    from types import SimpleNamespace
+
+    from ultralytics.trackers import BYTETracker
+
+    args = SimpleNamespace(track_high_thresh=0.5, track_low_thresh=0.1, new_track_thresh=0.6, track_buffer=3)
+    tracker = BYTETracker(SimpleNamespace(**vars(args), match_thresh=0.8), frame_rate=30)
+    ids, removed = [], []
+    for frame in range(40):
+        n = 2 if frame < 20 else 1  # the second object leaves after 20 frames
+        xywh = np.array([[100 + 5 * frame, 100, 40, 80], [400, 300 - 4 * frame, 60, 60]][:n], dtype=np.float32)
+        results = SimpleNamespace(xywh=xywh, conf=np.full(n, 0.9, dtype=np.float32), cls=np.zeros(n, dtype=np.float32))
+        tracks = tracker.update(results)
+        ids.append(tracks[:, 4].tolist() if len(tracks) else [])
+        removed.append(tracker.removed_ids)
+    assert ids[1] == [1.0, 2.0] and ids[-1] == [1.0]
+    assert next(f for f, r in enumerate(removed) if r) == 23 and removed[23] == [2]  # lost for more than track_buffer
+    assert len(tracker.tracked_stracks) == 1 and tracker.tracked_stracks[0].track_id == 1
+    assert tracker.table.capacity == 64 and len(tracker.table.free_rows) == 63  # detection rows were recycled
+
+
+def test_trackers_set_frame_rate():
+    """Test that a tracker created at a low rate keeps lost tracks, and that rate changes rescale the velocities."""
+    from types import SimpleNamespace
+
+    from ultralytics.trackers import BYTETracker
+
+    args = SimpleNamespace(track_high_thresh=0.5, track_low_thresh=0.1, new_track_thresh=0.6, track_buffer=30)
+    args.match_thresh = 0.8
+    assert BYTETracker(args, frame_rate=1.7).max_time_lost == 2  # >= 1 s as at 30 fps, never 0 frames
+    assert BYTETracker(args, frame_rate=0.5).max_time_lost == 1
+    tracker = BYTETracker(args, frame_rate=2)
+    for frame in range(3):
+        xywh = np.array([[100 + 20 * frame, 100, 40, 80]], dtype=np.float32)
+        tracker.update(SimpleNamespace(xywh=xywh, conf=np.array([0.9], np.float32), cls=np.zeros(1, np.float32)))
+    row = tracker.tracked[0]
+    mean, covariance = tracker.table.mean[row].copy(), tracker.table.covariance[row].copy()
+    tracker.set_frame_rate(4)  # half the frame interval, half the velocity per frame
+    assert np.allclose(tracker.table.mean[row, :4], mean[:4]) and np.allclose(tracker.table.mean[row, 4:], mean[4:] / 2)
+    assert np.allclose(tracker.table.covariance[row, 4:, 4:], covariance[4:, 4:] / 4)
+    assert np.allclose(tracker.table.covariance[row, :4, 4:], covariance[:4, 4:] / 2)
+    assert tracker.max_time_lost == 4
+
+
+def test_predict_roi():
+    """Test that predictions on a region of interest are mapped back to full-frame coordinates, masks included."""
+    from ultralytics.utils import ops
+
+    im = cv2.imread(str(ASSETS / "bus.jpg"))
+    x1, y1, x2, y2 = 100, 200, 740, 840
+    for cfg in "yolov8n.yaml", "yolov8n-seg.yaml":
+        model = YOLO(cfg)
+        crop = model(im[y1:y2, x1:x2], imgsz=320, conf=1e-4)[0]  # untrained, only low-confidence boxes
+        result = model(im, imgsz=320, conf=1e-4, roi=(x1, y1, x2, y2))[0]
+        assert result.orig_shape == im.shape[:2] and len(result.boxes) == len(crop.boxes) > 0
+        assert torch.allclose(result.boxes.xyxy, crop.boxes.xyxy + torch.tensor([x1, y1, x1, y1]))
+        if cfg.endswith("-seg.yaml"):
+            masks = result.masks.data
+            assert masks.shape[1:] == im.shape[:2] and masks[:, :y1].sum() == masks[:, :, x2:].sum() == 0
+            assert torch.equal(masks[:, y1:y2, x1:x2], ops.scale_masks(crop.masks.data[None], (640, 640))[0].gt_(0.5))
+
+
+def test_predict_budget():
+    """Test that a pixel budget gives the stride-aligned inference shape with the largest scale, reported in speed."""
+    model = YOLO(CFG)
+    im = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    assert model(im, budget=640 * 384)[0].speed["imgsz"] == (384, 640)  # 360x640 resized, padded to the stride
+    predictor = model.predictor
+    assert predictor.budget_shape((1920, 1080)) == (640, 384)
+    assert predictor.budget_shape((480, 640)) == (416, 576)  # 416x555 resized, wider shapes would shrink it more
+    assert predictor.budget_shape((100, 100)) == (128, 128)  # never upsampled
+    predictor.args.budget = 10000
+    assert predictor.budget_shape((100, 100)) == (96, 96)  # no room for the stride padding
+
+
+def test_stream_session_track():
+    """Test that a tracking session runs the model's callbacks and keeps track ids across pushed frames."""
+    model = YOLO(CFG)
+
+    def confident(predictor):
+        """Raises the confidences of the untrained model's boxes, the tracker starts no tracks from low ones."""
+        for result in predictor.results:
+            boxes = result.boxes.data.clone()
+            boxes[:, 4] = 0.9
+            result.update(boxes=boxes)
+
+    model.add_callback("on_predict_postprocess_end", confident)
+    n_callbacks = {k: len(v) for k, v in model.callbacks.items()}
+    session = model.stream_session(mode="track", conf=1e-4, max_det=5, verbose=False)
+    im = cv2.imread(str(ASSETS / "bus.jpg"))
+    results = [session.push(im) for _ in range(3)]
+    session.close()
+    assert all("track" in r.speed for r in results)
+    ids = [sorted(r.boxes.id.tolist()) for r in results]
+    assert len(ids[0]) > 0 and ids[0] == ids[1] == ids[2]
+    assert {k: len(v) for k, v in model.callbacks.items()} == n_callbacks  # the session's tracker is its own
+
+
 def test_utils_files():
     """Test file handling utilities."""
     from ultralytics.utils.files import file_age, file_date, get_latest_run, spaces_in_path
@@ -140,6 +140,7 @@ CFG_INT_KEYS = {  # integer-only arguments
     "mask_ratio",
     "max_det",
     "vid_stride",
+    "budget",
     "line_width",
     "nbs",
     "save_period",
@@ -35,7 +35,8 @@ class LoadStreams:
     Stream Loader for various types of video streams, Supports RTSP, RTMP, HTTP, and TCP streams.
 
     Attributes:
-        sources (str): The source input paths or URLs for the video streams.
+        sources (str | list): The source input paths or URLs for the video streams, a *.streams file listing them or
+            a list of them.
         vid_stride (int): Video frame-rate stride, defaults to 1.
         buffer (bool): Whether to buffer input streams, defaults to False.
         running (bool): Flag to indicate if the streaming thread is running.
@@ -70,7 +71,10 @@ class LoadStreams:
         self.mode = "stream"
         self.vid_stride = vid_stride  # video frame-rate stride
 
-        sources = Path(sources).read_text().rsplit() if os.path.isfile(sources) else [sources]
+        if isinstance(sources, (list, tuple)):
+            sources = [str(x) for x in sources]
+        else:
+            sources = Path(sources).read_text().rsplit() if os.path.isfile(sources) else [sources]
         n = len(sources)
         self.bs = n
         self.fps = [0] * n  # frames per second
@@ -505,6 +509,57 @@ class LoadTensor:
         return self.bs
 
 
+class LoadPushedFrames:
+    """
+    Stream of single frames pushed in by the caller, used by PredictorSession to keep one predictor stream open.
+
+    Each put() makes one frame available and the next iteration returns it, the iteration ends after close().
+
+    Attributes:
+        paths (list): Autogenerated filename of the stream.
+        im0 (list): The frame waiting to be processed, empty if there is none.
+        mode (str): Current mode, set to 'stream'.
+        bs (int): Batch size, always 1.
+        count (int): Number of frames returned so far.
+        source_type (SourceTypes): Source type, a stream.
+    """
+
+    def __init__(self):
+        """Initialize an empty pushed-frame stream."""
+        self.paths = ["stream0.jpg"]
+        self.im0 = []
+        self.mode = "stream"
+        self.bs = 1
+        self.count = 0
+        self.closed = False
+        self.source_type = SourceTypes(stream=True)
+
+    def put(self, im):
+        """Make `im` (np.ndarray or PIL image) the next frame."""
+        self.im0 = [LoadPilAndNumpy._single_check(im)]
+
+    def close(self):
+        """End the stream."""
+        self.closed = True
+        self.im0 = []
+
+    def __iter__(self):
+        """Returns an iterator object."""
+        return self
+
+    def __next__(self):
+        """Returns the pushed frame as a batch of paths, images and an empty string, stops if there is none."""
+        if self.closed or not self.im0:
+            raise StopIteration
+        im0, self.im0 = self.im0, []
+        self.count += 1
+        return self.paths, im0, [""]
+
+    def __len__(self):
+        """Returns the batch size."""
+        return self.bs
+
+
 def autocast_list(source):
     """Merges a list of source of different types into a list of numpy arrays or PIL images."""
     files = []
@@ -572,4 +627,4 @@ def get_best_youtube_url(url, method="pytube"):
 
 
 # Define constants
-LOADERS = (LoadStreams, LoadPilAndNumpy, LoadImagesAndVideos, LoadScreenshots)
+LOADERS = (LoadStreams, LoadPilAndNumpy, LoadImagesAndVideos, LoadScreenshots, LoadPushedFrames)
@@ -1,6 +1,7 @@
 # Ultralytics YOLO 🚀, AGPL-3.0 license
 
 import inspect
+from collections import defaultdict
 from pathlib import Path
 from typing import List, Union
 
@@ -492,6 +493,46 @@ class Model(nn.Module):
         kwargs["mode"] = "track"
         return self.predict(source=source, stream=stream, **kwargs)
 
+    def stream_session(self, mode: str = "track", frame_rate: float = 30, **kwargs):
+        """
+        Opens a persistent session that runs prediction or tracking on frames pushed one at a time.
+
+        Unlike calling predict() or track() for every frame, the configuration, source, profilers and trackers are set
+        up once, so each push only pays for preprocess, inference, postprocess and the tracker update. The session uses
+        its own predictor, separate from `self.predictor`, and tracking persists for its lifetime.
+
+        Args:
+            mode (str): 'track' or 'predict'. Defaults to 'track'.
+            frame_rate (float): Rate in frames per second at which frames will be pushed, sets the trackers' motion
+                model and lost-track buffer. Defaults to 30.
+            **kwargs (any): Prediction arguments, as for predict() and track().
+
+        Returns:
+            (PredictorSession): Session with push(frame) -> Results and close().
+
+        Examples:
+            >>> session = model.stream_session(mode="track", classes=[0], verbose=False)
+            >>> results = session.push(frame)
+        """
+        from ultralytics.engine.predictor import PredictorSession
+        from ultralytics.trackers import register_tracker
+        from ultralytics.trackers.track import on_predict_postprocess_end, on_predict_start
+
+        assert mode in {"track", "predict"}, f"mode must be 'track' or 'predict', but got '{mode}'"
+        custom = {"conf": 0.1 if mode == "track" else 0.25, "batch": 1, "save": False, "mode": mode}
+        args = {**self.overrides, **custom, **kwargs}  # highest priority args on the right
+        # The model's callbacks, copied so the session's tracker is not added to them, without the tracker of track()
+        tracking = {on_predict_start, on_predict_postprocess_end}
+        _callbacks = defaultdict(list)
+        for event, funcs in self.callbacks.items():
+            _callbacks[event] = [f for f in funcs if getattr(f, "func", f) not in tracking]
+        predictor = self._smart_load("predictor")(overrides=args, _callbacks=_callbacks)
+        predictor.setup_model(model=self.model, verbose=False)
+        if mode == "track":
+            predictor.track_frame_rate = frame_rate  # read when the trackers are created on the first push
+            register_tracker(predictor, persist=True)
+        return PredictorSession(predictor)
+
     def val(
         self,
         validator=None,
@@ -29,6 +29,7 @@ Usage - formats:
                               yolov8n_ncnn_model         # NCNN
 """
 
+import math
 import platform
 import re
 import threading
@@ -41,6 +42,8 @@ import torch
 from ultralytics.cfg import get_cfg, get_save_dir
 from ultralytics.data import load_inference_source
 from ultralytics.data.augment import LetterBox, classify_transforms
+from ultralytics.data.loaders import LoadPushedFrames
+from ultralytics.engine.results import Keypoints
 from ultralytics.nn.autobackend import AutoBackend
 from ultralytics.utils import DEFAULT_CFG, LOGGER, MACOS, WINDOWS, callbacks, colorstr, ops
 from ultralytics.utils.checks import check_imgsz, check_imshow
@@ -151,14 +154,101 @@ class BasePredictor:
         Returns:
             (list): A list of transformed images.
         """
+        if self.args.budget and self.model.pt:  # one resize from the source to the largest size within the budget
+            shape = np.max([x.shape[:2] for x in im], axis=0)
+            letterbox = LetterBox(self.budget_shape(shape), auto=False, scaleup=False, stride=self.model.stride)
+            return [letterbox(image=x) for x in im]
         same_shapes = len({x.shape for x in im}) == 1
         letterbox = LetterBox(self.imgsz, auto=same_shapes and self.model.pt, stride=self.model.stride)
         return [letterbox(image=x) for x in im]
 
+    def budget_shape(self, shape):
+        """
+        Returns the stride-aligned inference shape with at most `budget` pixels that fits `shape` at the largest scale.
+
+        Every stride-aligned height is tried with the widest width within the budget, the image is never upsampled.
+
+        Args:
+            shape (tuple): Source image shape (h, w).
+
+        Returns:
+            (tuple): Inference shape (h, w), multiples of the model stride.
+        """
+        stride = int(self.model.stride)
+        h, w = (int(x) for x in shape)
+        best_r, best_shape = 0.0, (stride, stride)
+        for sh in range(stride, math.ceil(h / stride) * stride + 1, stride):  # every height, widest width within budget
+            sw = min(max(self.args.budget // sh // stride, 1) * stride, math.ceil(w / stride) * stride)
+            r = min(sh / h, sw / w, 1.0)  # letterbox scale of the image in (sh, sw)
+            if r > best_r:
+                best_r = r
+                # Only the stride padding around the resized image, the other side may be wider than needed
+                best_shape = tuple(min(math.ceil(round(x * r, 6) / stride) * stride, y) for x, y in ((h, sh), (w, sw)))
+        return best_shape
+
     def postprocess(self, preds, img, orig_imgs):
         """Post-processes predictions for an image and returns them."""
         return preds
 
+    def crop_roi(self, im0s):
+        """
+        Crop the `roi` region of interest out of each input image.
+
+        Args:
+            im0s (List(np.ndarray)): [(h, w, 3) x N] original images.
+
+        Returns:
+            (tuple): List of cropped images and list of their (x, y) offsets in the original images.
+        """
+        if isinstance(im0s, torch.Tensor):
+            raise TypeError("'roi' is not supported for torch.Tensor sources, crop the tensor before inference instead")
+        crops, offsets = [], []
+        for im in im0s:
+            h, w = im.shape[:2]
+            x1, y1, x2, y2 = self.args.roi
+            if max(self.args.roi) <= 1:  # normalized
+                x1, y1, x2, y2 = x1 * w, y1 * h, x2 * w, y2 * h
+            x1, y1, x2, y2 = max(int(x1), 0), max(int(y1), 0), min(round(x2), w), min(round(y2), h)
+            if x2 <= x1 or y2 <= y1:
+                raise ValueError(f"'roi={self.args.roi}' does not overlap the {w}x{h} image")
+            crops.append(im[y1:y2, x1:x2])
+            offsets.append((x1, y1))
+        return crops, offsets
+
+    def uncrop_results(self, im0s, offsets):
+        """
+        Map results computed on crop_roi() crops back to the original images, as ops.scale_boxes() does for letterbox.
+
+        Args:
+            im0s (List(np.ndarray)): [(h, w, 3) x N] original images.
+            offsets (list): (x, y) offset of each crop in its original image.
+        """
+        for result, im0, (x, y) in zip(self.results, im0s, offsets):
+            crop_shape = result.orig_shape
+            result.orig_img, result.orig_shape = im0, im0.shape[:2]
+            if result.masks is not None:  # letterboxed (or crop-sized with retina_masks) masks, padded to the image
+                masks = result.masks.data
+                if masks.shape[1:] != crop_shape:
+                    masks = ops.scale_masks(masks[None], crop_shape)[0].gt_(0.5)
+                full = masks.new_zeros((masks.shape[0], *result.orig_shape))
+                full[:, y : y + crop_shape[0], x : x + crop_shape[1]] = masks
+                result.update(masks=full)
+            if result.boxes is not None:
+                boxes = result.boxes.data.clone()
+                boxes[:, [0, 2]] += x
+                boxes[:, [1, 3]] += y
+                result.update(boxes=boxes)
+            if result.obb is not None:
+                obb = result.obb.data.clone()
+                obb[:, 0] += x
+                obb[:, 1] += y
+                result.update(obb=obb)
+            if result.keypoints is not None:
+                keypoints = result.keypoints.data.clone()
+                keypoints[..., 0] += x
+                keypoints[..., 1] += y
+                result.keypoints = Keypoints(keypoints, result.orig_shape)
+
     def __call__(self, source=None, model=None, stream=False, *args, **kwargs):
         """Performs inference on an image or stream."""
         self.stream = stream
@@ -186,6 +276,8 @@ class BasePredictor:
     def setup_source(self, source):
         """Sets up source and inference mode."""
         self.imgsz = check_imgsz(self.args.imgsz, stride=self.model.stride, min_dim=2)  # check image size
+        if self.args.budget and not self.model.pt and not self.done_warmup:
+            LOGGER.warning("WARNING ⚠️ 'budget' requires a PyTorch model with dynamic input shapes, using 'imgsz'.")
         self.transforms = (
             getattr(
                 self.model.model,
@@ -239,6 +331,7 @@ class BasePredictor:
                 ops.Profile(device=self.device),
                 ops.Profile(device=self.device),
                 ops.Profile(device=self.device),
+                ops.Profile(device=self.device),  # postprocess callbacks, i.e. the tracker update
             )
             self.run_callbacks("on_predict_start")
             for self.batch in self.dataset:
@@ -247,7 +340,8 @@ class BasePredictor:
 
                 # Preprocess
                 with profilers[0]:
-                    im = self.preprocess(im0s)
+                    crops, offsets = self.crop_roi(im0s) if self.args.roi else (im0s, None)
+                    im = self.preprocess(crops)
 
                 # Inference
                 with profilers[1]:
@@ -258,8 +352,11 @@ class BasePredictor:
 
                 # Postprocess
                 with profilers[2]:
-                    self.results = self.postprocess(preds, im, im0s)
-                self.run_callbacks("on_predict_postprocess_end")
+                    self.results = self.postprocess(preds, im, crops)
+                    if offsets is not None:
+                        self.uncrop_results(im0s, offsets)  # full-image coordinates for tracking and plotting
+                with profilers[3]:
+                    self.run_callbacks("on_predict_postprocess_end")
 
                 # Visualize, save, write results
                 n = len(im0s)
@@ -269,7 +366,10 @@ class BasePredictor:
                         "preprocess": profilers[0].dt * 1e3 / n,
                         "inference": profilers[1].dt * 1e3 / n,
                         "postprocess": profilers[2].dt * 1e3 / n,
+                        "imgsz": tuple(im.shape[2:]),  # inference shape (h, w)
                     }
+                    if getattr(self, "trackers", None):
+                        self.results[i].speed["track"] = profilers[3].dt * 1e3 / n
                     if self.args.verbose or self.args.save or self.args.save_txt or self.args.show:
                         s[i] += self.write_results(i, Path(paths[i]), im, s)
 
@@ -287,7 +387,7 @@ class BasePredictor:
 
         # Print final results
         if self.args.verbose and self.seen:
-            t = tuple(x.t / self.seen * 1e3 for x in profilers)  # speeds per image
+            t = tuple(x.t / self.seen * 1e3 for x in profilers[:3])  # speeds per image
             LOGGER.info(
                 f"Speed: %.1fms preprocess, %.1fms inference, %.1fms postprocess per image at shape "
                 f"{(min(self.args.batch, self.seen), 3, *im.shape[2:])}" % t
@@ -401,3 +501,66 @@ class BasePredictor:
     def add_callback(self, event: str, func):
         """Add callback."""
         self.callbacks[event].append(func)
+
+
+class PredictorSession:
+    """
+    Long-lived predictor stream fed one in-memory frame at a time.
+
+    Config, source, warmup, profilers and trackers are set up once on the first push(). Each later push() only runs
+    preprocess, inference, postprocess and the per-batch callbacks (e.g. the tracker update), skipping the per-call
+    setup of Model.predict(). Create sessions with Model.stream_session(). The session owns its predictor, which stays
+    locked for as long as the stream is open.
+
+    Attributes:
+        predictor (BasePredictor): The predictor owned by this session, its `args` may be changed between pushes.
+        source (LoadPushedFrames): The loader frames are pushed into.
+
+    Example:
+        ```python
+        with model.stream_session(mode="track", classes=[0]) as session:
+            for frame in frames:
+                result = session.push(frame)
+        ```
+    """
+
+    def __init__(self, predictor):
+        """Initialize the session around a predictor that already has its model set up."""
+        self.predictor = predictor
+        self.source = LoadPushedFrames()
+        self.stream = None
+
+    def push(self, im):
+        """
+        Run the session on one frame.
+
+        Args:
+            im (np.ndarray | PIL.Image.Image): BGR (h, w, 3) frame.
+
+        Returns:
+            (Results): Prediction or tracking results of the frame.
+        """
+        self.source.put(im)
+        if self.stream is None:
+            self.stream = self.predictor(source=self.source, stream=True)
+        try:
+            return next(self.stream)
+        except Exception:
+            self.stream = None  # the generator is finished, set the stream up again on the next push
+            raise
+
+    def close(self):
+        """End the stream, running the end-of-stream callbacks and logging."""
+        self.source.close()
+        if self.stream is not None:
+            for _ in self.stream:
+                pass
+            self.stream = None
+
+    def __enter__(self):
+        """Return the session for use as a context manager."""
+        return self
+
+    def __exit__(self, *args):
+        """Close the session."""
+        self.close()
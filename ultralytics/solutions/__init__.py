@@ -1,6 +1,9 @@
 # Ultralytics YOLO 🚀, AGPL-3.0 license
 
+from .heatmap import Heatmap
 from .object_counter import ObjectCounter
+from .region_counter import RegionCounter
+from .zone_occupancy import ZoneOccupancy
 
 __all__ = (
     "AIGym",
@@ -9,6 +12,8 @@ __all__ = (
     "ObjectCounter",
     "ParkingManagement",
     "QueueManager",
+    "RegionCounter",
     "SpeedEstimator",
     "Analytics",
+    "ZoneOccupancy",
 )
@@ -0,0 +1,142 @@
+# Ultralytics YOLO 🚀, AGPL-3.0 license
+
+import threading
+import time
+from collections import deque
+from typing import NamedTuple
+
+
+class CountEvent(NamedTuple):
+    """One count: a track crossing a line or entering or leaving a zone."""
+
+    seq: int  # position in the log, increasing by one per event
+    t: float  # wall-clock time.time() of the count
+    track_id: int
+    cls: int
+    region: str
+    direction: str  # "IN" or "OUT"
+
+
+class EventLog:
+    """
+    Append-only log of count events, read by any number of consumers through their own cursors.
+
+    The counter appends and never rewrites events, so consumers (Modbus, HTTP, storage) batch and publish them on their
+    own schedule without locking the counter or resetting its counts, and no count can slip in between a read and a
+    reset. Only the last `capacity` events are kept, a cursor that falls further behind skips the overwritten events
+    and reports them as missed.
+
+    Attributes:
+        capacity (int): Number of events kept.
+        head (int): Sequence number the next event gets, i.e. the number of events appended so far.
+        callbacks (list): Functions called with every new event, from the thread that counts.
+
+    Example:
+        ```python
+        cursor = counter.events.cursor()
+        for event in cursor:  # the events counted since the last pass, never blocks
+            print(event.direction, event.track_id)
+        ```
+    """
+
+    def __init__(self, capacity=10000):
+        """Initializes an empty log."""
+        self.capacity = capacity
+        self.events = deque(maxlen=capacity)
+        self.head = 0
+        self.callbacks = []
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        """Returns the number of events held."""
+        return len(self.events)
+
+    @property
+    def tail(self):
+        """Sequence number of the oldest event held."""
+        return self.head - len(self.events)
+
+    def append(self, track_id, cls, region, direction, t=None):
+        """
+        Records one count and passes it to the callbacks.
+
+        Args:
+            track_id (int): Track id.
+            cls (int): Class index.
+            region (str): Name of the line or zone.
+            direction (str): "IN" or "OUT".
+            t (float, optional): Wall-clock time of the count, defaults to now.
+
+        Returns:
+            (CountEvent): The recorded event.
+        """
+        with self.lock:
+            event = CountEvent(self.head, time.time() if t is None else t, int(track_id), int(cls), region, direction)
+            self.events.append(event)
+            self.head += 1
+        for callback in self.callbacks:
+            callback(event)
+        return event
+
+    def read(self, cursor=0, limit=None):
+        """
+        Returns the events from sequence number `cursor` on, without waiting for new ones.
+
+        Args:
+            cursor (int): Sequence number of the first event wanted, e.g. the `next_cursor` of the previous read.
+            limit (int, optional): Maximum number of events returned.
+
+        Returns:
+            events (list[CountEvent]): The events, oldest first, starting at the oldest one held if `cursor` is older.
+            next_cursor (int): Cursor for the next read.
+        """
+        with self.lock:
+            start = max(cursor - self.tail, 0)
+            stop = len(self.events) if limit is None else min(start + limit, len(self.events))
+            events = [self.events[i] for i in range(start, stop)]
+            return events, self.tail + stop
+
+    def cursor(self, start=None):
+        """Returns a new EventCursor at sequence number `start`, by default at the end so it only sees new events."""
+        return EventCursor(self, self.head if start is None else start)
+
+    def add_callback(self, callback):
+        """Calls `callback(event)` for every new event, it runs in the counting thread and must return quickly."""
+        self.callbacks.append(callback)
+
+    def remove_callback(self, callback):
+        """Stops calling `callback`."""
+        self.callbacks.remove(callback)
+
+
+class EventCursor:
+    """
+    Read position of one consumer in an EventLog, iterating yields the events appended since the last pass.
+
+    Attributes:
+        log (EventLog): The log read.
+        position (int): Sequence number of the next event to read.
+        missed (int): Events overwritten before this cursor read them.
+    """
+
+    def __init__(self, log, position=0):
+        """Initializes the cursor at `position`."""
+        self.log = log
+        self.position = position
+        self.missed = 0
+
+    def read(self, limit=None):
+        """Returns the next events (at most `limit`) and advances past them, an empty list if there are none."""
+        events, position = self.log.read(self.position, limit)
+        if events:
+            self.missed += events[0].seq - self.position
+        self.position = position
+        return events
+
+    def __iter__(self):
+        """Yields the events available now, then stops."""
+        yield from self.read()
+
+    def pending(self):
+        """Returns the number of events not read yet."""
+        return self.log.head - self.position
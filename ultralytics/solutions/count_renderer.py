@@ -0,0 +1,123 @@
+# Ultralytics YOLO 🚀, AGPL-3.0 license
+
+import cv2
+import numpy as np
+
+from ultralytics.utils.plotting import Annotator, colors
+
+
+class OverlayLayer:
+    """
+    A static overlay drawn once and pasted onto every frame of the same shape.
+
+    The drawing function is run on a black and on a white canvas, the pixels it painted are the ones that are equal on
+    both. Only the bounding box of those pixels is kept, so pasting is one masked cv2.copyTo of that crop instead of
+    the drawing calls.
+
+    Attributes:
+        key (tuple): What the layer was drawn from, a layer is rebuilt when its key changes.
+        box (tuple): (y1, y2, x1, x2) crop of the frame covered by the layer, None if nothing was drawn.
+        patch (np.ndarray): Pixels of the crop.
+        mask (np.ndarray): uint8 (h, w) mask of the painted pixels of the crop.
+    """
+
+    def __init__(self, key, shape, draw):
+        """
+        Renders the layer.
+
+        Args:
+            key (tuple): Cache key of the layer.
+            shape (tuple): Frame shape (h, w, 3).
+            draw (callable): Function drawing the overlay onto the uint8 image it is given, in place.
+        """
+        self.key = key
+        black, white = np.zeros(shape, dtype=np.uint8), np.full(shape, 255, dtype=np.uint8)
+        draw(black)
+        draw(white)
+        painted = (black == white).all(axis=2)
+        rows, cols = np.flatnonzero(painted.any(axis=1)), np.flatnonzero(painted.any(axis=0))
+        self.box = (rows[0], rows[-1] + 1, cols[0], cols[-1] + 1) if len(rows) else None
+        if self.box is not None:
+            y1, y2, x1, x2 = self.box
+            self.patch = black[y1:y2, x1:x2].copy()
+            self.mask = painted[y1:y2, x1:x2].astype(np.uint8)
+
+    def apply(self, im):
+        """Pastes the layer onto `im` in place and returns it."""
+        if self.box is not None:
+            y1, y2, x1, x2 = self.box
+            cv2.copyTo(self.patch, self.mask, im[y1:y2, x1:x2])  # writes into the view, i.e. into im
+        return im
+
+
+class CountRenderer:
+    """
+    Draws the state of a counter onto frames, only when an annotated frame is asked for.
+
+    The regions and the count labels only change when the regions are edited or a count is added, so they are kept as
+    pre-rendered OverlayLayers and pasted onto each frame. Only the boxes and track trails of the current tracks are
+    drawn per frame.
+
+    The counter provides `overlay_regions()` -> [(points, color)], `overlay_labels()` -> {label: text}, `last_tracks`
+    (boxes, track ids, classes of its last update), `names`, `tf`, `region_thickness`, `count_txt_color` and
+    `count_bg_color`, and optionally `draw_tracks`, `track_color`, `track_thickness` and `track_history`.
+    """
+
+    def __init__(self, counter):
+        """Initializes the renderer of `counter` without drawing anything."""
+        self.counter = counter
+        self.layers = {}  # name -> OverlayLayer
+
+    def layer(self, name, key, shape, draw):
+        """Returns the cached layer `name`, re-rendered if its key or the frame shape changed."""
+        key = (shape, *key)
+        layer = self.layers.get(name)
+        if layer is None or layer.key != key:
+            layer = self.layers[name] = OverlayLayer(key, shape, draw)
+        return layer
+
+    def render(self, im0, draw_boxes=True):
+        """
+        Annotates a frame with the regions, the tracks of the last update and the counts.
+
+        Args:
+            im0 (np.ndarray): BGR frame, drawn on in place.
+            draw_boxes (bool): Draw the boxes of the last update, False for frames that were not counted.
+
+        Returns:
+            (np.ndarray): The annotated frame.
+        """
+        c = self.counter
+        shape = im0.shape
+        regions = c.overlay_regions()
+        key = (tuple(tuple(map(tuple, pts)) for pts, _ in regions), tuple(color for _, color in regions))
+        key += (c.tf, c.region_thickness)
+
+        def draw_regions(im):
+            annotator = Annotator(im, c.tf)
+            for pts, color in regions:
+                annotator.draw_region(reg_pts=pts, color=color, thickness=c.region_thickness)
+
+        self.layer("regions", key, shape, draw_regions).apply(im0)
+
+        boxes, track_ids, clss = c.last_tracks
+        if draw_boxes and len(track_ids):
+            annotator = Annotator(im0, c.tf)
+            draw_tracks = getattr(c, "draw_tracks", False)
+            for box, track_id, cls in zip(boxes, track_ids, clss):
+                annotator.box_label(box, label=f"{c.names[cls]}#{track_id}", color=colors(int(track_id), True))
+                if draw_tracks and len(c.track_history[track_id]):
+                    annotator.draw_centroid_and_tracks(
+                        c.track_history[track_id],
+                        color=c.track_color or colors(int(track_id), True),
+                        track_thickness=c.track_thickness,
+                    )
+
+        labels = c.overlay_labels()
+        if labels:
+
+            def draw_labels(im):
+                Annotator(im, c.tf).display_analytics(im, labels, c.count_txt_color, c.count_bg_color, 10)
+
+            self.layer("labels", tuple(labels.items()), shape, draw_labels).apply(im0)
+        return im0
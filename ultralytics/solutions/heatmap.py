@@ -0,0 +1,200 @@
+# Ultralytics YOLO 🚀, AGPL-3.0 license
+
+import time
+
+import cv2
+import numpy as np
+
+from ultralytics.utils.checks import check_imshow
+
+
+class Heatmap:
+    """
+    Decaying heatmap of where tracked objects are, accumulated on a low-resolution grid.
+
+    Every frame adds one unit of heat per track, at the cell of its box bottom centre ("feet", where people walk), its
+    centroid, or spread evenly over the cells its box covers ("box"). Heat decays exponentially with `half_life`. The
+    decay is applied lazily: the grid holds heat divided by a global `scale` factor that shrinks over time, and new heat
+    is added divided by it, so a frame only touches the cells it adds to. The grid is renormalized only when `scale`
+    gets small. Colormapping and blending onto a frame only happen in render().
+
+    Attributes:
+        cell (int): Size of a grid cell in frame pixels.
+        half_life (float): Seconds after which heat has decayed to half, None for no decay.
+        grid (np.ndarray): float32 (h / cell, w / cell) heat divided by `scale`, None until the first frame.
+        scale (float): Global factor of the grid, the heat is grid * scale.
+    """
+
+    def __init__(
+        self,
+        cell=16,
+        half_life=300.0,
+        mode="feet",
+        colormap=cv2.COLORMAP_JET,
+        alpha=0.5,
+        view_img=False,
+        headless=False,
+        draw=True,
+    ):
+        """
+        Initializes an empty heatmap, the grid is allocated for the shape of the first frame.
+
+        Args:
+            cell (int): Size of a grid cell in frame pixels.
+            half_life (float): Seconds after which heat has decayed to half, None to accumulate forever.
+            mode (str): Where a track adds heat: "feet" (box bottom centre), "centroid" or "box" (its whole footprint).
+            colormap (int): OpenCV colormap of the rendered heatmap.
+            alpha (float): Opacity of the heatmap blended onto the frame.
+            view_img (bool): Flag to control whether to display the video stream.
+            headless (bool): Never make GUI calls, view_img is ignored and the imshow check is skipped.
+            draw (bool): Blend the heatmap onto the frame in generate_heatmap(), False to only accumulate.
+        """
+        if mode not in {"feet", "centroid", "box"}:
+            raise ValueError(f"Invalid heatmap mode '{mode}', valid modes are 'feet', 'centroid' and 'box'.")
+        self.cell = cell
+        self.half_life = half_life
+        self.mode = mode
+        self.colormap = colormap
+        self.alpha = alpha
+        self.im0 = None
+        self.headless = headless
+        self.view_img = view_img and not headless
+        self.draw = draw
+        self.window_name = "Ultralytics YOLOv8 Heatmap"
+        self.env_check = False if headless else check_imshow(warn=True)
+
+        self.shape = None  # frame (h, w) the grid was allocated for
+        self.grid = None
+        self.scale = 1.0
+        self.t = None  # time the scale was last decayed to
+
+    def _decay(self, t):
+        """Decays the global scale to time `t`, renormalizing the grid before float32 precision suffers."""
+        if self.t is not None and self.half_life and t > self.t:
+            self.scale *= 0.5 ** ((t - self.t) / self.half_life)
+            if self.scale < 1e-3:
+                self.grid *= self.scale
+                self.scale = 1.0
+        self.t = t if self.t is None else max(t, self.t)
+
+    def _allocate(self, shape):
+        """Allocates an empty grid for frames of `shape`."""
+        h, w = shape[:2]
+        self.shape = (h, w)
+        self.grid = np.zeros((-(-h // self.cell), -(-w // self.cell)), dtype=np.float32)
+        self.scale = 1.0
+
+    def update(self, boxes, shape, t=None):
+        """
+        Adds the heat of the boxes of one frame.
+
+        Args:
+            boxes (np.ndarray): xyxy boxes of the tracks of the frame in pixels, shape (N, 4).
+            shape (tuple): Frame shape (h, w, ...), the grid is reallocated if it changes.
+            t (float, optional): Current time, defaults to the monotonic clock.
+        """
+        if self.shape != tuple(shape[:2]):
+            self._allocate(shape)
+        self._decay(time.monotonic() if t is None else t)
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        if not len(boxes):
+            return
+        gh, gw = self.grid.shape
+        weight = np.float32(1.0 / self.scale)
+
+        if self.mode == "box":
+            # Box footprints in cells, inclusive, each spread over its cells so every track adds one unit
+            x1, y1 = (boxes[:, :2] // self.cell).astype(int).T
+            x2, y2 = (np.maximum(boxes[:, 2:] - 1, boxes[:, :2]) // self.cell).astype(int).T
+            x1, x2 = x1.clip(0, gw - 1), x2.clip(0, gw - 1)
+            y1, y2 = y1.clip(0, gh - 1), y2.clip(0, gh - 1)
+            w = weight / ((x2 - x1 + 1) * (y2 - y1 + 1))
+            # Summed-area trick: +w at the top-left corner, -w right and below, +w diagonally, then 2D cumsum
+            diff = np.zeros((gh + 1, gw + 1), dtype=np.float32)
+            np.add.at(diff, (y1, x1), w)
+            np.add.at(diff, (y1, x2 + 1), -w)
+            np.add.at(diff, (y2 + 1, x1), -w)
+            np.add.at(diff, (y2 + 1, x2 + 1), w)
+            self.grid += diff.cumsum(axis=0).cumsum(axis=1)[:gh, :gw]
+            return
+
+        x = (boxes[:, 0] + boxes[:, 2]) / 2
+        y = boxes[:, 3] if self.mode == "feet" else (boxes[:, 1] + boxes[:, 3]) / 2
+        gx = (x // self.cell).astype(int).clip(0, gw - 1)
+        gy = (np.minimum(y, self.shape[0] - 1) // self.cell).astype(int).clip(0, gh - 1)
+        np.add.at(self.grid, (gy, gx), weight)
+
+    def heat(self, t=None):
+        """
+        Returns the current heat per cell.
+
+        Args:
+            t (float, optional): Time to decay the heat to, defaults to the monotonic clock.
+
+        Returns:
+            (np.ndarray): float32 grid of the decayed heat, None before the first frame.
+        """
+        if self.grid is None:
+            return None
+        self._decay(time.monotonic() if t is None else t)
+        return self.grid * np.float32(self.scale)
+
+    def render(self, im0):
+        """
+        Blends the colormapped heatmap onto a frame, the heat is normalized to its current maximum.
+
+        Args:
+            im0 (np.ndarray): BGR frame, the heatmap is resized to its shape.
+
+        Returns:
+            (np.ndarray): The blended frame, `im0` itself if there is no heat yet.
+        """
+        if self.grid is None:
+            return im0
+        grid = self.grid  # normalizing to the maximum cancels the global scale, no decay needs to be applied
+        peak = grid.max()
+        if peak <= 0:
+            return im0
+        # Colormap at grid resolution, only the colored grid and the mask of warm cells are upscaled
+        heat = cv2.convertScaleAbs(grid, alpha=255.0 / peak)
+        size = (im0.shape[1], im0.shape[0])
+        colored = cv2.resize(cv2.applyColorMap(heat, self.colormap), size, interpolation=cv2.INTER_LINEAR)
+        warm = cv2.resize((heat > 0).view(np.uint8), size, interpolation=cv2.INTER_NEAREST)
+        blended = cv2.addWeighted(im0, 1 - self.alpha, colored, self.alpha, 0)
+        out = im0.copy()
+        cv2.copyTo(blended, warm, out)  # the frame stays untouched where there is no heat
+        return out
+
+    def display_frames(self):
+        """Displays the current frame with the heatmap in a window."""
+        if self.env_check:
+            cv2.imshow(self.window_name, self.im0)
+            if cv2.waitKey(1) & 0xFF == ord("q"):
+                return
+
+    def generate_heatmap(self, im0, tracks, draw=None):
+        """
+        Adds the tracks of one frame to the heatmap and blends it onto the frame.
+
+        Args:
+            im0 (ndarray): Current frame from the video stream.
+            tracks (list): List of tracks obtained from the object tracking process.
+            draw (bool, optional): Blend the heatmap onto this frame, defaults to the `draw` attribute.
+
+        Returns:
+            (ndarray): The frame, blended with the heatmap if drawn.
+        """
+        self.im0 = im0
+        boxes = tracks[0].boxes
+        self.update(boxes.xyxy.cpu().numpy() if boxes.id is not None else (), im0.shape)
+        if self.draw if draw is None else draw:
+            self.im0 = self.render(im0)
+        if self.view_img:
+            self.display_frames()
+        return self.im0
+
+    def reset(self):
+        """Clears all heat."""
+        if self.grid is not None:
+            self.grid[:] = 0
+        self.scale = 1.0
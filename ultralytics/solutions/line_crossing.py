@@ -0,0 +1,137 @@
+# Ultralytics YOLO 🚀, AGPL-3.0 license
+
+import numpy as np
+
+
+def side_of_line(points, line):
+    """
+    Returns the cross product (B - A) x (P - A) for every point P, i.e. which side of the line A->B each point is on.
+
+    Args:
+        points (np.ndarray): Points of shape (N, 2).
+        line (np.ndarray): Line endpoints A and B of shape (2, 2), or (N, 2, 2) for one line per point.
+
+    Returns:
+        (np.ndarray): Array of shape (N,), positive on one side, negative on the other and zero on the line. In image
+            coordinates (y pointing down) and for a line drawn from left to right, points below the line are positive.
+    """
+    points, line = np.asarray(points, dtype=np.float64), np.asarray(line, dtype=np.float64)
+    a, ab = line[..., 0, :], line[..., 1, :] - line[..., 0, :]
+    return ab[..., 0] * (points[..., 1] - a[..., 1]) - ab[..., 1] * (points[..., 0] - a[..., 0])
+
+
+def segment_crossings(prev, curr, line):
+    """
+    Tests in one vectorized pass which movements prev[i] -> curr[i] cross the line segment A-B, and in which direction.
+
+    A movement crosses when its endpoints are on different sides of the line and the line endpoints are on different
+    sides of the movement, so crossings are found however far an object moved between two samples and for any line
+    orientation. A point exactly on the line counts as being on the negative side, so an object that stops on the line
+    and moves back is not counted twice.
+
+    Args:
+        prev (np.ndarray): Previous positions of shape (N, 2).
+        curr (np.ndarray): Current positions of shape (N, 2).
+        line (np.ndarray): Line endpoints A and B of shape (2, 2), or (N, 2, 2) to test each movement against its own
+            line.
+
+    Returns:
+        (np.ndarray): int8 array of shape (N,): 1 for a crossing from the positive to the negative side (moving up over
+            a left-to-right line), -1 for a crossing from the negative to the positive side and 0 for no crossing.
+    """
+    prev = np.asarray(prev, dtype=np.float64).reshape(-1, 2)
+    curr = np.asarray(curr, dtype=np.float64).reshape(-1, 2)
+    line = np.asarray(line, dtype=np.float64)
+    was_positive = side_of_line(prev, line) > 0
+    is_positive = side_of_line(curr, line) > 0
+
+    # Line endpoints on opposite sides of (or touching) the movement, i.e. it passes between A and B
+    movement = np.stack((prev, curr), axis=1)
+    crossed = (was_positive != is_positive) & (
+        side_of_line(line[..., 0, :], movement) * side_of_line(line[..., 1, :], movement) <= 0
+    )
+    return np.where(crossed, np.where(was_positive, 1, -1), 0).astype(np.int8)
+
+
+def distance_to_segment(points, line):
+    """
+    Returns the Euclidean distance of every point to the line segment A-B.
+
+    Args:
+        points (np.ndarray): Points of shape (N, 2).
+        line (np.ndarray): Segment endpoints A and B of shape (2, 2).
+
+    Returns:
+        (np.ndarray): Distances of shape (N,).
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    a, b = np.asarray(line, dtype=np.float64)
+    ab = b - a
+    t = np.clip((points - a) @ ab / max(ab @ ab, 1e-12), 0.0, 1.0)
+    return np.linalg.norm(points - (a + t[:, None] * ab), axis=1)
+
+
+def points_in_polygon(points, polygon):
+    """
+    Tests which points lie inside a polygon with an even-odd ray casting test over all points and edges at once.
+
+    Args:
+        points (np.ndarray): Points of shape (N, 2).
+        polygon (np.ndarray): Polygon vertices of shape (M, 2), M >= 3, without repeating the first vertex.
+
+    Returns:
+        (np.ndarray): Boolean array of shape (N,).
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    v0 = np.asarray(polygon, dtype=np.float64)
+    v1 = np.roll(v0, -1, axis=0)
+    x, y = points[:, :1], points[:, 1:]  # (N, 1) against (M,) edges
+    straddles = (v0[:, 1] > y) != (v1[:, 1] > y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_cross = v0[:, 0] + (y - v0[:, 1]) * (v1[:, 0] - v0[:, 0]) / (v1[:, 1] - v0[:, 1])
+    return np.count_nonzero(straddles & (x < x_cross), axis=1) % 2 == 1
+
+
+def polygon_edges(polygons):
+    """
+    Flattens polygons into one edge table for points_in_polygons().
+
+    Args:
+        polygons (list): Polygons, each a sequence of at least 3 (x, y) vertices.
+
+    Returns:
+        (tuple): Edge start vertices (E, 2), edge end vertices (E, 2), first edge index (P,) and edge count (P,) of
+            every polygon.
+    """
+    if not len(polygons):
+        return np.zeros((0, 2)), np.zeros((0, 2)), np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+    polygons = [np.asarray(p, dtype=np.float64).reshape(-1, 2) for p in polygons]
+    counts = np.array([len(p) for p in polygons])
+    v0 = np.concatenate(polygons)
+    v1 = np.concatenate([np.roll(p, -1, axis=0) for p in polygons])
+    return v0, v1, np.cumsum(counts) - counts, counts
+
+
+def points_in_polygons(points, index, edges):
+    """
+    Even-odd test of points[k] against polygon index[k] for many (point, polygon) pairs in one vectorized pass.
+
+    Args:
+        points (np.ndarray): Points of shape (K, 2).
+        index (np.ndarray): Polygon index of every point, shape (K,).
+        edges (tuple): Edge table of all polygons from polygon_edges().
+
+    Returns:
+        (np.ndarray): Boolean array of shape (K,).
+    """
+    v0, v1, starts, counts = edges
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    n = counts[index]
+    pair = np.repeat(np.arange(len(index)), n)  # one row per (pair, edge of its polygon)
+    edge = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n) + np.repeat(starts[index], n)
+    p, a, b = points[pair], v0[edge], v1[edge]
+    straddles = (a[:, 1] > p[:, 1]) != (b[:, 1] > p[:, 1])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_cross = a[:, 0] + (p[:, 1] - a[:, 1]) * (b[:, 0] - a[:, 0]) / (b[:, 1] - a[:, 1])
+    hits = np.bincount(pair, weights=straddles & (p[:, 0] < x_cross), minlength=len(index))
+    return hits % 2 == 1
@@ -1,12 +1,17 @@
 # Ultralytics YOLO 🚀, AGPL-3.0 license
 
-from collections import defaultdict, deque
+import time
+
 import cv2
+import numpy as np
+from ultralytics.solutions.count_events import EventLog
+from ultralytics.solutions.count_renderer import CountRenderer
+from ultralytics.solutions.line_crossing import points_in_polygon, segment_crossings
+from ultralytics.solutions.track_store import TrackStore
 from ultralytics.utils.checks import check_imshow, check_requirements
-from ultralytics.utils.plotting import Annotator, colors
 
 check_requirements("shapely>=2.0.0")
-from shapely.geometry import LineString, Point, Polygon
+from shapely.geometry import LineString, Polygon
 
 
 class ObjectCounter:
@@ -30,6 +35,12 @@ class ObjectCounter:
         line_dist_thresh=15,
         cls_txtdisplay_gap=50,
         track_history_length=15,  # New parameter for the length of track history to consider
+        track_ttl=60.0,
+        roi_margin=(0.05, 0.15),
+        headless=False,
+        draw=True,
+        region_name=None,
+        event_capacity=10000,
     ):
         """
         Initializes the ObjectCounter with various tracking and counting parameters.
@@ -48,9 +59,18 @@ class ObjectCounter:
             draw_tracks (bool): Flag to control whether to draw the object tracks.
             track_color (tuple): RGB color of the tracks.
             region_thickness (int): Thickness of the object counting region.
-            line_dist_thresh (int): Euclidean distance threshold for line counter.
+            line_dist_thresh (int): Unused, line crossings are detected from each track's movement since its previous
+                position however far it moved. Kept for backwards compatibility.
             cls_txtdisplay_gap (int): Display gap between each class count.
             track_history_length (int): Number of past positions to keep for trajectory analysis.
+            track_ttl (float): Seconds after which the state of a track that is no longer seen is dropped, None to only
+                drop it through evict().
+            roi_margin (float | tuple): Padding of the inference ROI around the region, as a fraction of the frame
+                width and height.
+            headless (bool): Never make GUI calls, view_img is ignored and the imshow check is skipped.
+            draw (bool): Draw the region, boxes, tracks and counts on the frame, False to only count.
+            region_name (str, optional): Region recorded with every count event, defaults to "line" or "polygon".
+            event_capacity (int): Number of count events kept in the `events` log.
         """
 
         # Mouse events
@@ -63,22 +83,26 @@ class ObjectCounter:
         self.counting_region = None
         self.region_color = count_reg_color
         self.region_thickness = region_thickness
+        self.roi_margin = roi_margin if isinstance(roi_margin, (tuple, list)) else (roi_margin, roi_margin)
 
         # Image and annotation Information
         self.im0 = None
         self.tf = line_thickness
-        self.view_img = view_img
+        self.headless = headless
+        self.view_img = view_img and not headless
+        self.draw = draw
         self.view_in_counts = view_in_counts
         self.view_out_counts = view_out_counts
 
         self.names = classes_names  # Classes names
-        self.annotator = None  # Annotator
+        self.renderer = None  # CountRenderer, created on the first annotated frame
+        self.last_tracks = ((), (), ())  # boxes, track ids and classes of the last update, for the renderer
         self.window_name = "Ultralytics YOLOv8 Object Counter"
 
         # Object counting Information
         self.in_counts = 0
         self.out_counts = 0
-        self.count_ids = []
+        self.count_ids = set()  # ids counted since the last reset, kept apart from the per-track geometry
         self.class_wise_count = {}
         self.count_txt_thickness = 0
         self.count_txt_color = count_txt_color
@@ -86,14 +110,18 @@ class ObjectCounter:
         self.cls_txtdisplay_gap = cls_txtdisplay_gap
         self.fontsize = 0.6
 
-        # Tracks info
-        self.track_history = defaultdict(lambda: deque(maxlen=track_history_length))
+        # Every count is also appended to the event log, consumers read it through their own cursors
+        self.region_name = region_name or ("polygon" if len(self.reg_pts) >= 3 else "line")
+        self.events = EventLog(event_capacity)
+
+        # Tracks info, evicted when the tracker removes a track or after track_ttl seconds unseen
+        self.track_history = TrackStore(track_history_length, ttl=track_ttl)
         self.track_thickness = track_thickness
         self.draw_tracks = draw_tracks
         self.track_color = track_color
 
         # Check if environment supports imshow
-        self.env_check = check_imshow(warn=True)
+        self.env_check = False if headless else check_imshow(warn=True)
 
         # Initialize counting region
         if len(self.reg_pts) == 2:
@@ -138,94 +166,150 @@ class ObjectCounter:
             self.is_drawing = False
             self.selected_point = None
 
-    def extract_and_process_tracks(self, tracks):
-        """Extracts and processes tracks for object counting in a video stream."""
-
-        # Annotator Init and region drawing
-        self.annotator = Annotator(self.im0, self.tf, self.names)
-
-        # Draw region or line
-        self.annotator.draw_region(reg_pts=self.reg_pts, color=self.region_color, thickness=self.region_thickness)
-
-        if tracks[0].boxes.id is not None:
-            boxes = tracks[0].boxes.xyxy.cpu()
-            clss = tracks[0].boxes.cls.cpu().tolist()
-            track_ids = tracks[0].boxes.id.int().cpu().tolist()
-
-            # Extract tracks
-            for box, track_id, cls in zip(boxes, track_ids, clss):
-                # Draw bounding box
-                self.annotator.box_label(box, label=f"{self.names[cls]}#{track_id}", color=colors(int(track_id), True))
-
-                # Store class info
-                if self.names[cls] not in self.class_wise_count:
-                    self.class_wise_count[self.names[cls]] = {"IN": 0, "OUT": 0}
-
-                # Draw Tracks
-                track_line = self.track_history[track_id]
-                track_line.append((float((box[0] + box[2]) / 2), float((box[1] + box[3]) / 2)))
-                
-                # Draw track trails
-                if self.draw_tracks:
-                    self.annotator.draw_centroid_and_tracks(
-                        track_line,
-                        color=self.track_color if self.track_color else colors(int(track_id), True),
-                        track_thickness=self.track_thickness,
-                    )
-
-                # Refine movement detection using track history
-                if len(track_line) > 1:
-                    current_position = Point(track_line[-1])
-                    previous_position = Point(track_line[-2])
-
-                    # Check if it crosses the line or region
-                    if len(self.reg_pts) == 2:
-                        # Line based counting
-                        distance_to_line = self.counting_region.distance(current_position)
-
-                        if distance_to_line < self.line_dist_thresh and track_id not in self.count_ids:
-                            # Determine the direction of movement relative to the line
-                            movement_direction = current_position.y - previous_position.y
-                            if movement_direction < 0:  # Object moving upwards
-                                self.in_counts += 1
-                                self.class_wise_count[self.names[cls]]["IN"] += 1
-                            else:  # Object moving downwards
-                                self.out_counts += 1
-                                self.class_wise_count[self.names[cls]]["OUT"] += 1
-                            self.count_ids.append(track_id)
-
-                    elif len(self.reg_pts) >= 3:
-                        # Polygon based counting
-                        is_inside = self.counting_region.contains(current_position)
-                        if is_inside and track_id not in self.count_ids:
-                            # Determine the movement by examining the position history
-                            history_length = min(len(track_line), 5)  # Use the last 5 positions for direction check
-                            directions = [track_line[i+1][1] - track_line[i][1] for i in range(-history_length, -1)]
-                            avg_direction = sum(directions) / history_length
-                            
-                            if avg_direction < 0:  # Moving in
-                                self.in_counts += 1
-                                self.class_wise_count[self.names[cls]]["IN"] += 1
-                            else:  # Moving out
-                                self.out_counts += 1
-                                self.class_wise_count[self.names[cls]]["OUT"] += 1
-                            self.count_ids.append(track_id)
+    def extract_and_process_tracks(self, tracks, draw=True):
+        """Extracts and processes tracks for object counting in a video stream, annotating the frame if `draw`."""
+        self.update_tracks(tracks)
+        if draw:
+            self.render(self.im0)
 
-        labels_dict = {}
+    def update_tracks(self, tracks, t=None):
+        """
+        Counts the tracks of one frame without drawing anything.
+
+        Args:
+            tracks (list): List of tracks obtained from the object tracking process.
+            t (float, optional): Current time, defaults to the monotonic clock.
+        """
+        t = time.monotonic() if t is None else t
+        self.evict(self.track_history.expire(t))
+
+        if tracks[0].boxes.id is None:
+            self.last_tracks = ((), (), ())
+            return
+        boxes = tracks[0].boxes.xyxy.cpu()
+        clss = tracks[0].boxes.cls.int().cpu().tolist()
+        track_ids = tracks[0].boxes.id.int().cpu().tolist()
+        self.last_tracks = (boxes, track_ids, clss)
+        centroids = ((boxes[:, :2] + boxes[:, 2:]) / 2).numpy()
+        previous = centroids.copy()  # last known position of each track, its current one if it is new
+
+        for i, (track_id, cls) in enumerate(zip(track_ids, clss)):
+            # Store class info
+            if self.names[cls] not in self.class_wise_count:
+                self.class_wise_count[self.names[cls]] = {"IN": 0, "OUT": 0}
+
+            track_line = self.track_history.update(track_id, (float(centroids[i, 0]), float(centroids[i, 1])), t)
+            if len(track_line) > 1:
+                previous[i] = track_line[-2]
+
+        # Count all tracks at once, without per-track geometry objects
+        self.count_tracks(track_ids, clss, previous, centroids)
+
+    def render(self, im0, draw_boxes=True):
+        """
+        Annotates a frame with the region, the tracks of the last update and the counts.
+
+        The region and the count labels are pre-rendered layers reused across frames, see CountRenderer.
 
+        Args:
+            im0 (np.ndarray): Frame to draw on, in place.
+            draw_boxes (bool): Draw the boxes and trails of the last update, False for frames that were not counted.
+
+        Returns:
+            (np.ndarray): The annotated frame.
+        """
+        if self.renderer is None:
+            self.renderer = CountRenderer(self)
+        return self.renderer.render(im0, draw_boxes=draw_boxes)
+
+    def overlay_regions(self):
+        """Returns the (points, color) of the region for the renderer."""
+        return [(self.reg_pts, self.region_color)]
+
+    def overlay_labels(self):
+        """Returns the {class: counts text} labels shown on the frames."""
+        labels_dict = {}
+        if not self.view_in_counts and not self.view_out_counts:
+            return labels_dict
         for key, value in self.class_wise_count.items():
             if value["IN"] != 0 or value["OUT"] != 0:
-                if not self.view_in_counts and not self.view_out_counts:
-                    continue
-                elif not self.view_in_counts:
+                if not self.view_in_counts:
                     labels_dict[str.capitalize(key)] = f"OUT {value['OUT']}"
                 elif not self.view_out_counts:
                     labels_dict[str.capitalize(key)] = f"IN {value['IN']}"
                 else:
                     labels_dict[str.capitalize(key)] = f"IN {value['IN']} OUT {value['OUT']}"
+        return labels_dict
+
+    def count_tracks(self, track_ids, clss, previous, current):
+        """
+        Counts the tracks that crossed the line or entered the polygon since their previous position.
+
+        Lines are tested with one vectorized segment intersection over all tracks, so crossings are found for any line
+        orientation and however far objects moved between samples. Crossing from the positive to the negative side of
+        the line (see `segment_crossings`, upwards over a line drawn from left to right) counts as IN.
 
-        if labels_dict:
-            self.annotator.display_analytics(self.im0, labels_dict, self.count_txt_color, self.count_bg_color, 10)
+        Args:
+            track_ids (list): Track ids.
+            clss (list): Class index of every track.
+            previous (np.ndarray): Previous centroid of every track, shape (N, 2).
+            current (np.ndarray): Current centroid of every track, shape (N, 2).
+        """
+        if len(self.reg_pts) == 2:
+            directions = segment_crossings(previous, current, self.reg_pts)
+            for i in np.flatnonzero(directions):
+                if track_ids[i] not in self.count_ids:
+                    self._count(track_ids[i], clss[i], directions[i] > 0)
+
+        elif len(self.reg_pts) >= 3:
+            for i in np.flatnonzero(points_in_polygon(current, self.reg_pts)):
+                track_line = self.track_history[track_ids[i]]
+                if len(track_line) < 2 or track_ids[i] in self.count_ids:
+                    continue
+                # Determine the movement by examining the position history
+                history_length = min(len(track_line), 5)  # Use the last 5 positions for direction check
+                directions = [track_line[j + 1][1] - track_line[j][1] for j in range(-history_length, -1)]
+                self._count(track_ids[i], clss[i], sum(directions) / history_length < 0)  # moving up is IN
+
+    def _count(self, track_id, cls, is_in):
+        """Adds one IN or OUT count for a track and its class."""
+        key = "IN" if is_in else "OUT"
+        if is_in:
+            self.in_counts += 1
+        else:
+            self.out_counts += 1
+        self.class_wise_count[self.names[cls]][key] += 1
+        self.count_ids.add(track_id)
+        self.events.append(track_id, cls, self.region_name, key)
+
+    def evict(self, track_ids):
+        """
+        Drops the state of tracks the tracker no longer knows, e.g. its `removed_ids` after each update.
+
+        Args:
+            track_ids (Iterable[int]): Ids of the removed tracks.
+        """
+        if track_ids:
+            self.track_history.evict(track_ids)
+            self.count_ids.difference_update(track_ids)
+
+    def inference_roi(self, im_shape):
+        """
+        Returns the region of interest to run inference on, the counting region padded by `roi_margin`.
+
+        Pass it as the `roi` argument of model.track() to detect on a full-resolution crop around the line instead of
+        the whole downscaled frame, the boxes come back in frame coordinates.
+
+        Args:
+            im_shape (tuple): Shape (h, w, ...) of the frames.
+
+        Returns:
+            (list): [x1, y1, x2, y2] in pixels, clipped to the frame.
+        """
+        h, w = im_shape[:2]
+        x1, y1, x2, y2 = self.counting_region.bounds
+        mx, my = self.roi_margin[0] * w, self.roi_margin[1] * h
+        return [max(int(x1 - mx), 0), max(int(y1 - my), 0), min(int(x2 + mx), w), min(int(y2 + my), h)]
 
     def display_frames(self):
         """Displays the current frame with annotations and regions in a window."""
@@ -238,25 +322,29 @@ class ObjectCounter:
             if cv2.waitKey(1) & 0xFF == ord("q"):
                 return
 
-    def start_counting(self, im0, tracks):
+    def start_counting(self, im0, tracks, draw=None):
         """
         Main function to start the object counting process.
 
         Args:
             im0 (ndarray): Current frame from the video stream.
             tracks (list): List of tracks obtained from the object tracking process.
+            draw (bool, optional): Annotate this frame, defaults to the `draw` attribute. Frames that nobody records or
+                views can skip all drawing work.
         """
         self.im0 = im0  # store image
-        self.extract_and_process_tracks(tracks)  # draw region even if no objects
+        draw = self.draw if draw is None else draw
+        self.extract_and_process_tracks(tracks, draw=draw)  # draw region even if no objects
 
         if self.view_img:
             self.display_frames()
         return self.im0
-    
+
     def reset_counts(self):
+        """Resets the IN/OUT tallies shown on the frames, the event log is left untouched."""
         self.in_counts = 0
         self.out_counts = 0
-        self.count_ids = []
+        self.count_ids = set()
         self.class_wise_count = {}
 
 
@@ -0,0 +1,263 @@
+# Ultralytics YOLO 🚀, AGPL-3.0 license
+
+import time
+
+import cv2
+import numpy as np
+
+from ultralytics.solutions.count_events import EventLog
+from ultralytics.solutions.count_renderer import CountRenderer
+from ultralytics.solutions.line_crossing import polygon_edges, points_in_polygons, segment_crossings
+from ultralytics.solutions.track_store import TrackStore
+from ultralytics.utils.checks import check_imshow
+from ultralytics.utils.plotting import colors
+
+
+class RegionCounter:
+    """
+    Counts tracks over several lines and polygon zones at once, in one vectorized pass over all tracks and regions.
+
+    Every track movement since its previous position is first matched against the bounding boxes of all regions, an
+    (N tracks x R regions) comparison, and only the overlapping pairs go through the exact segment intersection or
+    point-in-polygon test. A movement can only cross a line or enter or leave a zone inside the region's bounding box,
+    so the pre-filter never drops a count.
+
+    A line counts IN when a track crosses it from the positive to the negative side (upwards over a line drawn from
+    left to right, see `segment_crossings`), a zone counts IN when a track enters it and OUT when it leaves. Every track
+    is counted at most once per region and direction until it is evicted or the counts are reset.
+
+    Attributes:
+        regions (dict): Region name -> list of points, 2 for a line and 3 or more for a polygon zone.
+        counts (np.ndarray): int64 tallies of shape (regions, classes, 2), the last axis is (IN, OUT).
+        region_names (list): Region names in the order of the first axis of `counts`.
+        events (EventLog): Append-only log of all counts, read by consumers through their own cursors.
+    """
+
+    def __init__(
+        self,
+        classes_names,
+        regions,
+        region_colors=None,
+        count_txt_color=(0, 0, 0),
+        count_bg_color=(255, 255, 255),
+        line_thickness=2,
+        region_thickness=5,
+        view_img=False,
+        track_history_length=15,
+        track_ttl=60.0,
+        headless=False,
+        draw=True,
+        event_capacity=10000,
+    ):
+        """
+        Initializes the RegionCounter with its regions and drawing parameters.
+
+        Args:
+            classes_names (dict): Dictionary of class names.
+            regions (dict | list): Region name -> points, or a list of point lists named by their index. Regions with 2
+                points are lines, regions with 3 or more points are polygon zones.
+            region_colors (list, optional): RGB color of every region, defaults to the track color palette.
+            count_txt_color (tuple): RGB color of the count text.
+            count_bg_color (tuple): RGB color of the count text background.
+            line_thickness (int): Line thickness for bounding boxes.
+            region_thickness (int): Thickness of the region outlines.
+            view_img (bool): Flag to control whether to display the video stream.
+            track_history_length (int): Number of past positions to keep per track.
+            track_ttl (float): Seconds after which the state of a track that is no longer seen is dropped, None to only
+                drop it through evict().
+            headless (bool): Never make GUI calls, view_img is ignored and the imshow check is skipped.
+            draw (bool): Draw the regions, boxes and counts on the frame, False to only count.
+            event_capacity (int): Number of count events kept in the `events` log.
+        """
+        if not isinstance(regions, dict):
+            regions = {str(i): pts for i, pts in enumerate(regions)}
+        if not regions or any(len(pts) < 2 for pts in regions.values()):
+            raise ValueError("RegionCounter needs at least one region, each with 2 points for a line or >= 3 points.")
+        self.regions = {name: [tuple(p) for p in pts] for name, pts in regions.items()}
+        self.region_names = list(self.regions)
+        self.region_colors = region_colors or [colors(i, True) for i in range(len(self.regions))]
+        self.region_thickness = region_thickness
+
+        # Image and annotation Information
+        self.im0 = None
+        self.tf = line_thickness
+        self.headless = headless
+        self.view_img = view_img and not headless
+        self.draw = draw
+        self.count_txt_color = count_txt_color
+        self.count_bg_color = count_bg_color
+        self.names = classes_names
+        self.renderer = None  # CountRenderer, created on the first annotated frame
+        self.last_tracks = ((), (), ())  # boxes, track ids and classes of the last update, for the renderer
+        self.window_name = "Ultralytics YOLOv8 Region Counter"
+        self.env_check = False if headless else check_imshow(warn=True)
+
+        # Region geometry, compiled once into arrays
+        pts = [np.asarray(p, dtype=np.float64) for p in self.regions.values()]
+        self.is_line = np.array([len(p) == 2 for p in pts])
+        self.bounds = np.array([[*p.min(0), *p.max(0)] for p in pts])  # (R, 4) x1, y1, x2, y2
+        self.lines = np.stack([p if len(p) == 2 else p[:2] for p in pts])  # (R, 2, 2), only used for lines
+        self.zone_index = np.cumsum(~self.is_line) - 1  # region -> index into the polygon edge table
+        self.edges = polygon_edges([p for p in pts if len(p) > 2])
+
+        # Counts, tracks and the regions/directions each track was counted for
+        self.counts = np.zeros((len(self.regions), max(classes_names) + 1, 2), dtype=np.int64)
+        self.counted = {}  # track id -> bitmask, bit 2 * region + (0 for IN, 1 for OUT)
+        self.track_history = TrackStore(track_history_length, ttl=track_ttl)
+        self.events = EventLog(event_capacity)
+
+    def update(self, track_ids, clss, current, t=None):
+        """
+        Counts the tracks that crossed a line or entered or left a zone since their previous position.
+
+        Args:
+            track_ids (list): Track ids.
+            clss (list): Class index of every track.
+            current (np.ndarray): Current position of every track, shape (N, 2).
+            t (float, optional): Current time, defaults to the monotonic clock.
+
+        Returns:
+            (list[CountEvent]): The new counts, also appended to `events`.
+        """
+        t = time.monotonic() if t is None else t
+        self.evict(self.track_history.expire(t))
+        current = np.asarray(current, dtype=np.float64).reshape(-1, 2)
+        previous = current.copy()  # last known position of each track, its current one if it is new
+        for i, track_id in enumerate(track_ids):
+            track_line = self.track_history.update(track_id, (float(current[i, 0]), float(current[i, 1])), t)
+            if len(track_line) > 1:
+                previous[i] = track_line[-2]
+
+        # Pre-filter: movements whose bounding box overlaps the region's bounding box, (N, R)
+        lo, hi = np.minimum(previous, current), np.maximum(previous, current)
+        overlap = np.all((lo[:, None] <= self.bounds[:, 2:]) & (hi[:, None] >= self.bounds[:, :2]), axis=2)
+        moved = np.any(previous != current, axis=1)
+        track, region = np.nonzero(overlap & moved[:, None])
+        direction = np.zeros(len(track), dtype=np.int8)  # 1 IN, -1 OUT, 0 nothing
+
+        # Exact tests on the candidate pairs only
+        line = self.is_line[region]
+        if line.any():
+            k = track[line]
+            direction[line] = segment_crossings(previous[k], current[k], self.lines[region[line]])
+        zone = ~line
+        if zone.any():
+            k, index = track[zone], self.zone_index[region[zone]]
+            inside = points_in_polygons(np.concatenate((previous[k], current[k])), np.tile(index, 2), self.edges)
+            was_inside, is_inside = np.split(inside, 2)
+            direction[zone] = is_inside.astype(np.int8) - was_inside.astype(np.int8)
+
+        events = []
+        for j in np.flatnonzero(direction):
+            i, r, is_in = track[j], region[j], direction[j] > 0
+            track_id, bit = track_ids[i], 1 << (2 * int(r) + (0 if is_in else 1))
+            mask = self.counted.get(track_id, 0)
+            if mask & bit:
+                continue
+            self.counted[track_id] = mask | bit
+            self.counts[r, int(clss[i]), 0 if is_in else 1] += 1
+            events.append(self.events.append(track_id, clss[i], self.region_names[r], "IN" if is_in else "OUT"))
+        return events
+
+    def evict(self, track_ids):
+        """
+        Drops the state of tracks the tracker no longer knows, e.g. its `removed_ids` after each update.
+
+        Args:
+            track_ids (Iterable[int]): Ids of the removed tracks.
+        """
+        if track_ids:
+            self.track_history.evict(track_ids)
+            for track_id in track_ids:
+                self.counted.pop(track_id, None)
+
+    def update_tracks(self, tracks):
+        """
+        Counts the tracks of one Results object without drawing anything.
+
+        Args:
+            tracks (list): List of tracks obtained from the object tracking process.
+
+        Returns:
+            (list[CountEvent]): The new counts.
+        """
+        boxes = tracks[0].boxes
+        if boxes.id is None:
+            self.last_tracks = ((), (), ())
+            self.evict(self.track_history.expire())
+            return []
+        xyxy = boxes.xyxy.cpu()
+        clss = boxes.cls.int().cpu().tolist()
+        track_ids = boxes.id.int().cpu().tolist()
+        self.last_tracks = (xyxy, track_ids, clss)
+        return self.update(track_ids, clss, ((xyxy[:, :2] + xyxy[:, 2:]) / 2).numpy())
+
+    def render(self, im0, draw_boxes=True):
+        """
+        Annotates a frame with the regions, the tracks of the last update and the per-region counts.
+
+        Args:
+            im0 (np.ndarray): Frame to draw on, in place.
+            draw_boxes (bool): Draw the boxes of the last update, False for frames that were not counted.
+
+        Returns:
+            (np.ndarray): The annotated frame.
+        """
+        if self.renderer is None:
+            self.renderer = CountRenderer(self)
+        return self.renderer.render(im0, draw_boxes=draw_boxes)
+
+    def overlay_regions(self):
+        """Returns the (points, color) of every region for the renderer."""
+        return list(zip(self.regions.values(), self.region_colors))
+
+    def overlay_labels(self):
+        """Returns the {region: counts text} labels shown on the frames."""
+        totals = self.counts.sum(axis=1)
+        return {name: f"IN {totals[r, 0]} OUT {totals[r, 1]}" for r, name in enumerate(self.region_names)}
+
+    def region_counts(self):
+        """Returns {region name: {class name: {"IN": n, "OUT": m}}} of the classes counted in each region."""
+        totals = {}
+        for r, name in enumerate(self.region_names):
+            totals[name] = {
+                self.names[c]: {"IN": int(self.counts[r, c, 0]), "OUT": int(self.counts[r, c, 1])}
+                for c in np.flatnonzero(self.counts[r].any(axis=1))
+                if c in self.names
+            }
+        return totals
+
+    def display_frames(self):
+        """Displays the current frame with annotations and regions in a window."""
+        if self.env_check:
+            cv2.imshow(self.window_name, self.im0)
+            if cv2.waitKey(1) & 0xFF == ord("q"):
+                return
+
+    def start_counting(self, im0, tracks, draw=None):
+        """
+        Counts the tracks of one frame over all regions and annotates it.
+
+        Args:
+            im0 (ndarray): Current frame from the video stream.
+            tracks (list): List of tracks obtained from the object tracking process.
+            draw (bool, optional): Annotate this frame, defaults to the `draw` attribute.
+
+        Returns:
+            (ndarray): The frame.
+        """
+        self.im0 = im0
+        draw = self.draw if draw is None else draw
+        self.update_tracks(tracks)
+
+        if draw:
+            self.render(self.im0)
+
+        if self.view_img:
+            self.display_frames()
+        return self.im0
+
+    def reset_counts(self):
+        """Resets all tallies, tracks already counted can be counted again."""
+        self.counts[:] = 0
+        self.counted = {}
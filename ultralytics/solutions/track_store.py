@@ -0,0 +1,99 @@
+# Ultralytics YOLO 🚀, AGPL-3.0 license
+
+import time
+from collections import deque
+
+
+class TrackStore:
+    """
+    Bounded per-track geometry for the counting solutions, keyed by track id.
+
+    Every live track keeps a short position history and its last-seen time. Entries are evicted when the tracker
+    reports a track as removed, or when a track has not been seen for `ttl` seconds (e.g. after a tracker reset or a
+    stream reconnect), so the store only ever holds roughly the tracks that are currently in view.
+
+    Attributes:
+        history_length (int): Number of positions kept per track.
+        ttl (float): Seconds after which an unseen track is evicted, None to rely on evict() only.
+        history (dict): Track id -> deque of (x, y) positions.
+        last_seen (dict): Track id -> last-seen time, ordered from least to most recently seen.
+        evicted (int): Number of entries evicted so far.
+    """
+
+    def __init__(self, history_length=15, ttl=60.0):
+        """Initializes an empty store."""
+        self.history_length = history_length
+        self.ttl = ttl
+        self.history = {}
+        self.last_seen = {}
+        self.evicted = 0
+
+    def __len__(self):
+        """Returns the number of tracks held."""
+        return len(self.history)
+
+    def __contains__(self, track_id):
+        """Returns True if the track is held."""
+        return track_id in self.history
+
+    def __getitem__(self, track_id):
+        """Returns the position history of a track, an empty one if it is not held."""
+        return self.history.get(track_id, ())
+
+    def update(self, track_id, point, t=None):
+        """
+        Appends the current position of a track and marks it as seen.
+
+        Args:
+            track_id (int): Track id.
+            point (tuple): Current (x, y) position.
+            t (float, optional): Current time, defaults to the monotonic clock.
+
+        Returns:
+            (deque): The position history of the track, including `point`.
+        """
+        line = self.history.get(track_id)
+        if line is None:
+            line = self.history[track_id] = deque(maxlen=self.history_length)
+        line.append(point)
+        self.last_seen.pop(track_id, None)  # re-insert to keep last_seen ordered by time
+        self.last_seen[track_id] = time.monotonic() if t is None else t
+        return line
+
+    def evict(self, track_ids):
+        """Drops the given tracks, returns the ids that were held."""
+        evicted = []
+        for track_id in track_ids:
+            if self.history.pop(track_id, None) is not None:
+                self.last_seen.pop(track_id, None)
+                evicted.append(track_id)
+        self.evicted += len(evicted)
+        return evicted
+
+    def expire(self, t=None):
+        """
+        Drops the tracks not seen for more than `ttl` seconds.
+
+        Only the expired entries at the front of the time-ordered `last_seen` dict are visited, so this is cheap to call
+        on every frame.
+
+        Args:
+            t (float, optional): Current time, defaults to the monotonic clock.
+
+        Returns:
+            (list): Ids of the expired tracks.
+        """
+        if self.ttl is None:
+            return []
+        deadline = (time.monotonic() if t is None else t) - self.ttl
+        expired = []
+        for track_id, seen in self.last_seen.items():
+            if seen >= deadline:
+                break
+            expired.append(track_id)
+        return self.evict(expired)
+
+    def clear(self):
+        """Drops all tracks."""
+        self.history.clear()
+        self.last_seen.clear()
@@ -0,0 +1,337 @@
+# Ultralytics YOLO 🚀, AGPL-3.0 license
+
+import time
+
+import cv2
+import numpy as np
+
+from ultralytics.solutions.count_events import EventLog
+from ultralytics.solutions.count_renderer import CountRenderer
+from ultralytics.solutions.line_crossing import points_in_polygons, polygon_edges
+from ultralytics.solutions.track_store import TrackStore
+from ultralytics.utils.checks import check_imshow
+from ultralytics.utils.plotting import colors
+
+# Upper bounds of the dwell time histogram bins in seconds, the last bin collects everything longer
+DWELL_BINS = (5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+
+class ZoneOccupancy:
+    """
+    Current occupancy and dwell times of polygon zones, updated incrementally from the tracks of each frame.
+
+    Only the tracks currently held are visited per frame: every track keeps one row with its last-seen time, its class
+    and the time it entered each zone (NaN while outside). Entering a zone starts a visit. Leaving it, being removed by
+    the tracker or going unseen for `track_ttl` seconds ends it and adds its duration to a fixed-size histogram. Nothing
+    grows with the number of tracks seen over time, finished visits only exist as histogram counts and sums.
+
+    Attributes:
+        zones (dict): Zone name -> polygon points.
+        zone_names (list): Zone names in the order of the first axis of all arrays.
+        occupancy (np.ndarray): int64 (zones,) number of tracks currently inside each zone.
+        visits (np.ndarray): int64 (zones,) number of finished visits.
+        dwell_sum (np.ndarray): float64 (zones,) total duration of the finished visits in seconds.
+        dwell_max (np.ndarray): float64 (zones,) longest finished visit in seconds.
+        histogram (np.ndarray): int64 (zones, bins) finished visits per dwell time bin, see `dwell_bins`.
+        events (EventLog): "IN" and "OUT" events of every visit.
+    """
+
+    def __init__(
+        self,
+        classes_names,
+        zones,
+        dwell_bins=DWELL_BINS,
+        zone_colors=None,
+        count_txt_color=(0, 0, 0),
+        count_bg_color=(255, 255, 255),
+        line_thickness=2,
+        region_thickness=5,
+        view_img=False,
+        track_ttl=60.0,
+        headless=False,
+        draw=True,
+        event_capacity=10000,
+    ):
+        """
+        Initializes the zones and empty statistics.
+
+        Args:
+            classes_names (dict): Dictionary of class names.
+            zones (dict | list): Zone name -> polygon points (at least 3), or a list of polygons named by their index.
+            dwell_bins (tuple): Increasing upper bounds of the dwell time histogram bins in seconds.
+            zone_colors (list, optional): RGB color of every zone, defaults to the track color palette.
+            count_txt_color (tuple): RGB color of the statistics text.
+            count_bg_color (tuple): RGB color of the statistics text background.
+            line_thickness (int): Line thickness for bounding boxes.
+            region_thickness (int): Thickness of the zone outlines.
+            view_img (bool): Flag to control whether to display the video stream.
+            track_ttl (float): Seconds after which a track that is no longer seen leaves its zones, None to only end
+                visits through evict().
+            headless (bool): Never make GUI calls, view_img is ignored and the imshow check is skipped.
+            draw (bool): Draw the zones, boxes and statistics on the frame, False to only update the statistics.
+            event_capacity (int): Number of events kept in the `events` log.
+        """
+        if not isinstance(zones, dict):
+            zones = {str(i): pts for i, pts in enumerate(zones)}
+        if not zones or any(len(pts) < 3 for pts in zones.values()):
+            raise ValueError("ZoneOccupancy needs at least one zone, each a polygon of >= 3 points.")
+        self.zones = {name: [tuple(p) for p in pts] for name, pts in zones.items()}
+        self.zone_names = list(self.zones)
+        self.region_colors = zone_colors or [colors(i, True) for i in range(len(self.zones))]
+        self.region_thickness = region_thickness
+
+        # Image and annotation Information
+        self.im0 = None
+        self.tf = line_thickness
+        self.headless = headless
+        self.view_img = view_img and not headless
+        self.draw = draw
+        self.count_txt_color = count_txt_color
+        self.count_bg_color = count_bg_color
+        self.names = classes_names
+        self.renderer = None  # CountRenderer, created on the first annotated frame
+        self.last_tracks = ((), (), ())  # boxes, track ids and classes of the last update, for the renderer
+        self.window_name = "Ultralytics YOLOv8 Zone Occupancy"
+        self.env_check = False if headless else check_imshow(warn=True)
+
+        # Zone geometry, compiled once into arrays
+        pts = [np.asarray(p, dtype=np.float64) for p in self.zones.values()]
+        self.bounds = np.array([[*p.min(0), *p.max(0)] for p in pts])  # (Z, 4) x1, y1, x2, y2
+        self.edges = polygon_edges(pts)
+
+        # Statistics, all fixed-size
+        n = len(self.zones)
+        self.dwell_bins = np.asarray(dwell_bins, dtype=np.float64)
+        self.occupancy = np.zeros(n, dtype=np.int64)
+        self.visits = np.zeros(n, dtype=np.int64)
+        self.dwell_sum = np.zeros(n, dtype=np.float64)
+        self.dwell_max = np.zeros(n, dtype=np.float64)
+        self.histogram = np.zeros((n, len(self.dwell_bins) + 1), dtype=np.int64)
+
+        # Per-track state: [last seen, class, enter time of every zone or NaN], only for the tracks currently held
+        self.state = {}
+        self.track_history = TrackStore(1, ttl=track_ttl)  # last-seen ordering for the TTL
+        self.events = EventLog(event_capacity)
+
+    def zone_membership(self, points):
+        """
+        Tests which points are inside which zones.
+
+        Args:
+            points (np.ndarray): Points of shape (N, 2).
+
+        Returns:
+            (np.ndarray): Boolean array of shape (N, zones).
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        in_box = np.all((points[:, None] >= self.bounds[:, :2]) & (points[:, None] <= self.bounds[:, 2:]), axis=2)
+        inside = np.zeros_like(in_box)
+        track, zone = np.nonzero(in_box)  # exact test only where the point is inside the zone's bounding box
+        inside[track, zone] = points_in_polygons(points[track], zone, self.edges)
+        return inside
+
+    def update(self, track_ids, clss, points, t=None):
+        """
+        Updates occupancy and dwell times from the positions of the tracks of one frame.
+
+        Args:
+            track_ids (list): Track ids.
+            clss (list): Class index of every track.
+            points (np.ndarray): Reference point of every track, e.g. its box bottom centre, shape (N, 2).
+            t (float, optional): Current time, defaults to the monotonic clock.
+
+        Returns:
+            (list[CountEvent]): The "IN" and "OUT" events of this frame.
+        """
+        t = time.monotonic() if t is None else t
+        events = self.evict(self.track_history.expire(t))
+        if not len(track_ids):
+            return events
+        for track_id in track_ids:
+            self.track_history.update(track_id, None, t)
+
+        blank = np.full(len(self.zones) + 2, np.nan)
+        rows = np.stack([self.state.get(track_id, blank) for track_id in track_ids])  # (N, 2 + zones)
+        rows[:, 0], rows[:, 1] = t, clss
+        enter = rows[:, 2:]  # view, updated in place
+        was_inside = ~np.isnan(enter)
+        inside = self.zone_membership(points)
+
+        entered, left = inside & ~was_inside, was_inside & ~inside
+        enter[entered] = t
+        if left.any():
+            track, zone = np.nonzero(left)
+            self._finish(zone, t - enter[track, zone])
+            enter[left] = np.nan
+        self.occupancy += entered.sum(axis=0) - left.sum(axis=0)
+
+        for i, track_id in enumerate(track_ids):
+            self.state[track_id] = rows[i]
+        for direction, mask in (("OUT", left), ("IN", entered)):
+            for i, z in zip(*np.nonzero(mask)):
+                events.append(self.events.append(track_ids[i], clss[i], self.zone_names[z], direction))
+        return events
+
+    def _finish(self, zone, dwell):
+        """Adds finished visits of the given zones and durations to the statistics."""
+        n = len(self.zones)
+        self.visits += np.bincount(zone, minlength=n)
+        self.dwell_sum += np.bincount(zone, weights=dwell, minlength=n)
+        np.maximum.at(self.dwell_max, zone, dwell)
+        np.add.at(self.histogram, (zone, np.searchsorted(self.dwell_bins, dwell)), 1)
+
+    def evict(self, track_ids):
+        """
+        Ends the visits of tracks the tracker no longer knows at the time they were last seen, and drops their state.
+
+        Args:
+            track_ids (Iterable[int]): Ids of the removed tracks, e.g. the tracker's `removed_ids`.
+
+        Returns:
+            (list[CountEvent]): The "OUT" events of the ended visits.
+        """
+        events = []
+        for track_id in track_ids:
+            row = self.state.pop(track_id, None)
+            if row is None:
+                continue
+            zone = np.flatnonzero(~np.isnan(row[2:]))
+            if len(zone):
+                self._finish(zone, row[0] - row[2:][zone])
+                self.occupancy[zone] -= 1
+                for z in zone:
+                    events.append(self.events.append(track_id, row[1], self.zone_names[z], "OUT"))
+        if track_ids:
+            self.track_history.evict(track_ids)
+        return events
+
+    def current_dwell(self, t=None):
+        """
+        Returns the time every track currently inside a zone has spent there so far, in O(tracks held).
+
+        Args:
+            t (float, optional): Current time, defaults to the monotonic clock.
+
+        Returns:
+            (list[np.ndarray]): Dwell times in seconds of the tracks inside each zone.
+        """
+        t = time.monotonic() if t is None else t
+        if not self.state:
+            return [np.zeros(0) for _ in self.zone_names]
+        enter = np.stack(list(self.state.values()))[:, 2:]
+        return [t - e[~np.isnan(e)] for e in enter.T]
+
+    def dwell_percentile(self, q):
+        """Returns the q-th percentile (0-100) of the finished visits of every zone, as histogram bin upper bounds."""
+        cumulative = np.cumsum(self.histogram, axis=1)
+        rank = np.ceil(q / 100 * cumulative[:, -1:]).clip(min=1)
+        bins = np.append(self.dwell_bins, np.inf)
+        return np.where(self.visits > 0, bins[(cumulative < rank).sum(axis=1).clip(max=len(bins) - 1)], np.nan)
+
+    def stats(self, t=None):
+        """
+        Returns the statistics of every zone.
+
+        Args:
+            t (float, optional): Current time, defaults to the monotonic clock.
+
+        Returns:
+            (dict): Zone name -> occupancy, visits, mean/max/p50/p90 dwell of the finished visits and the mean dwell so
+                far of the tracks inside, all times in seconds.
+        """
+        current = self.current_dwell(t)
+        p50, p90 = self.dwell_percentile(50), self.dwell_percentile(90)
+        return {
+            name: {
+                "occupancy": int(self.occupancy[z]),
+                "visits": int(self.visits[z]),
+                "mean_dwell": float(self.dwell_sum[z] / self.visits[z]) if self.visits[z] else 0.0,
+                "max_dwell": float(self.dwell_max[z]),
+                "p50_dwell": float(p50[z]),
+                "p90_dwell": float(p90[z]),
+                "current_dwell": float(current[z].mean()) if len(current[z]) else 0.0,
+            }
+            for z, name in enumerate(self.zone_names)
+        }
+
+    def update_tracks(self, tracks, t=None):
+        """
+        Updates the statistics from one Results object, using the bottom centre of each box as the track position.
+
+        Args:
+            tracks (list): List of tracks obtained from the object tracking process.
+            t (float, optional): Current time, defaults to the monotonic clock.
+
+        Returns:
+            (list[CountEvent]): The "IN" and "OUT" events of this frame.
+        """
+        boxes = tracks[0].boxes
+        if boxes.id is None:
+            self.last_tracks = ((), (), ())
+            return self.update([], [], np.zeros((0, 2)), t)
+        xyxy = boxes.xyxy.cpu()
+        clss = boxes.cls.int().cpu().tolist()
+        track_ids = boxes.id.int().cpu().tolist()
+        self.last_tracks = (xyxy, track_ids, clss)
+        feet = np.stack(((xyxy[:, 0] + xyxy[:, 2]).numpy() / 2, xyxy[:, 3].numpy()), axis=1)
+        return self.update(track_ids, clss, feet, t)
+
+    def render(self, im0, draw_boxes=True):
+        """
+        Annotates a frame with the zones, the tracks of the last update and the zone statistics.
+
+        Args:
+            im0 (np.ndarray): Frame to draw on, in place.
+            draw_boxes (bool): Draw the boxes of the last update, False for frames that were not processed.
+
+        Returns:
+            (np.ndarray): The annotated frame.
+        """
+        if self.renderer is None:
+            self.renderer = CountRenderer(self)
+        return self.renderer.render(im0, draw_boxes=draw_boxes)
+
+    def overlay_regions(self):
+        """Returns the (points, color) of every zone for the renderer."""
+        return list(zip(self.zones.values(), self.region_colors))
+
+    def overlay_labels(self):
+        """Returns the {zone: statistics text} labels, they only change when a track enters or leaves."""
+        return {
+            name: f"{self.occupancy[z]} inside, avg {self.dwell_sum[z] / max(self.visits[z], 1):.0f}s"
+            for z, name in enumerate(self.zone_names)
+        }
+
+    def display_frames(self):
+        """Displays the current frame with annotations and zones in a window."""
+        if self.env_check:
+            cv2.imshow(self.window_name, self.im0)
+            if cv2.waitKey(1) & 0xFF == ord("q"):
+                return
+
+    def process_zones(self, im0, tracks, draw=None):
+        """
+        Updates the zone statistics from the tracks of one frame and annotates it.
+
+        Args:
+            im0 (ndarray): Current frame from the video stream.
+            tracks (list): List of tracks obtained from the object tracking process.
+            draw (bool, optional): Annotate this frame, defaults to the `draw` attribute.
+
+        Returns:
+            (ndarray): The frame.
+        """
+        self.im0 = im0
+        self.update_tracks(tracks)
+        if self.draw if draw is None else draw:
+            self.render(self.im0)
+        if self.view_img:
+            self.display_frames()
+        return self.im0
+
+    def reset_stats(self):
+        """Resets the finished-visit statistics, the tracks inside the zones keep their visits."""
+        self.visits[:] = 0
+        self.dwell_sum[:] = 0
+        self.dwell_max[:] = 0
+        self.histogram[:] = 0
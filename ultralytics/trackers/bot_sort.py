@@ -6,6 +6,7 @@ import numpy as np
 
 from .basetrack import TrackState
 from .byte_tracker import BYTETracker, STrack
+from .track_table import TrackTable
 from .utils import matching
 from .utils.gmc import GMC
 from .utils.kalman_filter import KalmanFilterXYWH
@@ -53,6 +54,16 @@ class BOTrack(STrack):
         self.features = deque([], maxlen=feat_history)
         self.alpha = 0.9
 
+    @classmethod
+    def view(cls, table, row, feat_history=50):
+        """Returns a track backed by an existing row of a TrackTable, without features."""
+        track = super().view(table, row)
+        track.smooth_feat = None
+        track.curr_feat = None
+        track.features = deque([], maxlen=feat_history)
+        track.alpha = 0.9
+        return track
+
     def update_features(self, feat):
         """Update features vector and smooth it using exponential moving average."""
         feat /= np.linalg.norm(feat)
@@ -135,7 +146,8 @@ class BOTSORT(BYTETracker):
 
     Methods:
         get_kalmanfilter(): Returns an instance of KalmanFilterXYWH for object tracking.
-        init_track(dets, scores, cls, img): Initialize track with detections, scores, and classes.
+        get_table(): Returns an empty TrackTable with xywh measurements and BOTrack views.
+        init_track(dets, scores, cls, img): Adds detections to the track table, with ReID features if enabled.
         get_dists(tracks, detections): Get distances between tracks and detections using IoU and (optionally) ReID.
         multi_predict(tracks): Predict and track multiple objects with YOLOv8 model.
 
@@ -164,35 +176,50 @@ class BOTSORT(BYTETracker):
         """Returns an instance of KalmanFilterXYWH for object tracking."""
         return KalmanFilterXYWH()
 
+    def get_table(self):
+        """Returns an empty TrackTable with xywh measurements and BOTrack views."""
+        return TrackTable("xywh", BOTrack, self.kalman_filter)
+
     def init_track(self, dets, scores, cls, img=None):
-        """Initialize track with detections, scores, and classes."""
-        if len(dets) == 0:
-            return []
-        if self.args.with_reid and self.encoder is not None:
+        """Adds the detections to the track table and returns their rows, with ReID features if enabled."""
+        detections = self.table.add_detections(dets, scores, cls)
+        if len(dets) and self.args.with_reid and self.encoder is not None:
             features_keep = self.encoder.inference(img, dets)
-            return [BOTrack(xyxy, s, c, f) for (xyxy, s, c, f) in zip(dets, scores, cls, features_keep)]  # detections
-        else:
-            return [BOTrack(xyxy, s, c) for (xyxy, s, c) in zip(dets, scores, cls)]  # detections
+            for row, feat in zip(detections.tolist(), features_keep):
+                self.table.view(row).update_features(feat)
+        return detections
 
     def get_dists(self, tracks, detections):
         """Get distances between tracks and detections using IoU and (optionally) ReID embeddings."""
-        dists = matching.iou_distance(tracks, detections)
+        dists = matching.iou_distance(self.table.get_boxes(tracks), self.table.get_boxes(detections))
         dists_mask = dists > self.proximity_thresh
 
         # TODO: mot20
         # if not self.args.mot20:
-        dists = matching.fuse_score(dists, detections)
+        dists = matching.fuse_score(dists, self.table.score[detections])
 
         if self.args.with_reid and self.encoder is not None:
-            emb_dists = matching.embedding_distance(tracks, detections) / 2.0
+            emb_dists = matching.embedding_distance(
+                [self.table.view(row) for row in tracks.tolist()],
+                [self.table.view(row) for row in detections.tolist()],
+            )
+            emb_dists /= 2.0
             emb_dists[emb_dists > self.appearance_thresh] = 1.0
             emb_dists[dists_mask] = 1.0
             dists = np.minimum(dists, emb_dists)
         return dists
 
+    def update_matched(self, tracks, detections):
+        """Updates tracks with their matched detections, merging the detection features into the tracks first."""
+        if self.args.with_reid and self.encoder is not None:
+            for track, det in zip(tracks.tolist(), detections.tolist()):
+                if self.table.view(det).curr_feat is not None:
+                    self.table.view(track).update_features(self.table.view(det).curr_feat)
+        return super().update_matched(tracks, detections)
+
     def multi_predict(self, tracks):
-        """Predict and track multiple objects with YOLOv8 model."""
-        BOTrack.multi_predict(tracks)
+        """Predicts the Kalman states of the given track rows, velocities in size are frozen for lost tracks."""
+        self.table.predict(tracks, self.kalman_filter, frozen=(6, 7))
 
     def reset(self):
         """Reset tracker."""
@@ -1,14 +1,31 @@
 # Ultralytics YOLO 🚀, AGPL-3.0 license
 
+import math
+from collections import OrderedDict
+
 import numpy as np
 
 from ..utils import LOGGER
 from ..utils.ops import xywh2ltwh
 from .basetrack import BaseTrack, TrackState
+from .track_table import TrackTable
 from .utils import matching
 from .utils.kalman_filter import KalmanFilterXYAH
 
 
+def _column(name, cast=None):
+    """Returns a property reading and writing column `name` of the track's row, optionally cast on read."""
+
+    def fget(self):
+        value = getattr(self.table, name)[self.row]
+        return value if cast is None else cast(value)
+
+    def fset(self, value):
+        getattr(self.table, name)[self.row] = value
+
+    return property(fget, fset, doc=f"The `{name}` column of the track's row.")
+
+
 class STrack(BaseTrack):
     """
     Single object tracking representation that uses Kalman filtering for state estimation.
@@ -16,7 +33,13 @@ class STrack(BaseTrack):
     This class is responsible for storing all the information regarding individual tracklets and performs state updates
     and predictions based on Kalman filter.
 
+    The state of a track lives in one row of a TrackTable, the attributes below are views of its columns. BYTETracker
+    works on the table directly and only creates STrack objects on demand (see `view`); an STrack constructed on its
+    own gets a private one-row table.
+
     Attributes:
+        table (TrackTable): Table holding the state of the track.
+        row (int): Row of the track in `table`.
         shared_kalman (KalmanFilterXYAH): Shared Kalman filter that is used across all STrack instances for prediction.
         _tlwh (np.ndarray): Private attribute to store top-left corner coordinates and width and height of bounding box.
         kalman_filter (KalmanFilterXYAH): Instance of Kalman filter used for this particular object track.
@@ -43,8 +66,21 @@ class STrack(BaseTrack):
 
     shared_kalman = KalmanFilterXYAH()
 
+    track_id = _column("track_id", int)
+    state = _column("state", int)
+    is_activated = _column("is_activated", bool)
+    score = _column("score")
+    cls = _column("cls")
+    idx = _column("idx")
+    frame_id = _column("frame_id", int)
+    start_frame = _column("start_frame", int)
+    tracklet_len = _column("tracklet_len", int)
+    _tlwh = _column("tlwh")
+
     def __init__(self, xywh, score, cls):
         """Initialize new STrack instance."""
+        self.table = TrackTable(capacity=1)
+        self.row = int(self.table.allocate(1)[0])
         super().__init__()
         # xywh+idx or xywha+idx
         assert len(xywh) in {5, 6}, f"expected 5 or 6 values but got {len(xywh)}"
@@ -59,6 +95,53 @@ class STrack(BaseTrack):
         self.idx = xywh[-1]
         self.angle = xywh[4] if len(xywh) == 6 else None
 
+    @classmethod
+    def view(cls, table, row):
+        """Returns a track backed by an existing row of a TrackTable, the row is left unchanged."""
+        track = cls.__new__(cls)
+        track.table, track.row = table, row
+        track.kalman_filter = table.kalman_filter
+        track.history = OrderedDict()
+        track.features = []
+        track.curr_feature = None
+        track.time_since_update = 0
+        track.location = (np.inf, np.inf)
+        return track
+
+    @property
+    def mean(self):
+        """Kalman state mean of the track, None before it is activated."""
+        return self.table.mean[self.row] if self.table.has_mean[self.row] else None
+
+    @mean.setter
+    def mean(self, value):
+        """Sets the Kalman state mean, None clears it."""
+        self.table.has_mean[self.row] = value is not None
+        if value is not None:
+            self.table.mean[self.row] = value
+
+    @property
+    def covariance(self):
+        """Kalman state covariance of the track, None before it is activated."""
+        return self.table.covariance[self.row] if self.table.has_mean[self.row] else None
+
+    @covariance.setter
+    def covariance(self, value):
+        """Sets the Kalman state covariance."""
+        if value is not None:
+            self.table.covariance[self.row] = value
+
+    @property
+    def angle(self):
+        """Angle of an oriented box, None for axis-aligned boxes."""
+        angle = self.table.angle[self.row]
+        return None if np.isnan(angle) else angle
+
+    @angle.setter
+    def angle(self, value):
+        """Sets the box angle, None for axis-aligned boxes."""
+        self.table.angle[self.row] = np.nan if value is None else value
+
     def predict(self):
         """Predicts mean and covariance using Kalman filter."""
         mean_state = self.mean.copy()
@@ -217,46 +300,70 @@ class BYTETracker:
     sequence. It maintains the state of tracked, lost, and removed tracks over frames, utilizes Kalman filtering for
     predicting the new object locations, and performs data association.
 
+    Tracks and detections are rows of a TrackTable and every step of an update works on arrays of row indices, so the
+    cost per frame is a handful of array operations rather than Python work per track. STrack objects are only built
+    when `tracked_stracks` or `lost_stracks` are read.
+
     Attributes:
-        tracked_stracks (list[STrack]): List of successfully activated tracks.
-        lost_stracks (list[STrack]): List of lost tracks.
-        removed_stracks (list[STrack]): List of removed tracks.
+        table (TrackTable): Storage of the state of all tracks and of the detections of the current frame.
+        tracked (np.ndarray): Rows of the tracked tracks, confirmed and unconfirmed.
+        lost (np.ndarray): Rows of the lost tracks.
+        tracked_stracks (list[STrack]): Views of the tracked tracks.
+        lost_stracks (list[STrack]): Views of the lost tracks.
+        removed_stracks (list[STrack]): Views of recently removed tracks.
+        removed_ids (list[int]): Ids of the tracks removed by the latest update() or skip_frame() call, for callers
+            that keep per-track state.
         frame_id (int): The current frame ID.
         args (namespace): Command-line arguments.
+        frame_rate (float): Rate at which frames are passed to update(), in frames per second.
         max_time_lost (int): The maximum frames for a track to be considered as 'lost'.
         kalman_filter (object): Kalman Filter object.
 
     Methods:
         update(results, img=None): Updates object tracker with new detections.
+        skip_frame(): Advances the tracks by one frame without detections.
+        set_frame_rate(frame_rate): Adapts the motion model and lost-track buffer to a new processing rate.
+        get_max_time_lost(frame_rate): Returns the number of frames lost tracks are kept at a frame rate.
         get_kalmanfilter(): Returns a Kalman filter object for tracking bounding boxes.
-        init_track(dets, scores, cls, img=None): Initialize object tracking with detections.
+        get_table(): Returns an empty TrackTable for the tracks.
+        init_track(dets, scores, cls, img=None): Adds the detections to the table and returns their rows.
         get_dists(tracks, detections): Calculates the distance between tracks and detections.
         multi_predict(tracks): Predicts the location of tracks.
         reset_id(): Resets the ID counter of STrack.
-        joint_stracks(tlista, tlistb): Combines two lists of stracks.
-        sub_stracks(tlista, tlistb): Filters out the stracks present in the second list from the first list.
-        remove_duplicate_stracks(stracksa, stracksb): Removes duplicate stracks based on IoU.
+        joint_stracks(tlista, tlistb): Combines two arrays of track rows.
+        sub_stracks(tlista, tlistb): Filters out the rows present in the second array from the first one.
+        remove_duplicate_stracks(stracksa, stracksb): Removes duplicate tracks based on IoU.
     """
 
     def __init__(self, args, frame_rate=30):
         """Initialize a YOLOv8 object to track objects with given arguments and frame rate."""
-        self.tracked_stracks = []  # type: list[STrack]
-        self.lost_stracks = []  # type: list[STrack]
         self.removed_stracks = []  # type: list[STrack]
+        self.removed_ids = []
 
         self.frame_id = 0
         self.args = args
-        self.max_time_lost = int(frame_rate / 30.0 * args.track_buffer)
+        self.frame_rate = frame_rate
+        self.max_time_lost = self.get_max_time_lost(frame_rate)
         self.kalman_filter = self.get_kalmanfilter()
+        self.table = self.get_table()
+        self.tracked = np.empty(0, dtype=np.intp)
+        self.lost = np.empty(0, dtype=np.intp)
         self.reset_id()
 
+    @property
+    def tracked_stracks(self):
+        """Views of the tracked tracks, in tracking order."""
+        return [self.table.view(row) for row in self.tracked.tolist()]
+
+    @property
+    def lost_stracks(self):
+        """Views of the lost tracks."""
+        return [self.table.view(row) for row in self.lost.tolist()]
+
     def update(self, results, img=None):
         """Updates object tracker with new detections and returns tracked object bounding boxes."""
         self.frame_id += 1
-        activated_stracks = []
-        refind_stracks = []
-        lost_stracks = []
-        removed_stracks = []
+        table = self.table
 
         scores = results.conf
         bboxes = results.xywhr if hasattr(results, "xywhr") else results.xywh
@@ -277,112 +384,168 @@ class BYTETracker:
         cls_second = cls[inds_second]
 
         detections = self.init_track(dets, scores_keep, cls_keep, img)
+        all_detections = detections
         # Add newly detected tracklets to tracked_stracks
-        unconfirmed = []
-        tracked_stracks = []  # type: list[STrack]
-        for track in self.tracked_stracks:
-            if not track.is_activated:
-                unconfirmed.append(track)
-            else:
-                tracked_stracks.append(track)
+        confirmed = table.is_activated[self.tracked]
+        unconfirmed = self.tracked[~confirmed]
+        tracked_stracks = self.tracked[confirmed]
         # Step 2: First association, with high score detection boxes
-        strack_pool = self.joint_stracks(tracked_stracks, self.lost_stracks)
+        strack_pool = self.joint_stracks(tracked_stracks, self.lost)
         # Predict the current location with KF
         self.multi_predict(strack_pool)
         if hasattr(self, "gmc") and img is not None:
             warp = self.gmc.apply(img, dets)
-            STrack.multi_gmc(strack_pool, warp)
-            STrack.multi_gmc(unconfirmed, warp)
+            table.apply_gmc(strack_pool, warp)
+            table.apply_gmc(unconfirmed, warp)
 
         dists = self.get_dists(strack_pool, detections)
         matches, u_track, u_detection = matching.linear_assignment(dists, thresh=self.args.match_thresh)
-
-        for itracked, idet in matches:
-            track = strack_pool[itracked]
-            det = detections[idet]
-            if track.state == TrackState.Tracked:
-                track.update(det, self.frame_id)
-                activated_stracks.append(track)
-            else:
-                track.re_activate(det, self.frame_id, new_id=False)
-                refind_stracks.append(track)
+        matches = np.asarray(matches, dtype=np.intp).reshape(-1, 2)
+        activated_stracks, refind_stracks = self.update_matched(strack_pool[matches[:, 0]], detections[matches[:, 1]])
         # Step 3: Second association, with low score detection boxes association the untrack to the low score detections
         detections_second = self.init_track(dets_second, scores_second, cls_second, img)
-        r_tracked_stracks = [strack_pool[i] for i in u_track if strack_pool[i].state == TrackState.Tracked]
+        r_tracked_stracks = strack_pool[np.asarray(u_track, dtype=np.intp)]
+        r_tracked_stracks = r_tracked_stracks[table.state[r_tracked_stracks] == TrackState.Tracked]
         # TODO
-        dists = matching.iou_distance(r_tracked_stracks, detections_second)
+        dists = matching.iou_distance(table.get_boxes(r_tracked_stracks), table.get_boxes(detections_second))
         matches, u_track, u_detection_second = matching.linear_assignment(dists, thresh=0.5)
-        for itracked, idet in matches:
-            track = r_tracked_stracks[itracked]
-            det = detections_second[idet]
-            if track.state == TrackState.Tracked:
-                track.update(det, self.frame_id)
-                activated_stracks.append(track)
-            else:
-                track.re_activate(det, self.frame_id, new_id=False)
-                refind_stracks.append(track)
-
-        for it in u_track:
-            track = r_tracked_stracks[it]
-            if track.state != TrackState.Lost:
-                track.mark_lost()
-                lost_stracks.append(track)
+        matches = np.asarray(matches, dtype=np.intp).reshape(-1, 2)
+        activated, refind = self.update_matched(r_tracked_stracks[matches[:, 0]], detections_second[matches[:, 1]])
+        activated_stracks = np.concatenate((activated_stracks, activated))
+        refind_stracks = np.concatenate((refind_stracks, refind))
+
+        lost_stracks = r_tracked_stracks[np.asarray(u_track, dtype=np.intp)]
+        lost_stracks = lost_stracks[table.state[lost_stracks] != TrackState.Lost]
+        table.state[lost_stracks] = TrackState.Lost
         # Deal with unconfirmed tracks, usually tracks with only one beginning frame
-        detections = [detections[i] for i in u_detection]
+        detections = detections[np.asarray(u_detection, dtype=np.intp)]
         dists = self.get_dists(unconfirmed, detections)
         matches, u_unconfirmed, u_detection = matching.linear_assignment(dists, thresh=0.7)
-        for itracked, idet in matches:
-            unconfirmed[itracked].update(detections[idet], self.frame_id)
-            activated_stracks.append(unconfirmed[itracked])
-        for it in u_unconfirmed:
-            track = unconfirmed[it]
-            track.mark_removed()
-            removed_stracks.append(track)
+        matches = np.asarray(matches, dtype=np.intp).reshape(-1, 2)
+        activated, refind = self.update_matched(unconfirmed[matches[:, 0]], detections[matches[:, 1]])
+        activated_stracks = np.concatenate((activated_stracks, activated, refind))
+        removed_stracks = unconfirmed[np.asarray(u_unconfirmed, dtype=np.intp)]
+        table.state[removed_stracks] = TrackState.Removed
         # Step 4: Init new stracks
-        for inew in u_detection:
-            track = detections[inew]
-            if track.score < self.args.new_track_thresh:
-                continue
-            track.activate(self.kalman_filter, self.frame_id)
-            activated_stracks.append(track)
+        new_stracks = detections[np.asarray(u_detection, dtype=np.intp)]
+        new_stracks = new_stracks[table.score[new_stracks] >= self.args.new_track_thresh]
+        table.activate(new_stracks, self.kalman_filter, self.frame_id, [STrack.next_id() for _ in new_stracks])
+        activated_stracks = np.concatenate((activated_stracks, new_stracks))
         # Step 5: Update state
-        for track in self.lost_stracks:
-            if self.frame_id - track.end_frame > self.max_time_lost:
-                track.mark_removed()
-                removed_stracks.append(track)
-
-        self.tracked_stracks = [t for t in self.tracked_stracks if t.state == TrackState.Tracked]
-        self.tracked_stracks = self.joint_stracks(self.tracked_stracks, activated_stracks)
-        self.tracked_stracks = self.joint_stracks(self.tracked_stracks, refind_stracks)
-        self.lost_stracks = self.sub_stracks(self.lost_stracks, self.tracked_stracks)
-        self.lost_stracks.extend(lost_stracks)
-        self.lost_stracks = self.sub_stracks(self.lost_stracks, self.removed_stracks)
-        self.tracked_stracks, self.lost_stracks = self.remove_duplicate_stracks(self.tracked_stracks, self.lost_stracks)
-        self.removed_stracks.extend(removed_stracks)
-        if len(self.removed_stracks) > 1000:
-            self.removed_stracks = self.removed_stracks[-999:]  # clip remove stracks to 1000 maximum
-
-        return np.asarray([x.result for x in self.tracked_stracks if x.is_activated], dtype=np.float32)
+        expired = self.lost[self.frame_id - table.frame_id[self.lost] > self.max_time_lost]
+        table.state[expired] = TrackState.Removed
+        removed_stracks = np.concatenate((removed_stracks, expired))
+
+        previous = np.concatenate((self.tracked, self.lost, all_detections, detections_second))
+        tracked = self.tracked[table.state[self.tracked] == TrackState.Tracked]
+        tracked = self.joint_stracks(tracked, activated_stracks)
+        tracked = self.joint_stracks(tracked, refind_stracks)
+        lost = self.sub_stracks(self.lost, tracked)
+        lost = np.concatenate((lost, lost_stracks))
+        lost = lost[~table.was_removed[lost]]  # tracks removed in an earlier frame
+        self.tracked, self.lost = self.remove_duplicate_stracks(tracked, lost)
+        self.add_removed(removed_stracks)
+        table.was_removed[removed_stracks] = True
+        # Rows that are in neither set can never be referenced again: unmatched detections, removed and dropped tracks
+        table.free(np.unique(self.sub_stracks(previous, np.concatenate((self.tracked, self.lost)))))
+
+        output = self.tracked[table.is_activated[self.tracked]]
+        return table.results(output) if len(output) else np.asarray([], dtype=np.float32)
+
+    def update_matched(self, tracks, detections):
+        """
+        Updates tracks with their matched detections.
+
+        Args:
+            tracks (np.ndarray): Rows of the matched tracks.
+            detections (np.ndarray): Row of the detection matched to every track.
+
+        Returns:
+            (tuple[np.ndarray, np.ndarray]): Rows of the tracks that were tracked and of the lost ones found again.
+        """
+        tracked = self.table.state[tracks] == TrackState.Tracked
+        self.table.update(tracks[tracked], detections[tracked], self.kalman_filter, self.frame_id)
+        self.table.update(tracks[~tracked], detections[~tracked], self.kalman_filter, self.frame_id, reactivate=True)
+        return tracks[tracked], tracks[~tracked]
+
+    def add_removed(self, tracks):
+        """Records the rows of tracks removed in this frame in `removed_ids` and `removed_stracks`."""
+        self.removed_ids = self.table.track_id[tracks].tolist()
+        if len(tracks):
+            self.removed_stracks.extend(self.table.view(row) for row in tracks.tolist())
+            if len(self.removed_stracks) > 1000:
+                self.removed_stracks = self.removed_stracks[-999:]  # clip remove stracks to 1000 maximum
+
+    def skip_frame(self):
+        """
+        Advance all tracks by one frame on which no inference was run, keeping the Kalman state in step with the video.
+
+        Confirmed and lost tracks are only predicted, never matched. As in update(), unconfirmed tracks and tracks
+        without a detection for more than `max_time_lost` frames are removed.
+        """
+        self.frame_id += 1
+        table = self.table
+        confirmed = table.is_activated[self.tracked]
+        strack_pool = self.joint_stracks(self.tracked[confirmed], self.lost)
+        self.multi_predict(strack_pool)
+        expired = strack_pool[self.frame_id - table.frame_id[strack_pool] > self.max_time_lost]
+        removed_stracks = np.concatenate((self.tracked[~confirmed], expired))
+        table.state[removed_stracks] = TrackState.Removed
+        self.add_removed(removed_stracks)
+        if len(removed_stracks):
+            self.tracked = self.sub_stracks(self.tracked, removed_stracks)
+            self.lost = self.sub_stracks(self.lost, removed_stracks)
+            table.free(removed_stracks)
+
+    def set_frame_rate(self, frame_rate):
+        """
+        Adapt to a new rate of processed frames, e.g. when the caller changes how many video frames it skips.
+
+        Track velocities are per processed frame, so they and their covariance are rescaled to the new frame interval,
+        and `max_time_lost` is recomputed so lost tracks are still kept for at least the same time.
+        Create the tracker at the real processed rate, this is only meant for changes of the rate while tracking.
+
+        Args:
+            frame_rate (float): New rate at which frames are passed to update(), in frames per second.
+        """
+        ratio = self.frame_rate / frame_rate  # new frame interval / old frame interval
+        if ratio == 1:
+            return
+        tracks = self.joint_stracks(self.tracked, self.lost)
+        tracks = tracks[self.table.has_mean[tracks]]
+        self.table.mean[tracks, 4:] *= ratio
+        self.table.covariance[tracks, 4:, :] *= ratio
+        self.table.covariance[tracks, :, 4:] *= ratio
+        self.frame_rate = frame_rate
+        self.max_time_lost = self.get_max_time_lost(frame_rate)
+
+    def get_max_time_lost(self, frame_rate):
+        """Returns the frames a lost track is kept at `frame_rate`, no shorter than `track_buffer` frames at 30 fps."""
+        return max(math.ceil(frame_rate / 30.0 * self.args.track_buffer), 1)
 
     def get_kalmanfilter(self):
         """Returns a Kalman filter object for tracking bounding boxes."""
         return KalmanFilterXYAH()
 
+    def get_table(self):
+        """Returns an empty TrackTable with xyah measurements and STrack views."""
+        return TrackTable("xyah", STrack, self.kalman_filter)
+
     def init_track(self, dets, scores, cls, img=None):
-        """Initialize object tracking with detections and scores using STrack algorithm."""
-        return [STrack(xyxy, s, c) for (xyxy, s, c) in zip(dets, scores, cls)] if len(dets) else []  # detections
+        """Adds the detections to the track table and returns their rows."""
+        return self.table.add_detections(dets, scores, cls)
 
     def get_dists(self, tracks, detections):
         """Calculates the distance between tracks and detections using IoU and fuses scores."""
-        dists = matching.iou_distance(tracks, detections)
+        dists = matching.iou_distance(self.table.get_boxes(tracks), self.table.get_boxes(detections))
         # TODO: mot20
         # if not self.args.mot20:
-        dists = matching.fuse_score(dists, detections)
+        dists = matching.fuse_score(dists, self.table.score[detections])
         return dists
 
     def multi_predict(self, tracks):
-        """Returns the predicted tracks using the YOLOv8 network."""
-        STrack.multi_predict(tracks)
+        """Predicts the Kalman states of the given track rows, velocity in height is frozen for lost tracks."""
+        self.table.predict(tracks, self.kalman_filter, frozen=(7,))
 
     @staticmethod
     def reset_id():
@@ -391,54 +554,29 @@ class BYTETracker:
 
     def reset(self):
         """Reset tracker."""
-        self.tracked_stracks = []  # type: list[STrack]
-        self.lost_stracks = []  # type: list[STrack]
         self.removed_stracks = []  # type: list[STrack]
+        self.removed_ids = []
         self.frame_id = 0
         self.kalman_filter = self.get_kalmanfilter()
+        self.table = self.get_table()
+        self.tracked = np.empty(0, dtype=np.intp)
+        self.lost = np.empty(0, dtype=np.intp)
         self.reset_id()
 
     @staticmethod
     def joint_stracks(tlista, tlistb):
-        """Combine two lists of stracks into a single one."""
-        exists = {}
-        res = []
-        for t in tlista:
-            exists[t.track_id] = 1
-            res.append(t)
-        for t in tlistb:
-            tid = t.track_id
-            if not exists.get(tid, 0):
-                exists[tid] = 1
-                res.append(t)
-        return res
+        """Combine two arrays of track rows into one, keeping the order and dropping rows of b already in a."""
+        return np.concatenate((tlista, tlistb[~np.isin(tlistb, tlista)]))
 
     @staticmethod
     def sub_stracks(tlista, tlistb):
-        """DEPRECATED CODE in https://github.com/ultralytics/ultralytics/pull/1890/
-        stracks = {t.track_id: t for t in tlista}
-        for t in tlistb:
-            tid = t.track_id
-            if stracks.get(tid, 0):
-                del stracks[tid]
-        return list(stracks.values())
-        """
-        track_ids_b = {t.track_id for t in tlistb}
-        return [t for t in tlista if t.track_id not in track_ids_b]
-
-    @staticmethod
-    def remove_duplicate_stracks(stracksa, stracksb):
-        """Remove duplicate stracks with non-maximum IoU distance."""
-        pdist = matching.iou_distance(stracksa, stracksb)
-        pairs = np.where(pdist < 0.15)
-        dupa, dupb = [], []
-        for p, q in zip(*pairs):
-            timep = stracksa[p].frame_id - stracksa[p].start_frame
-            timeq = stracksb[q].frame_id - stracksb[q].start_frame
-            if timep > timeq:
-                dupb.append(q)
-            else:
-                dupa.append(p)
-        resa = [t for i, t in enumerate(stracksa) if i not in dupa]
-        resb = [t for i, t in enumerate(stracksb) if i not in dupb]
-        return resa, resb
+        """Returns the track rows of a that are not in b."""
+        return tlista[~np.isin(tlista, tlistb)]
+
+    def remove_duplicate_stracks(self, stracksa, stracksb):
+        """Remove duplicate tracks with non-maximum IoU distance, the younger track of each pair is dropped."""
+        pdist = matching.iou_distance(self.table.get_boxes(stracksa), self.table.get_boxes(stracksb))
+        p, q = np.nonzero(pdist < 0.15)
+        timep = self.table.frame_id[stracksa[p]] - self.table.start_frame[stracksa[p]]
+        timeq = self.table.frame_id[stracksb[q]] - self.table.start_frame[stracksb[q]]
+        return np.delete(stracksa, p[timep <= timeq]), np.delete(stracksb, q[timep > timeq])
@@ -37,7 +37,7 @@ def on_predict_start(predictor: object, persist: bool = False) -> None:
 
     trackers = []
     for _ in range(predictor.dataset.bs):
-        tracker = TRACKER_MAP[cfg.tracker_type](args=cfg, frame_rate=30)
+        tracker = TRACKER_MAP[cfg.tracker_type](args=cfg, frame_rate=getattr(predictor, "track_frame_rate", 30))
         trackers.append(tracker)
         if predictor.dataset.mode != "stream":  # only need one tracker for other modes.
             break
@@ -0,0 +1,238 @@
+# Ultralytics YOLO 🚀, AGPL-3.0 license
+
+import numpy as np
+
+from ..utils.ops import xywh2ltwh
+from .basetrack import TrackState
+
+
+class TrackTable:
+    """
+    Struct-of-arrays storage of the tracks and detections of a tracker.
+
+    Every track or detection is one row of a set of contiguous column arrays, so the per-frame work of a tracker
+    (predicting, matching, updating and moving tracks between the tracked and lost sets) is done on arrays of row
+    indices instead of lists of Python objects. Detections get a row when they are added; a detection that starts a
+    new track keeps its row, the rows of all others are freed at the end of the frame and reused.
+
+    STrack objects are only created on demand, as views of a row (see `view`). A view whose row is freed gets a private
+    copy of the row, so it keeps its last state.
+
+    Attributes:
+        measurement (str): Kalman filter measurement space of the tracker, "xyah" (x, y, aspect, height) or "xywh".
+        track_cls (type): STrack subclass used for the views.
+        kalman_filter (KalmanFilterXYAH): Kalman filter of the tracker, given to the views.
+        capacity (int): Number of allocated rows.
+        mean (np.ndarray): (capacity, 8) Kalman state means, only valid where `has_mean`.
+        covariance (np.ndarray): (capacity, 8, 8) Kalman state covariances.
+        tlwh (np.ndarray): float32 (capacity, 4) detection boxes as (top left x, top left y, width, height).
+        angle (np.ndarray): Box angles of oriented boxes, NaN for axis-aligned boxes.
+        views (dict): Row -> STrack view of the rows a view was created for.
+    """
+
+    COLUMNS = {
+        "mean": ((8,), np.float64),
+        "covariance": ((8, 8), np.float64),
+        "has_mean": ((), bool),
+        "tlwh": ((4,), np.float32),
+        "score": ((), np.float32),
+        "cls": ((), np.float32),
+        "idx": ((), np.float64),
+        "angle": ((), np.float64),
+        "track_id": ((), np.int64),
+        "state": ((), np.int8),
+        "is_activated": ((), bool),
+        "frame_id": ((), np.int64),
+        "start_frame": ((), np.int64),
+        "tracklet_len": ((), np.int64),
+        "was_removed": ((), bool),  # the track was removed before, BYTETracker drops it when it is lost again
+    }
+
+    def __init__(self, measurement="xyah", track_cls=None, kalman_filter=None, capacity=64):
+        """
+        Initializes an empty table.
+
+        Args:
+            measurement (str): Kalman filter measurement space, "xyah" or "xywh".
+            track_cls (type, optional): STrack subclass used for views, needed for `view`.
+            kalman_filter (KalmanFilterXYAH, optional): Kalman filter given to the views.
+            capacity (int): Number of rows allocated up front, the table grows by doubling.
+        """
+        self.measurement = measurement
+        self.track_cls = track_cls
+        self.kalman_filter = kalman_filter
+        self.capacity = 0
+        self.free_rows = []
+        self.views = {}
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        """Reallocates all columns with `capacity` rows, the new rows are free."""
+        for name, (shape, dtype) in self.COLUMNS.items():
+            column = np.zeros((capacity, *shape), dtype=dtype)
+            if self.capacity:
+                column[: self.capacity] = getattr(self, name)
+            setattr(self, name, column)
+        self.free_rows.extend(range(capacity - 1, self.capacity - 1, -1))  # lowest rows are handed out first
+        self.capacity = capacity
+
+    def allocate(self, n):
+        """Returns the indices of `n` free rows, the table grows if needed."""
+        if len(self.free_rows) < n:
+            self._grow(max(2 * self.capacity, self.capacity + n - len(self.free_rows)))
+        rows = np.array(self.free_rows[len(self.free_rows) - n :], dtype=np.intp)
+        del self.free_rows[len(self.free_rows) - n :]
+        return rows
+
+    def free(self, rows):
+        """Frees rows for reuse, their views are detached first."""
+        if self.views:
+            for row in rows.tolist():
+                if row in self.views:
+                    self.detach(row)
+        self.free_rows.extend(rows.tolist())
+
+    def add_detections(self, dets, scores, cls):
+        """
+        Adds detections as new rows.
+
+        Args:
+            dets (np.ndarray): (N, 5) xywh + index or (N, 6) xywha + index boxes.
+            scores (np.ndarray): Detection confidences.
+            cls (np.ndarray): Detection classes.
+
+        Returns:
+            (np.ndarray): The rows of the detections.
+        """
+        rows = self.allocate(len(dets))
+        if len(dets):
+            self.tlwh[rows] = xywh2ltwh(dets[:, :4])
+            self.angle[rows] = dets[:, 4] if dets.shape[1] == 6 else np.nan
+            self.idx[rows] = dets[:, -1]
+            self.score[rows] = scores
+            self.cls[rows] = cls
+            self.has_mean[rows] = False
+            self.state[rows] = TrackState.New
+            self.is_activated[rows] = False
+            self.was_removed[rows] = False
+            for name in ("track_id", "frame_id", "start_frame", "tracklet_len"):
+                getattr(self, name)[rows] = 0
+        return rows
+
+    def view(self, row):
+        """Returns the STrack view of `row`, created on first use."""
+        track = self.views.get(row)
+        if track is None:
+            track = self.views[row] = self.track_cls.view(self, row)
+        return track
+
+    def detach(self, row):
+        """Moves the view of `row` to a private one-row copy of the row, before the row is freed."""
+        track = self.views.pop(row)
+        table = TrackTable(self.measurement, self.track_cls, self.kalman_filter, capacity=1)
+        table.allocate(1)
+        for name in self.COLUMNS:
+            getattr(table, name)[0] = getattr(self, name)[row]
+        table.views[0] = track
+        track.table, track.row = table, 0
+
+    def get_tlwh(self, rows):
+        """Returns the current tlwh boxes of rows, from their mean if they have one."""
+        has_mean = self.has_mean[rows]
+        if not has_mean.any():
+            return self.tlwh[rows]  # float32, as detections keep them
+        tlwh = self.tlwh[rows].astype(np.float64)
+        ret = self.mean[rows[has_mean], :4].copy()
+        if self.measurement == "xyah":
+            ret[:, 2] *= ret[:, 3]
+        ret[:, :2] -= ret[:, 2:] / 2
+        tlwh[has_mean] = ret
+        return tlwh
+
+    def get_xyxy(self, rows):
+        """Returns the current (min x, min y, max x, max y) boxes of rows."""
+        ret = self.get_tlwh(rows)
+        ret[:, 2:] += ret[:, :2]
+        return ret
+
+    def get_boxes(self, rows):
+        """Returns the boxes of rows for IoU matching, xywha for oriented boxes and xyxy otherwise."""
+        if not len(rows) or np.isnan(self.angle[rows]).all():
+            return self.get_xyxy(rows)
+        ret = self.get_tlwh(rows)
+        ret[:, :2] += ret[:, 2:] / 2
+        return np.column_stack((ret, self.angle[rows]))
+
+    def get_measurements(self, rows):
+        """Returns the boxes of rows in the measurement space of the Kalman filter."""
+        ret = self.get_tlwh(rows)
+        ret[:, :2] += ret[:, 2:] / 2
+        if self.measurement == "xyah":
+            ret[:, 2] /= ret[:, 3]
+        return ret
+
+    def results(self, rows):
+        """Returns the tracking results of rows, one [*box, track_id, score, cls, idx] row each."""
+        boxes = self.get_boxes(rows)
+        cols = (self.track_id[rows], self.score[rows], self.cls[rows], self.idx[rows])
+        return np.column_stack((boxes, *cols)).astype(np.float32)
+
+    def predict(self, rows, kalman_filter, frozen=(7,)):
+        """
+        Runs the Kalman prediction of rows.
+
+        Args:
+            rows (np.ndarray): Rows with a mean.
+            kalman_filter (KalmanFilterXYAH): Filter used for the prediction.
+            frozen (tuple): State velocities zeroed for tracks that are not in the Tracked state.
+        """
+        if not len(rows):
+            return
+        mean = self.mean[rows]
+        mean[np.ix_(self.state[rows] != TrackState.Tracked, frozen)] = 0
+        self.mean[rows], self.covariance[rows] = kalman_filter.multi_predict(mean, self.covariance[rows])
+
+    def apply_gmc(self, rows, H):
+        """Moves the states of rows by the 2x3 affine camera motion `H`."""
+        if not len(rows):
+            return
+        R8x8 = np.kron(np.eye(4, dtype=float), H[:2, :2])
+        mean = self.mean[rows] @ R8x8.T
+        mean[:, :2] += H[:2, 2]
+        self.mean[rows] = mean
+        self.covariance[rows] = R8x8 @ self.covariance[rows] @ R8x8.T
+
+    def activate(self, rows, kalman_filter, frame_id, track_ids):
+        """Starts new tracks from the detections of rows."""
+        for row, measurement in zip(rows.tolist(), self.get_measurements(rows)):
+            self.mean[row], self.covariance[row] = kalman_filter.initiate(measurement)
+        self.has_mean[rows] = True
+        self.track_id[rows] = track_ids
+        self.tracklet_len[rows] = 0
+        self.state[rows] = TrackState.Tracked
+        self.is_activated[rows] = frame_id == 1
+        self.frame_id[rows] = frame_id
+        self.start_frame[rows] = frame_id
+
+    def update(self, rows, det_rows, kalman_filter, frame_id, reactivate=False):
+        """
+        Updates tracks with their matched detections.
+
+        Args:
+            rows (np.ndarray): Track rows.
+            det_rows (np.ndarray): Row of the matched detection of every track.
+            kalman_filter (KalmanFilterXYAH): Filter used for the correction.
+            frame_id (int): Current frame id.
+            reactivate (bool): The tracks are lost tracks that were found again, their tracklet length restarts.
+        """
+        if not len(rows):
+            return
+        self.mean[rows], self.covariance[rows] = kalman_filter.multi_update(
+            self.mean[rows], self.covariance[rows], self.get_measurements(det_rows)
+        )
+        self.tracklet_len[rows] = 0 if reactivate else self.tracklet_len[rows] + 1
+        self.state[rows] = TrackState.Tracked
+        self.is_activated[rows] = True
+        self.frame_id[rows] = frame_id
+        for name in ("score", "cls", "angle", "idx"):
+            getattr(self, name)[rows] = getattr(self, name)[det_rows]